@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+
+from benchmarks.fakes import groq_falso, viacep_falso
+
+
+def imprimir(resultados):
+    print(f"{'etapa':<24} {'n':>7} {'ops/s':>11} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10}")
+    for nome, m in resultados.items():
+        print(f"{nome:<24} {m['n']:>7} {m['ops_s']:>11.1f} {m['p50_us']:>10.1f} {m['p90_us']:>10.1f} {m['p99_us']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark offline do chatbot por etapa.")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[11, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--latencia-groq", type=float, default=0.0)
+    parser.add_argument("--latencia-cep", type=float, default=0.0)
+    parser.add_argument("--salvar", help="grava os resultados em JSON para servir de linha de base")
+    parser.add_argument("--comparar", help="JSON de linha de base para comparar o p50 de cada etapa")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    with groq_falso(args.latencia_groq) as groq, viacep_falso(args.latencia_cep) as viacep, \
+            tempfile.TemporaryDirectory() as pasta:
+        os.environ["GROQ_BASE_URL"] = groq.url
+        os.environ["LUMINA_VIACEP_URL"] = viacep.url + "/ws/{cep}/json/"
+        os.environ["LUMINA_CEP_CACHE"] = os.path.join(pasta, "cep.sqlite3")
+        os.environ["LUMINA_CACHE_RESPOSTAS"] = ""
+        os.environ["LUMINA_CACHE_RESPOSTAS_MAX"] = "0"
+
+        from benchmarks import etapas
+
+        erros = etapas.conferir_rotulos()
+        for (esperado, obtido), total in erros.items():
+            print(f"aviso: {total} mensagem(ns) rotuladas '{esperado}' foram para '{obtido}'")
+
+        resultados = etapas.etapas_mensagens(args.repeticoes)
+        resultados.update(etapas.etapas_catalogo(args.tamanhos, args.repeticoes))
+        resultados.update(etapas.sobrecarga_metricas(args.repeticoes))
+        chamadas = {"groq": groq.pedidos, "viacep": viacep.pedidos}
+
+    imprimir(resultados)
+    print(f"chamadas aos falsos: groq {chamadas['groq']}, viacep {chamadas['viacep']}")
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "repeticoes": args.repeticoes,
+                "etapas": resultados,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"linha de base gravada em {args.salvar}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)["etapas"]
+        linhas = etapas.comparar(resultados, base, args.tolerancia)
+        print(f"\n{'etapa':<24} {'base p50':>10} {'atual p50':>10} {'variação':>9}")
+        for nome, anterior, atual, variacao, marca in linhas:
+            print(f"{nome:<24} {anterior:>10.1f} {atual:>10.1f} {variacao:>+9.1%} {marca}")
+        if any(marca == "PIOROU" for *_, marca in linhas):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
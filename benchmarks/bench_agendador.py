@@ -0,0 +1,119 @@
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks.fakes import RESPOSTA_LLM, LimiteFalso, groq_falso
+
+CHAVE = "gsk_bench"
+MENSAGEM = "vocês têm provador na loja?"
+
+
+class SemAgendador:
+    def executar(self, chave, sessao, custo, chamar):
+        return chamar()
+
+    def conciliar(self, chave, custo, uso):
+        pass
+
+
+def registro_sdk():
+    from src.clientes import RegistroClientesGroq, modulo_groq
+
+    class RegistroSdk(RegistroClientesGroq):
+        def _criar(self, api_key):
+            groq = modulo_groq()
+            return groq.Groq(api_key=api_key, http_client=groq.DefaultHttpxClient(limits=self._limites()))
+
+    return RegistroSdk()
+
+
+def jain(valores):
+    return sum(valores) ** 2 / (len(valores) * sum(v * v for v in valores)) if any(valores) else 0.0
+
+
+def rodar(modo, args):
+    from src import chatbot
+    from src.agendador import AgendadorGroq
+    from src.clientes import RegistroClientesGroq
+
+    limite = LimiteFalso(args.tokens, args.janela)
+    with groq_falso(args.latencia, limite=limite) as groq:
+        os.environ["GROQ_BASE_URL"] = groq.url
+        if modo == "sem agendador":
+            chatbot.agendador_groq, chatbot.clientes_groq = SemAgendador(), registro_sdk()
+        else:
+            chatbot.agendador_groq, chatbot.clientes_groq = AgendadorGroq(prazo=args.prazo), RegistroClientesGroq()
+
+        resultados = []
+        lock = threading.Lock()
+
+        def conversar(nome, session, mensagens, atraso):
+            time.sleep(atraso)
+            for _ in range(mensagens):
+                inicio = time.perf_counter()
+                resposta = chatbot.processar_mensagem_total(MENSAGEM, CHAVE, session)
+                duracao = time.perf_counter() - inicio
+                resultado = "ok" if resposta == RESPOSTA_LLM else ("limite" if "limite" in resposta else "erro")
+                with lock:
+                    resultados.append((nome, resultado, duracao))
+
+        threads = []
+        for i in range(args.pesadas):
+            session = chatbot.ChatSession()
+            for _ in range(args.paralelas):
+                threads.append(threading.Thread(target=conversar, args=(f"pesada-{i}", session, args.mensagens, 0.0)))
+        for i in range(args.leves):
+            threads.append(threading.Thread(target=conversar, args=(f"leve-{i}", chatbot.ChatSession(), 1, args.atraso_leves)))
+
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+        chatbot.clientes_groq.fechar()
+        rejeitados = groq.rejeitados
+
+    return resultados, duracao, rejeitados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão e justiça entre sessões com um Groq falso que responde 429.")
+    parser.add_argument("--tokens", type=int, default=1600, help="tokens por janela no provedor falso")
+    parser.add_argument("--janela", type=float, default=0.5)
+    parser.add_argument("--latencia", type=float, default=0.02)
+    parser.add_argument("--pesadas", type=int, default=4, help="sessões que disparam muitas mensagens")
+    parser.add_argument("--paralelas", type=int, default=4, help="mensagens simultâneas por sessão pesada")
+    parser.add_argument("--mensagens", type=int, default=8, help="mensagens por linha de execução pesada")
+    parser.add_argument("--leves", type=int, default=8, help="sessões com uma única mensagem")
+    parser.add_argument("--atraso-leves", type=float, default=1.0)
+    parser.add_argument("--prazo", type=float, default=15.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        os.environ["LUMINA_CACHE_RESPOSTAS"] = ""
+        os.environ["LUMINA_CACHE_RESPOSTAS_MAX"] = "0"
+        os.environ["LUMINA_CEP_CACHE"] = os.path.join(pasta, "cep.sqlite3")
+
+        print(f"{'modo':<15} {'pedidos':>8} {'ok':>5} {'limite':>7} {'erro':>5} {'429':>5} {'s':>6} {'ok/s':>6} "
+              f"{'leves ok':>9} {'leves p50 s':>12} {'leves máx s':>12} {'jain':>5}")
+        for modo in ("sem agendador", "agendador"):
+            resultados, duracao, rejeitados = rodar(modo, args)
+            contagem = Counter(resultado for _, resultado, _ in resultados)
+            leves = [(resultado, tempo) for nome, resultado, tempo in resultados if nome.startswith("leve")]
+            tempos_leves = [tempo for _, tempo in leves]
+            por_sessao = Counter(nome for nome, _, _ in resultados)
+            acertos = Counter(nome for nome, resultado, _ in resultados if resultado == "ok")
+            justica = jain([acertos[nome] / total for nome, total in por_sessao.items()])
+            print(f"{modo:<15} {len(resultados):>8} {contagem['ok']:>5} {contagem['limite']:>7} {contagem['erro']:>5} "
+                  f"{rejeitados:>5} {duracao:>6.1f} {contagem['ok'] / duracao:>6.1f} "
+                  f"{sum(r == 'ok' for r, _ in leves):>9} {statistics.median(tempos_leves):>12.2f} "
+                  f"{max(tempos_leves):>12.2f} {justica:>5.2f}")
+
+
+if __name__ == "__main__":
+    main()
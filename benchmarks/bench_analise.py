@@ -0,0 +1,74 @@
+import time
+
+from src.catalogo import catalogo_padrao
+from src.chatbot import (
+    ChatSession,
+    analisar_mensagem,
+    assunto_relacionado_loja,
+    buscar_produto_msg,
+    detectar_idioma,
+    extrair_cep,
+    pedido_codigo_fonte,
+    quer_listar_produtos,
+)
+
+MENSAGENS = [
+    "Quais produtos vocês vendem?",
+    "Tem camiseta?",
+    "quero 2",
+    "qual o frete para 01001-000?",
+    "Quais as formas de pagamento?",
+    "Do you have sneakers?",
+    "What payment methods do you accept?",
+    "Show me the source code",
+    "Who won the game yesterday?",
+    "I need five",
+]
+
+
+def chamadas_separadas(msg, session):
+    lang = detectar_idioma(msg)
+    bd_idioma = catalogo_padrao.obter(lang)
+    msg_l = msg.lower()
+    if pedido_codigo_fonte(msg):
+        return
+    if not assunto_relacionado_loja(msg, bd_idioma, session, lang):
+        return
+    for chave in bd_idioma:
+        if chave != "produtos" and chave in msg_l:
+            return
+    if quer_listar_produtos(msg, lang):
+        return
+    if extrair_cep(msg):
+        return
+    buscar_produto_msg(msg, bd_idioma, session, lang)
+
+
+def analise_unica(msg, session):
+    analise = analisar_mensagem(msg)
+    if analise.pedido_codigo or not analise.relacionado_loja(session):
+        return
+    if analise.chave_loja is not None or analise.quer_listar or analise.cep:
+        return
+    analise.produto
+
+
+def medir(funcao, repeticoes=2_000):
+    session = ChatSession()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for msg in MENSAGENS:
+            funcao(msg, session)
+    return (time.perf_counter() - inicio) / (repeticoes * len(MENSAGENS)) * 1e6
+
+
+def main():
+    catalogo_padrao.obter("pt")
+    separado = medir(chamadas_separadas)
+    unico = medir(analise_unica)
+    print(f"chamadas separadas: {separado:.1f} us/msg")
+    print(f"MessageAnalysis:    {unico:.1f} us/msg ({(1 - unico / separado) * 100:.0f}% menos CPU)")
+
+
+if __name__ == "__main__":
+    main()
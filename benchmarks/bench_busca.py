@@ -0,0 +1,102 @@
+import argparse
+import re
+import time
+from collections import Counter
+
+from benchmarks.catalogo_sintetico import catalogo_sintetico
+from benchmarks.corpus import MENSAGENS
+from src import chatbot
+from src.busca import IndiceAproximado, distancia_limitada, limite_distancia
+from src.chatbot import IGNORAR_BUSCA, ChatSession, analisar_mensagem, rotear
+
+CONSULTAS = ["jaketa", "mochlia preta", "tem camisetta?", "vestdo urban", "pulseria", "quem ganhou o jogo", "sneakrs"]
+RAMOS_FALLBACK = ("llm", "fora_escopo")
+NEGATIVAS = [
+    "the jackpot lottery numbers", "do you sell coats for kids?", "tem carteira de couro?",
+    "qual o preço da carteira de couro?", "quero ver filmes de terror", "what is the capital of france?",
+]
+
+_RE_PALAVRA = re.compile(r"[^\W\d_]{5,}")
+
+
+def erros_digitacao(palavra):
+    meio = len(palavra) // 2
+    return [
+        palavra[:meio] + palavra[meio + 1:],
+        palavra[:meio] + palavra[meio + 1] + palavra[meio] + palavra[meio + 2:],
+        palavra[:meio] + palavra[meio] + palavra[meio:],
+    ]
+
+
+def corpus_com_erros():
+    mensagens = []
+    for m in MENSAGENS:
+        if m["ramo"] != "produto":
+            continue
+        for palavra in _RE_PALAVRA.findall(m["texto"]):
+            for errada in erros_digitacao(palavra):
+                mensagens.append({"texto": m["texto"].replace(palavra, errada), "ramo": "produto"})
+    return mensagens
+
+
+def rotas(mensagens, busca):
+    anterior = chatbot.BUSCA_APROXIMADA
+    chatbot.BUSCA_APROXIMADA = busca
+    try:
+        return Counter(rotear(analisar_mensagem(m["texto"]), ChatSession())[0] for m in mensagens)
+    finally:
+        chatbot.BUSCA_APROXIMADA = anterior
+
+
+def busca_linear(bd_idioma, texto_l):
+    melhores = []
+    tokens = [t for t in _RE_PALAVRA.findall(texto_l) if t not in IGNORAR_BUSCA]
+    for posicao, produto in enumerate(bd_idioma["produtos"]):
+        palavras = _RE_PALAVRA.findall(" ".join([produto["nome"], *produto["categorias"]]).lower())
+        for token in tokens:
+            if any(distancia_limitada(token, p, limite_distancia(token)) <= limite_distancia(token) for p in palavras):
+                melhores.append(posicao)
+                break
+    return melhores[:5]
+
+
+def latencias(funcao, consultas, repeticoes):
+    duracoes = []
+    for _ in range(repeticoes):
+        for consulta in consultas:
+            inicio = time.perf_counter()
+            funcao(consulta)
+            duracoes.append(time.perf_counter() - inicio)
+    duracoes.sort()
+    return duracoes[len(duracoes) // 2] * 1e6, duracoes[int(len(duracoes) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência da busca aproximada e chamadas ao LLM evitadas.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[11, 10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'produtos':>9} {'palavras':>9} {'índice s':>9} {'p50 us':>9} {'p99 us':>9} {'linear p50 us':>14}")
+    for total in args.tamanhos:
+        bd = catalogo_sintetico(total)
+        inicio = time.perf_counter()
+        indice = IndiceAproximado(bd, IGNORAR_BUSCA)
+        construcao = time.perf_counter() - inicio
+        p50, p99 = latencias(lambda c: indice.buscar(c, 5, apenas_fortes=True), CONSULTAS, args.repeticoes)
+        linear, _ = latencias(lambda c: busca_linear(bd, c), CONSULTAS, 1)
+        print(f"{total:>9} {len(indice):>9} {construcao:>9.2f} {p50:>9.1f} {p99:>9.1f} {linear:>14.1f}")
+
+    for nome, mensagens in (("corpus", MENSAGENS), ("corpus com erros de digitação", corpus_com_erros())):
+        sem, com = rotas(mensagens, False), rotas(mensagens, True)
+        print(f"\n{nome}: {len(mensagens)} mensagens")
+        for ramo in RAMOS_FALLBACK:
+            print(f"  {ramo:<12} sem busca {sem[ramo]:>4}   com busca {com[ramo]:>4}")
+        print(f"  chamadas ao LLM evitadas: {sem['llm'] - com['llm']}, respostas de produto a mais: {com['produto'] - sem['produto']}")
+
+    cartoes = rotas([{"texto": texto} for texto in NEGATIVAS], True)["produto"]
+    print(f"\nmensagens sem produto do catálogo respondidas com um cartão: {cartoes} de {len(NEGATIVAS)}")
+
+
+if __name__ == "__main__":
+    main()
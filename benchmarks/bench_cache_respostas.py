@@ -0,0 +1,59 @@
+import os
+import time
+
+from benchmarks.fakes import groq_falso
+
+PERGUNTAS = [
+    "vocês têm provador na loja?",
+    "Vocês têm provador na loja",
+    "a loja tem provador?",
+    "A loja tem provador",
+    "Vocês têm loja física?",
+    "vocês têm loja física?",
+    "do you have a physical store?",
+    "Do you have a physical store?!",
+]
+
+
+def rodada(processar, ChatSession, perguntas, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for texto in perguntas:
+            processar(texto, "gsk_bench", ChatSession())
+    return (time.perf_counter() - inicio) / (repeticoes * len(perguntas)) * 1000
+
+
+def main():
+    with groq_falso(latencia=0.05) as groq:
+        os.environ["GROQ_BASE_URL"] = groq.url
+
+        from src.cache_respostas import cache_respostas
+        from src.catalogo import SecaoCatalogo, catalogo_padrao
+        from src.chatbot import ChatSession, processar_mensagem_total, resposta_groq
+
+        cache_respostas.limpar()
+        ms = rodada(processar_mensagem_total, ChatSession, PERGUNTAS, 10)
+        stats = cache_respostas.estatisticas()
+        print(f"{len(PERGUNTAS)} perguntas x 10 rodadas   {ms:6.1f} ms/msg   chamadas ao Groq {groq.pedidos}")
+        print(f"  acertos {stats['acertos']}   falhas {stats['falhas']}   taxa {stats['taxa_acerto']:.1%}")
+
+        antes = groq.pedidos
+        bd_pt = catalogo_padrao.obter("pt")
+        alterado = SecaoCatalogo(bd_pt, pagamento=bd_pt.get("pagamento", "") + " ")
+        resposta_groq("a loja tem provador?", "pt", alterado, "gsk_bench", ChatSession())
+        resposta_groq("a loja tem provador?", "pt", alterado, "gsk_bench", ChatSession())
+        print(
+            f"catálogo alterado: {groq.pedidos - antes} chamada(s) para 2 perguntas iguais, "
+            f"invalidações {cache_respostas.estatisticas()['invalidacoes']}"
+        )
+
+        cache_respostas.limpar()
+        groq.status_erro = 401
+        erro = resposta_groq("can I return a gift?", "en", catalogo_padrao.obter("en"), "gsk_bench", ChatSession())
+        groq.status_erro = None
+        resposta_groq("can I return a gift?", "en", catalogo_padrao.obter("en"), "gsk_bench", ChatSession())
+        print(f"erro da API não guardado: {len(cache_respostas) == 1 and erro != groq.resposta}")
+
+
+if __name__ == "__main__":
+    main()
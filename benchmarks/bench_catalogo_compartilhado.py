@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.catalogo_sintetico import banco_sintetico
+from src.catalogo import RAIZ_PROJETO
+from src.catalogo_compartilhado import publicar
+from src.catalogo_compilado import compilar
+
+INTERVALO_VERIFICACAO = 0.02
+ESPERA_RECARGA = 0.3
+MENSAGENS_AQUECIMENTO = ["tem camiseta?", "quais as formas de pagamento?", "quero uma jaqueta azul até 200 reais"]
+
+
+def memoria():
+    with open("/proc/self/smaps_rollup", "r", encoding="utf-8") as f:
+        campos = dict(re.findall(r"^(\w+):\s+(\d+) kB", f.read(), re.M))
+    return {nome: int(campos.get(nome, 0)) * 1024 for nome in ("Rss", "Pss", "Private_Dirty")}
+
+
+def atender():
+    from src.catalogo import catalogo_padrao
+    from src.chatbot import ChatSession, processar_mensagem_total
+    from src.contexto import montar_contexto
+
+    session = ChatSession()
+    for texto in MENSAGENS_AQUECIMENTO:
+        processar_mensagem_total(texto, "", session)
+    montar_contexto(catalogo_padrao.obter("pt"), MENSAGENS_AQUECIMENTO[-1])
+
+
+def trabalhador():
+    inicio = time.perf_counter()
+    from src.catalogo import catalogo_padrao
+
+    catalogo_padrao.intervalo_verificacao = INTERVALO_VERIFICACAO
+    atender()
+    print(json.dumps({"carga": time.perf_counter() - inicio, **memoria()}), flush=True)
+
+    sys.stdin.readline()
+    versao = catalogo_padrao.snapshot().versao
+    while catalogo_padrao.snapshot().versao == versao:
+        time.sleep(INTERVALO_VERIFICACAO / 2)
+    trocou = time.time()
+    atender()
+    print(json.dumps({"trocou": trocou, "atendeu": time.time(), **memoria()}), flush=True)
+
+
+def iniciar(total, ambiente):
+    comando = [sys.executable, "-m", "benchmarks.bench_catalogo_compartilhado", "--trabalhador"]
+    return [
+        subprocess.Popen(comando, cwd=RAIZ_PROJETO, env=ambiente, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(total)
+    ]
+
+
+def ler(processos):
+    return [json.loads(processo.stdout.readline()) for processo in processos]
+
+
+def alterar_preco(arquivo):
+    banco = json.loads(arquivo.read_text(encoding="utf-8"))
+    for secao in banco.values():
+        secao["produtos"][0]["preco"] = round(secao["produtos"][0]["preco"] + 1, 2)
+    arquivo.write_text(json.dumps(banco, ensure_ascii=False), encoding="utf-8")
+
+
+def rodada(modo, total, arquivo, pasta_segmentos):
+    ambiente = dict(os.environ, PYTHONPATH=str(RAIZ_PROJETO), LUMINA_CACHE_RESPOSTAS_MAX="0", LUMINA_VIACEP_ENRIQUECER="0")
+    if modo == "compartilhado":
+        ambiente["LUMINA_CATALOGO"] = str(pasta_segmentos)
+    else:
+        ambiente["LUMINA_CATALOGO"] = str(arquivo)
+        compilar(arquivo)
+
+    processos = iniciar(total, ambiente)
+    try:
+        prontos = ler(processos)
+        for processo in processos:
+            processo.stdin.write("\n")
+            processo.stdin.flush()
+        time.sleep(ESPERA_RECARGA)
+
+        inicio = time.time()
+        alterar_preco(arquivo)
+        publicacao = 0.0
+        if modo == "compartilhado":
+            publicar(arquivo, pasta_segmentos)
+            publicacao = time.time() - inicio
+        recarregados = ler(processos)
+    finally:
+        for processo in processos:
+            processo.stdin.close()
+            processo.wait()
+
+    trocas = sorted(r["trocou"] - inicio for r in recarregados)
+    atendimentos = sorted(r["atendeu"] - inicio for r in recarregados)
+    return {
+        "carga": statistics.median(p["carga"] for p in prontos),
+        "rss": statistics.median(p["Rss"] for p in prontos),
+        "privada": statistics.median(p["Private_Dirty"] for p in prontos),
+        "pss": sum(p["Pss"] for p in prontos),
+        "pss_depois": sum(r["Pss"] for r in recarregados),
+        "publicacao": publicacao,
+        "troca": statistics.median(trocas),
+        "atendimento": statistics.median(atendimentos),
+        "atendimento_max": atendimentos[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória e recarga do catálogo com um snapshot por processo ou um segmento compartilhado.")
+    parser.add_argument("--produtos", type=int, default=20_000)
+    parser.add_argument("--trabalhadores", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--trabalhador", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.trabalhador:
+        trabalhador()
+        return
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = Path(pasta) / "bd.json"
+        arquivo.write_text(json.dumps(banco_sintetico(args.produtos), ensure_ascii=False), encoding="utf-8")
+        pasta_segmentos = Path(pasta) / "segmentos"
+        inicio = time.perf_counter()
+        segmento, _, _ = publicar(arquivo, pasta_segmentos)
+        print(f"{args.produtos} produtos por idioma; segmento de {segmento.stat().st_size / 2**20:.1f} MiB "
+              f"publicado em {time.perf_counter() - inicio:.1f} s\n")
+
+        print(f"{'workers':>7} {'modo':<14} {'carga s':>8} {'RSS MiB':>8} {'privada':>8} {'PSS total':>10} "
+              f"{'PSS depois':>11} {'publicar s':>11} {'troca s':>8} {'atende s':>9} {'máx s':>7}")
+        for total in args.trabalhadores:
+            for modo in ("por processo", "compartilhado"):
+                r = rodada(modo, total, arquivo, pasta_segmentos)
+                print(f"{total:>7} {modo:<14} {r['carga']:>8.2f} {r['rss'] / 2**20:>8.1f} {r['privada'] / 2**20:>8.1f} "
+                      f"{r['pss'] / 2**20:>10.1f} {r['pss_depois'] / 2**20:>11.1f} {r['publicacao']:>11.2f} "
+                      f"{r['troca']:>8.2f} {r['atendimento']:>9.2f} {r['atendimento_max']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.catalogo_sintetico import banco_sintetico
+from src.catalogo import CatalogoStore
+from src.catalogo_particionado import converter_bd
+
+
+def medir(carregar):
+    gc.collect()
+    inicio = time.perf_counter()
+    carregar()
+    duracao = time.perf_counter() - inicio
+
+    gc.collect()
+    tracemalloc.start()
+    resultado = carregar()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracao, memoria
+
+
+def tempo(funcao, repeticoes=1000):
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        funcao(i)
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def tamanho_disco(caminho):
+    caminho = Path(caminho)
+    if caminho.is_file():
+        return caminho.stat().st_size
+    return sum(arquivo.stat().st_size for arquivo in caminho.rglob("*") if arquivo.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o bd.json monolítico com o catálogo particionado.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--tamanho-bloco", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'produtos':>9} {'formato':<12} {'disco MiB':>10} {'carga ms':>9} {'memória MiB':>12} "
+          f"{'1º acesso us':>13} {'acesso us':>10}")
+    for total in args.tamanhos:
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo = Path(pasta) / "bd.json"
+            banco = banco_sintetico(total)
+            arquivo.write_text(json.dumps(banco, ensure_ascii=False), encoding="utf-8")
+            converter_bd(banco, Path(pasta) / "catalogo", args.tamanho_bloco)
+            del banco
+
+            for formato, caminho in (("json", arquivo), ("particionado", Path(pasta) / "catalogo")):
+                secao, duracao, memoria = medir(lambda: CatalogoStore(caminho).obter("pt"))
+                produtos = secao["produtos"]
+                inicio = time.perf_counter()
+                produtos[total - 1]
+                primeiro = (time.perf_counter() - inicio) * 1e6
+                acesso = tempo(lambda i: produtos[(total - 1 - i) % total]["preco"])
+                print(f"{total:>9} {formato:<12} {tamanho_disco(caminho) / 2**20:>10.1f} {duracao * 1000:>9.1f} "
+                      f"{memoria / 2**20:>12.1f} {primeiro:>13.1f} {acesso:>10.2f}")
+                del secao, produtos
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import time
+
+from benchmarks.corpus import MENSAGENS
+from src.chatbot import ChatSession, detectar_idioma, detectar_idioma_sessao
+from src.idioma import detectar_por_ngramas
+
+
+def avaliar(nome, detector, repeticoes):
+    detector(MENSAGENS[0]["texto"])
+    acertos = sum(detector(m["texto"]) == m["lang"] for m in MENSAGENS)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for m in MENSAGENS:
+            detector(m["texto"])
+    por_msg = (time.perf_counter() - inicio) / (repeticoes * len(MENSAGENS)) * 1e6
+    print(f"{nome:<28} acurácia {acertos / len(MENSAGENS):6.1%}   {por_msg:8.1f} us/msg")
+
+
+def main():
+    session = ChatSession()
+    print(f"{len(MENSAGENS)} mensagens rotuladas")
+    avaliar("palavras + langdetect", lambda t: detectar_idioma(t, usar_langdetect=True), 5)
+    avaliar("palavras + n-gramas", lambda t: detectar_idioma(t, usar_langdetect=False), 200)
+    avaliar("somente n-gramas", lambda t: detectar_por_ngramas(t.lower()), 200)
+    avaliar("sessão (LRU)", lambda t: detectar_idioma_sessao(t, session), 200)
+
+
+if __name__ == "__main__":
+    main()
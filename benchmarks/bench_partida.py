@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.catalogo_sintetico import banco_sintetico
+from src.catalogo import caminho_bd
+from src.catalogo_compilado import compilar
+
+RAIZ = Path(__file__).resolve().parent.parent
+DEPENDENCIAS = ["groq", "httpx", "langdetect"]
+MENSAGEM = "quais as formas de pagamento?"
+
+FILHO = """
+import json, sys, time
+inicio = time.perf_counter()
+for nome in {antecipar!r}:
+    __import__(nome)
+import src.chatbot as chatbot
+importado = time.perf_counter()
+chatbot.processar_mensagem_total({mensagem!r}, "", chatbot.ChatSession())
+respondido = time.perf_counter()
+print(json.dumps({{
+    "importar": importado - inicio,
+    "primeira": respondido - inicio,
+    "carregadas": [nome for nome in {dependencias!r} if nome in sys.modules],
+}}))
+"""
+
+CENARIOS = [
+    ("importação ansiosa + json", DEPENDENCIAS, "0"),
+    ("importação tardia + json", [], "0"),
+    ("importação tardia + compilado", [], "1"),
+]
+
+
+def rodar(catalogo, antecipar, compilado):
+    ambiente = dict(
+        os.environ,
+        LUMINA_CATALOGO=str(catalogo),
+        LUMINA_CATALOGO_COMPILADO=compilado,
+        LUMINA_CACHE_RESPOSTAS="",
+        LUMINA_CEP_CACHE="",
+        PYTHONPATH=str(RAIZ),
+    )
+    codigo = FILHO.format(antecipar=antecipar, mensagem=MENSAGEM, dependencias=DEPENDENCIAS)
+    saida = subprocess.run([sys.executable, "-c", codigo], env=ambiente, cwd=RAIZ, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação e da primeira resposta em um processo novo.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[0, 10_000, 100_000],
+                        help="produtos do catálogo sintético; 0 usa o data/bd.json")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'produtos':>9} {'cenário':<31} {'importar ms':>12} {'1ª resposta ms':>15}  dependências carregadas")
+    with tempfile.TemporaryDirectory() as pasta:
+        for total in args.tamanhos:
+            catalogo = Path(pasta) / f"bd-{total}.json"
+            if total:
+                catalogo.write_text(json.dumps(banco_sintetico(total), ensure_ascii=False), encoding="utf-8")
+            else:
+                catalogo.write_bytes(caminho_bd.read_bytes())
+            compilar(catalogo)
+
+            for nome, antecipar, compilado in CENARIOS:
+                medidas = [rodar(catalogo, antecipar, compilado) for _ in range(args.repeticoes)]
+                importar = statistics.median(m["importar"] for m in medidas) * 1000
+                primeira = statistics.median(m["primeira"] for m in medidas) * 1000
+                carregadas = ", ".join(medidas[-1]["carregadas"]) or "-"
+                print(f"{total or 11:>9} {nome:<31} {importar:>12.1f} {primeira:>15.1f}  {carregadas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import MENSAGENS
+from src.chatbot import ChatSession, processar_mensagem_total
+from src.perfil import perfilador
+
+MODOS = [
+    ("desligado", False, 0.0, 0),
+    ("amostra 1/100", True, 0.0, 100),
+    ("limiar 1 s", True, 1.0, 0),
+]
+
+
+def rodada(textos, repeticoes):
+    duracoes = []
+    for _ in range(repeticoes):
+        for texto in textos:
+            inicio = time.perf_counter()
+            processar_mensagem_total(texto, "", ChatSession())
+            duracoes.append(time.perf_counter() - inicio)
+    duracoes.sort()
+    return statistics.fmean(duracoes) * 1e6, duracoes[len(duracoes) // 2] * 1e6, duracoes[int(len(duracoes) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo por turno do perfilador desligado, amostrando e sempre ativo.")
+    parser.add_argument("--repeticoes", type=int, default=30)
+    args = parser.parse_args()
+
+    textos = [m["texto"] for m in MENSAGENS if m["ramo"] not in ("llm", "cep")]
+    rodada(textos, 1)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        perfilador.pasta = Path(pasta)
+        print(f"{'modo':<15} {'média us':>9} {'p50 us':>8} {'p99 us':>8} {'perfis':>7}")
+        for nome, ativo, limiar, amostra in MODOS:
+            perfilador.ativar(ativo, limiar, amostra)
+            perfilador.salvos = 0
+            media, p50, p99 = rodada(textos, args.repeticoes)
+            print(f"{nome:<15} {media:>9.1f} {p50:>8.1f} {p99:>8.1f} {perfilador.salvos:>7}")
+        perfilador.ativar(False)
+
+
+if __name__ == "__main__":
+    main()
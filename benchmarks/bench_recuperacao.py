@@ -0,0 +1,115 @@
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.corpus import MENSAGENS
+from src import chatbot
+from src.catalogo import catalogo_padrao
+from src.chatbot import ChatSession, analisar_mensagem, rotear
+from src.recuperacao import MIN_TERMOS_RECUPERACAO, IndiceRecuperacao
+
+VALIDACAO = [
+    ("pt", "vocês fazem entrega para o nordeste?", "frete"),
+    ("pt", "em quantos dias recebo?", "frete"),
+    ("pt", "dá para devolver se não servir?", "troca"),
+    ("pt", "posso trocar por outra cor?", "troca"),
+    ("pt", "cadê meu pedido?", "rastrear"),
+    ("pt", "como rastreio a encomenda?", "rastrear"),
+    ("pt", "aceitam mastercard?", "cartão"),
+    ("pt", "parcelam em quantas vezes?", "cartão"),
+    ("pt", "quais meios de pagamento vocês aceitam?", "pagamento"),
+    ("pt", "tem algum cupom?", "promoções"),
+    ("pt", "o que está em oferta?", "promoções"),
+    ("pt", "que tamanho eu uso com 1,75 m?", "tabela de medidas"),
+    ("pt", "abrem que horas?", "horário"),
+    ("pt", "como falo com alguém da loja?", "suporte"),
+    ("pt", "qual o whatsapp?", "suporte"),
+    ("en", "how much is delivery?", "frete"),
+    ("en", "do you ship nationwide?", "frete"),
+    ("en", "can I send it back?", "troca"),
+    ("en", "how do refunds work?", "troca"),
+    ("en", "where's my parcel?", "rastrear"),
+    ("en", "do you accept mastercard?", "cartão"),
+    ("en", "what are the ways to pay?", "pagamento"),
+    ("en", "any coupons available?", "promoções"),
+    ("en", "what's on sale?", "promoções"),
+    ("en", "what size fits me?", "tabela de medidas"),
+    ("en", "what are your business hours?", "horário"),
+    ("en", "how can I contact support?", "suporte"),
+    ("en", "phone number?", "suporte"),
+]
+
+NEGATIVAS = [
+    ("pt", "oi"), ("pt", "obrigado"), ("pt", "tudo bem?"), ("pt", "quem é você?"), ("pt", "me conta uma piada"),
+    ("pt", "qual a capital da frança?"), ("pt", "a loja tem estacionamento?"), ("pt", "vocês têm loja física?"),
+    ("en", "good night"), ("en", "you are awesome"), ("en", "write me a poem"), ("en", "who won the game"),
+    ("en", "what's the weather like"), ("en", "do you have a store in Rio?"), ("en", "can I buy a gift card?"),
+    ("pt", "como cancelo meu pedido?"), ("pt", "posso mudar o endereço de entrega?"), ("pt", "posso alterar meu pedido?"),
+    ("pt", "vocês têm programa de fidelidade?"), ("pt", "vocês fazem roupa sob medida?"), ("pt", "qual o cnpj da empresa?"),
+    ("pt", "vocês vendem no atacado?"), ("en", "how do I cancel my order?"), ("en", "can I change my delivery address?"),
+    ("en", "should I buy now or wait?"), ("en", "what stocks should I buy"), ("en", "do you offer gift wrapping?"),
+    ("en", "can I pick up my order in person?"), ("en", "is this brand sustainable?"), ("en", "how do I delete my account?"),
+    ("en", "are your clothes vegan?"), ("en", "the order"), ("en", "my order"), ("pt", "o pedido"), ("pt", "meu pedido"),
+    ("pt", "a entrega"), ("en", "the delivery"), ("en", "the size"), ("pt", "o tamanho"), ("en", "the card"),
+    ("en", "your number"), ("en", "the time"), ("en", "the payment"),
+]
+
+LIMIARES = [0.4, 0.45, 0.5, 0.55, 0.6]
+
+
+def rotas(mensagens, recuperacao):
+    anterior = chatbot.RECUPERACAO_LOCAL
+    chatbot.RECUPERACAO_LOCAL = recuperacao
+    try:
+        return Counter(rotear(analisar_mensagem(m["texto"]), ChatSession())[0] for m in mensagens)
+    finally:
+        chatbot.RECUPERACAO_LOCAL = anterior
+
+
+def latencias(funcao, consultas, repeticoes):
+    duracoes = []
+    for _ in range(repeticoes):
+        for consulta in consultas:
+            inicio = time.perf_counter()
+            funcao(consulta)
+            duracoes.append(time.perf_counter() - inicio)
+    duracoes.sort()
+    return duracoes[len(duracoes) // 2] * 1e6, duracoes[int(len(duracoes) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Respostas de política resolvidas sem LLM pelo índice de recuperação local.")
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    indices = {}
+    print(f"{'idioma':<7} {'linhas':>7} {'colunas':>8} {'índice ms':>10} {'p50 us':>8} {'p99 us':>8}")
+    for lang in ("pt", "en"):
+        inicio = time.perf_counter()
+        indice = indices[lang] = IndiceRecuperacao(catalogo_padrao.obter(lang))
+        construcao = (time.perf_counter() - inicio) * 1e3
+        consultas = [texto for l, texto, _ in VALIDACAO if l == lang] + [texto for l, texto in NEGATIVAS if l == lang]
+        p50, p99 = latencias(indice.buscar, consultas, args.repeticoes)
+        print(f"{lang:<7} {len(indice):>7} {len(indice.colunas):>8} {construcao:>10.1f} {p50:>8.1f} {p99:>8.1f}")
+
+    print(f"\nvalidação: {len(VALIDACAO)} perguntas de política fora das paráfrases, {len(NEGATIVAS)} que devem ir ao LLM")
+    print(f"mínimo de {MIN_TERMOS_RECUPERACAO} palavras de conteúdo por pergunta")
+    print(f"{'limiar':>7} {'certas':>7} {'erradas':>8} {'ao LLM':>7} {'falsos positivos':>17}")
+    for limiar in LIMIARES:
+        obtidas = [(indices[lang].responder(texto, limiar), chave) for lang, texto, chave in VALIDACAO]
+        respondidas = [(obtida, chave) for obtida, chave in obtidas if obtida is not None]
+        certas = sum(obtida == chave for obtida, chave in respondidas)
+        falsos = sum(indices[lang].responder(texto, limiar) is not None for lang, texto in NEGATIVAS)
+        print(f"{limiar:>7.2f} {certas:>7} {len(respondidas) - certas:>8} {len(obtidas) - len(respondidas):>7} "
+              f"{falsos:>17}")
+
+    sem, com = rotas(MENSAGENS, False), rotas(MENSAGENS, True)
+    total = len(MENSAGENS)
+    print(f"\ncorpus: {total} mensagens")
+    print(f"  sem recuperação: {sem['llm']:>4} ao LLM, {(total - sem['llm']) / total:.0%} resolvidas localmente")
+    print(f"  com recuperação: {com['llm']:>4} ao LLM, {(total - com['llm']) / total:.0%} resolvidas localmente")
+    print(f"  chamadas ao LLM evitadas: {sem['llm'] - com['llm']}")
+
+
+if __name__ == "__main__":
+    main()
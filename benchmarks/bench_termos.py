@@ -0,0 +1,57 @@
+import re
+import sys
+import time
+
+from benchmarks.catalogo_sintetico import catalogo_sintetico
+from src.chatbot import ChatSession, assunto_relacionado_loja, buscar_produto_msg
+
+MENSAGENS = [
+    "tem camiseta?",
+    "quanto custa a jaqueta corta-vento?",
+    "qual o frete para 01001-000?",
+    "quero 2 mochilas pretas",
+    "Who won the game yesterday?",
+    "bom dia, quais formas de pagamento?",
+]
+
+
+def _contem_termo_antigo(texto, termo):
+    return re.search(rf"(?<!\w){re.escape(termo.lower())}(?!\w)", texto) is not None
+
+
+def _busca_linear(msg, bd_idioma):
+    msg_l = msg.lower()
+    for p in bd_idioma["produtos"]:
+        if _contem_termo_antigo(msg_l, p["nome"].lower()) or any(
+            _contem_termo_antigo(msg_l, c) for c in p.get("categorias", [])
+        ):
+            return p
+    return None
+
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for msg in MENSAGENS:
+            funcao(msg)
+    return (time.perf_counter() - inicio) / (repeticoes * len(MENSAGENS)) * 1e6
+
+
+def main(tamanhos=(11, 1_000, 10_000, 50_000)):
+    print(f"{'produtos':>9} {'linear (us/msg)':>16} {'indice (us/msg)':>16}")
+    for total in tamanhos:
+        bd = catalogo_sintetico(total)
+        session = ChatSession()
+        assunto_relacionado_loja("aquecimento", bd, session)
+
+        def indexado(msg):
+            assunto_relacionado_loja(msg, bd, session)
+            buscar_produto_msg(msg, bd, session)
+
+        repeticoes = max(1, 2_000 // total)
+        linear = medir(lambda msg: _busca_linear(msg, bd), repeticoes) if total <= 10_000 else float("nan")
+        print(f"{total:>9} {linear:>16.1f} {medir(indexado, 200):>16.1f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(n) for n in sys.argv[1:]) or (11, 1_000, 10_000, 50_000))
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+import flet as ft
+import msgpack
+from flet.controls.base_control import BaseControl
+from flet.messaging.connection import Connection
+from flet.messaging.protocol import configure_encode_object_for_msgpack
+from flet.messaging.session import Session
+from flet.pubsub.pubsub_hub import PubSubHub
+
+from src.app import HistoricoChat, criar_bolha_mensagem
+
+CODIFICAR = configure_encode_object_for_msgpack(BaseControl)
+PARTES_STREAM = 5
+
+
+class ConexaoContadora(Connection):
+    def __init__(self):
+        super().__init__()
+        self.mensagens = 0
+        self.bytes = 0
+
+    def send_message(self, message):
+        self.mensagens += 1
+        self.bytes += len(msgpack.packb([message.action, message.body], default=CODIFICAR))
+
+
+def abrir_pagina():
+    conexao = ConexaoContadora()
+    conexao.loop = asyncio.get_running_loop()
+    conexao.pubsubhub = PubSubHub()
+    sessao = Session(conexao)
+    msgpack.packb(sessao.get_page_patch(), default=CODIFICAR)
+    return conexao, sessao
+
+
+def texto_mensagem(n):
+    if n % 2 == 0:
+        return f"Mensagem {n}: tem camiseta preta no tamanho M?"
+    return f"**Resposta {n}**\n\n- Camiseta Básica: R$ 59,90\n- Tamanhos: P, M, G\n\nPosso ajudar em algo mais?"
+
+
+def autor_mensagem(n):
+    return "usuario" if n % 2 == 0 else "bot"
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def relatorio(nome, total, duracoes, conexao, memoria, vivas):
+    ordenados = sorted(duracoes)
+    print(
+        f"{nome:<34} {total:>6} msgs   p50 {percentil(ordenados, 50) * 1000:7.2f} ms   "
+        f"p99 {percentil(ordenados, 99) * 1000:7.2f} ms   ultima {duracoes[-1] * 1000:7.2f} ms   "
+        f"{conexao.bytes / total / 1024:6.1f} KiB/msg   {vivas:>5} controles"
+        + (f"   {memoria / 2**20:6.1f} MiB" if memoria else "")
+    )
+
+
+async def coluna_antiga(total, memoria):
+    gc.collect()
+    if memoria:
+        tracemalloc.start()
+    conexao, sessao = abrir_pagina()
+    page = sessao.page
+    chat = ft.Column(expand=True, scroll="adaptive", spacing=10)
+    page.add(chat)
+    conexao.bytes = 0
+
+    duracoes = []
+    for n in range(total):
+        chat.controls.append(criar_bolha_mensagem(texto_mensagem(n), autor_mensagem(n)))
+        inicio = time.perf_counter()
+        page.update()
+        duracoes.append(time.perf_counter() - inicio)
+
+    alocado = tracemalloc.get_traced_memory()[0] if memoria else 0
+    tracemalloc.stop()
+    relatorio("Column + page.update()", total, duracoes, conexao, alocado, len(chat.controls))
+
+
+async def historico_virtualizado(total, memoria):
+    gc.collect()
+    if memoria:
+        tracemalloc.start()
+    conexao, sessao = abrir_pagina()
+    page = sessao.page
+    historico = HistoricoChat()
+    page.add(historico.lista)
+    conexao.bytes = 0
+
+    duracoes = []
+    streaming = []
+    for n in range(total):
+        autor = autor_mensagem(n)
+        texto = texto_mensagem(n)
+        inicio = time.perf_counter()
+        indice, bolha = historico.adicionar(texto if autor == "usuario" else "", autor)
+        historico.lista.update()
+        duracoes.append(time.perf_counter() - inicio)
+
+        if autor == "bot":
+            passo = len(texto) // PARTES_STREAM + 1
+            for fim in range(passo, len(texto) + passo, passo):
+                inicio = time.perf_counter()
+                historico.atualizar(indice, bolha, texto[:fim])
+                bolha.controls[0].content.update()
+                streaming.append(time.perf_counter() - inicio)
+
+    alocado = tracemalloc.get_traced_memory()[0] if memoria else 0
+    relatorio("ListView virtualizado", total, duracoes, conexao, alocado, len(historico.lista.controls))
+
+    ordenados = sorted(streaming)
+    print(
+        f"{'  atualização de streaming':<34} {len(streaming):>6} parts  "
+        f"p50 {percentil(ordenados, 50) * 1000:7.2f} ms   p99 {percentil(ordenados, 99) * 1000:7.2f} ms"
+    )
+
+    paginas = 0
+    inicio = time.perf_counter()
+    while historico.transcricao.ocultas and paginas < 5:
+        historico.carregar_anteriores()
+        paginas += 1
+    duracao = (time.perf_counter() - inicio) / max(1, paginas)
+    tracemalloc.stop()
+    print(
+        f"{'  carregar anteriores':<34} {paginas:>6} págs   {duracao * 1000:7.2f} ms/pág   "
+        f"{historico.transcricao.ocultas} ainda ocultas de {len(historico.transcricao)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência e memória do histórico do chat com Flet sem interface.")
+    parser.add_argument("--mensagens", type=int, default=5000)
+    parser.add_argument("--mensagens-antigo", type=int, default=1000)
+    parser.add_argument("--memoria", action="store_true", help="mede a memória com tracemalloc (a latência fica inflada)")
+    args = parser.parse_args()
+
+    asyncio.run(coluna_antiga(args.mensagens_antigo, args.memoria))
+    asyncio.run(historico_virtualizado(args.mensagens, args.memoria))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import time
+
+from benchmarks.catalogo_sintetico import catalogo_sintetico
+from src.chatbot import ChatSession, analisar_mensagem, rotear
+from src.vitrine import vitrine_catalogo
+
+
+def lista_antiga(bd_idioma, lang="pt"):
+    produtos = bd_idioma.get("produtos", [])
+    moeda = "R$" if lang == "pt" else "$"
+    linhas = ["### Produtos disponíveis" if lang == "pt" else "### Available products"]
+    for produto in produtos:
+        preco = f"{moeda} {produto['preco']:.2f}".replace(".", ",") if lang == "pt" else f"{moeda}{produto['preco']:.2f}"
+        linhas.append(f"- {produto['emoji']} {produto['nome']} - {preco}")
+    return "\n".join(linhas)
+
+
+def cartao_antigo(produto, quantidade=1, lang="pt"):
+    total = produto['preco'] * quantidade
+    moeda = "R$" if lang == "pt" else "$"
+    preco = f"{moeda} {produto['preco']:.2f}".replace(".", ",") if lang == "pt" else f"{moeda}{produto['preco']:.2f}"
+    total_formatado = f"{moeda} {total:.2f}".replace(".", ",") if lang == "pt" else f"{moeda}{total:.2f}"
+    msg = f"### {produto['emoji']} {produto['nome']}\n\n- Preço: {preco}"
+    if quantidade > 1:
+        msg += f"\n- {'Total para' if lang == 'pt' else 'Total for'} {quantidade} {'unidades' if lang == 'pt' else 'units'}: {total_formatado}"
+    msg += f"\n- {'Descrição' if lang == 'pt' else 'Description'}: {produto['descricao']}"
+    return msg
+
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6, len(resultado)
+
+
+def turno(bd, msg, session):
+    return rotear(analisar_mensagem(msg, bd, "pt", session), session)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo da listagem e dos cartões de produto por tamanho de catálogo.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[11, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'produtos':>9} {'lista antiga us':>16} {'chars':>9} {'página us':>10} {'chars':>6} "
+          f"{'cartão antigo us':>17} {'cartão us':>10} {'turno lista us':>15} {'próx. pág. us':>14} {'filtro us':>10}")
+    for total in args.tamanhos:
+        bd = catalogo_sintetico(total)
+        session = ChatSession()
+        turno(bd, "quais produtos?", session)
+        turno(bd, "mostrar tênis", session)
+
+        repeticoes_antigas = max(1, args.repeticoes * 100 // total)
+        vitrine = vitrine_catalogo(bd, "pt")
+        antiga, chars_antiga = medir(lambda: lista_antiga(bd, "pt"), repeticoes_antigas)
+        pagina, chars_pagina = medir(lambda: vitrine.pagina(1)[0], args.repeticoes)
+        produto = bd["produtos"][total // 2]
+        cartao_velho, _ = medir(lambda: cartao_antigo(produto, 3, "pt"), args.repeticoes)
+        cartao, _ = medir(lambda: vitrine.cartao(total // 2, 3), args.repeticoes)
+        lista, _ = medir(lambda: turno(bd, "quais produtos?", session), args.repeticoes)
+        proxima, _ = medir(lambda: turno(bd, "próxima página", session), args.repeticoes)
+        filtro, _ = medir(lambda: turno(bd, "mostrar tênis", session), args.repeticoes)
+
+        print(f"{total:>9} {antiga:>16.1f} {chars_antiga:>9} {pagina:>10.1f} {chars_pagina:>6} "
+              f"{cartao_velho:>17.1f} {cartao:>10.1f} {lista:>15.1f} {proxima:>14.1f} {filtro:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
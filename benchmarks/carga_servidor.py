@@ -0,0 +1,93 @@
+import argparse
+import http.client
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.corpus import MENSAGENS
+from benchmarks.fakes import groq_falso, viacep_falso
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def cliente(porta, rota, sessao, total, latencias, erros):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+    for i in range(total):
+        texto = MENSAGENS[(sessao * 7 + i) % len(MENSAGENS)]["texto"]
+        corpo = json.dumps({"sessao": f"carga-{sessao}", "mensagem": texto})
+        inicio = time.perf_counter()
+        try:
+            conexao.request("POST", rota, corpo, {"Content-Type": "application/json"})
+            resposta = conexao.getresponse()
+            resposta.read()
+            if resposta.status != 200:
+                erros.append(resposta.status)
+                continue
+        except (OSError, http.client.HTTPException) as erro:
+            erros.append(type(erro).__name__)
+            conexao.close()
+            conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+    conexao.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor HTTP com Groq e ViaCEP falsos.")
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--requisicoes", type=int, default=50, help="requisições por cliente")
+    parser.add_argument("--latencia-groq", type=float, default=0.05)
+    parser.add_argument("--latencia-cep", type=float, default=0.02)
+    parser.add_argument("--stream", action="store_true", help="usa /chat/stream em vez de /chat")
+    args = parser.parse_args(argv)
+
+    with groq_falso(args.latencia_groq) as groq, viacep_falso(args.latencia_cep) as viacep, \
+            tempfile.TemporaryDirectory() as pasta:
+        os.environ["GROQ_BASE_URL"] = groq.url
+        os.environ["LUMINA_VIACEP_URL"] = viacep.url + "/ws/{cep}/json/"
+        os.environ["LUMINA_CEP_CACHE"] = os.path.join(pasta, "cep.sqlite3")
+
+        from src.servidor import criar_servidor
+
+        servidor = criar_servidor("127.0.0.1", 0, api_key="gsk_carga")
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        porta = servidor.server_address[1]
+        rota = "/chat/stream" if args.stream else "/chat"
+
+        latencias, erros = [], []
+        threads = [
+            threading.Thread(target=cliente, args=(porta, rota, i, args.requisicoes, latencias, erros))
+            for i in range(args.clientes)
+        ]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        servidor.shutdown()
+        servidor.server_close()
+
+    print(f"rota {rota}   {args.clientes} clientes x {args.requisicoes} requisições")
+    print(f"latência falsa: groq {args.latencia_groq * 1000:.0f} ms, viacep {args.latencia_cep * 1000:.0f} ms")
+    print(f"concluídas {len(latencias)}   erros {len(erros)}   sessões {len(servidor.sessoes)}")
+    print(f"vazão {len(latencias) / duracao:8.1f} req/s")
+    if latencias:
+        print(
+            f"latência  p50 {percentil(latencias, 50) * 1000:7.1f} ms   "
+            f"p99 {percentil(latencias, 99) * 1000:7.1f} ms   "
+            f"média {statistics.fmean(latencias) * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
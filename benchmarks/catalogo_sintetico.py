@@ -0,0 +1,35 @@
+import random
+
+from src.catalogo import SecaoCatalogo, catalogo_padrao
+
+ADJETIVOS = ["urban", "classic", "street", "floral", "oversized", "cargo", "slim", "vintage", "sport", "basic"]
+PECAS = ["camiseta", "jaqueta", "mochila", "vestido", "boné", "calça", "tênis", "colar", "pulseira", "brinco"]
+CORES = ["Preto", "Branco", "Azul", "Vermelho", "Verde", "Rosa", "Cinza", "Bege"]
+
+
+def produto_sintetico(i, aleatorio):
+    peca = aleatorio.choice(PECAS)
+    adjetivo = aleatorio.choice(ADJETIVOS)
+    return {
+        "nome": f"{peca.title()} {adjetivo.title()} {i:05d}",
+        "preco": round(aleatorio.uniform(20, 400), 2),
+        "emoji": "🛍️",
+        "cores": aleatorio.sample(CORES, 3),
+        "categorias": [peca, f"linha-{i % 500}"],
+        "descricao": f"{peca.title()} {adjetivo} da linha {i % 500}, produto sintético número {i}.",
+    }
+
+
+def catalogo_sintetico(total, lang="pt", semente=0):
+    aleatorio = random.Random(semente)
+    secao = dict(catalogo_padrao.obter(lang))
+    secao["produtos"] = tuple(produto_sintetico(i, aleatorio) for i in range(total))
+    return SecaoCatalogo(secao)
+
+
+def banco_sintetico(total, semente=0):
+    banco = {}
+    for lang in ("pt", "en"):
+        secao = banco[lang] = dict(catalogo_sintetico(total, lang, semente))
+        secao["produtos"] = list(secao["produtos"])
+    return banco
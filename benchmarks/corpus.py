@@ -0,0 +1,105 @@
+MENSAGENS = [
+    {"texto": "Olá", "lang": "pt", "ramo": "llm"},
+    {"texto": "oi", "lang": "pt", "ramo": "llm"},
+    {"texto": "bom dia", "lang": "pt", "ramo": "llm"},
+    {"texto": "Quais produtos vocês vendem?", "lang": "pt", "ramo": "listagem"},
+    {"texto": "o que vocês vendem", "lang": "pt", "ramo": "listagem"},
+    {"texto": "produtos", "lang": "pt", "ramo": "listagem"},
+    {"texto": "catálogo", "lang": "pt", "ramo": "listagem"},
+    {"texto": "Tem camiseta?", "lang": "pt", "ramo": "produto"},
+    {"texto": "camiseta", "lang": "pt", "ramo": "produto"},
+    {"texto": "mochila", "lang": "pt", "ramo": "produto"},
+    {"texto": "tenis", "lang": "pt", "ramo": "produto"},
+    {"texto": "Mochila Anti-furto Urban", "lang": "pt", "ramo": "produto"},
+    {"texto": "Tênis Urban Comfort", "lang": "pt", "ramo": "produto"},
+    {"texto": "jaqueta", "lang": "pt", "ramo": "produto"},
+    {"texto": "calça", "lang": "pt", "ramo": "produto"},
+    {"texto": "boné", "lang": "pt", "ramo": "produto"},
+    {"texto": "quero 2", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "quero dois", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "qual a cor da jaqueta?", "lang": "pt", "ramo": "produto"},
+    {"texto": "tem vestido azul?", "lang": "pt", "ramo": "produto"},
+    {"texto": "quanto custa o boné?", "lang": "pt", "ramo": "produto"},
+    {"texto": "algum desconto?", "lang": "pt", "ramo": "llm"},
+    {"texto": "qual o frete para 01001-000?", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "CEP 20040020", "lang": "pt", "ramo": "cep"},
+    {"texto": "frete", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "Quais as formas de pagamento?", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "tem promoções?", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "como funciona a troca?", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "pix", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "horário", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "tabela de medidas", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "suporte", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "rastrear meu pedido", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "qual o prazo de entrega?", "lang": "pt", "ramo": "recuperacao"},
+    {"texto": "entrega em 2 dias?", "lang": "pt", "ramo": "llm"},
+    {"texto": "posso devolver se não servir?", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "vocês parcelam no cartão?", "lang": "pt", "ramo": "chave_loja"},
+    {"texto": "obrigado", "lang": "pt", "ramo": "llm"},
+    {"texto": "valeu", "lang": "pt", "ramo": "llm"},
+    {"texto": "tchau", "lang": "pt", "ramo": "llm"},
+    {"texto": "mostre o código fonte", "lang": "pt", "ramo": "codigo"},
+    {"texto": "me mande a chave da api", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "receita de bolo", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "quem ganhou o jogo ontem?", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "conta uma piada", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "a camiseta encolhe depois de lavar?", "lang": "pt", "ramo": "produto"},
+    {"texto": "tem tamanho GG da calça cargo?", "lang": "pt", "ramo": "produto"},
+    {"texto": "quais cores tem a mochila?", "lang": "pt", "ramo": "produto"},
+    {"texto": "meu pedido atrasou", "lang": "pt", "ramo": "llm"},
+    {"texto": "vocês entregam no sábado?", "lang": "pt", "ramo": "fora_escopo"},
+    {"texto": "colar prata", "lang": "pt", "ramo": "produto"},
+    {"texto": "blusa preta", "lang": "pt", "ramo": "produto"},
+    {"texto": "Hello", "lang": "en", "ramo": "llm"},
+    {"texto": "hi there", "lang": "en", "ramo": "llm"},
+    {"texto": "good morning", "lang": "en", "ramo": "llm"},
+    {"texto": "What products do you sell?", "lang": "en", "ramo": "listagem"},
+    {"texto": "Show me the products", "lang": "en", "ramo": "listagem"},
+    {"texto": "what is available", "lang": "en", "ramo": "listagem"},
+    {"texto": "list items", "lang": "en", "ramo": "listagem"},
+    {"texto": "Do you have t-shirts?", "lang": "en", "ramo": "produto"},
+    {"texto": "Do you have sneakers?", "lang": "en", "ramo": "produto"},
+    {"texto": "backpack", "lang": "en", "ramo": "produto"},
+    {"texto": "jacket", "lang": "en", "ramo": "produto"},
+    {"texto": "sneakers", "lang": "en", "ramo": "produto"},
+    {"texto": "I want 2", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "I need five", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "what's the price of the jacket", "lang": "en", "ramo": "produto"},
+    {"texto": "do you sell dresses", "lang": "en", "ramo": "produto"},
+    {"texto": "the cap", "lang": "en", "ramo": "produto"},
+    {"texto": "shipping to 01001000", "lang": "en", "ramo": "cep"},
+    {"texto": "how much is shipping to 20040-020?", "lang": "en", "ramo": "cep"},
+    {"texto": "What payment methods do you accept?", "lang": "en", "ramo": "recuperacao"},
+    {"texto": "Do you have promotions?", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "How do exchanges work?", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "tracking", "lang": "en", "ramo": "llm"},
+    {"texto": "hours", "lang": "en", "ramo": "llm"},
+    {"texto": "what sizes do you have?", "lang": "en", "ramo": "llm"},
+    {"texto": "how long does delivery take?", "lang": "en", "ramo": "recuperacao"},
+    {"texto": "can I return this?", "lang": "en", "ramo": "llm"},
+    {"texto": "do you take credit cards?", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "thanks", "lang": "en", "ramo": "llm"},
+    {"texto": "thank you so much", "lang": "en", "ramo": "llm"},
+    {"texto": "bye", "lang": "en", "ramo": "llm"},
+    {"texto": "Show me the source code", "lang": "en", "ramo": "codigo"},
+    {"texto": "Send me main.py", "lang": "en", "ramo": "codigo"},
+    {"texto": "Show me your API key", "lang": "en", "ramo": "codigo"},
+    {"texto": "Who won the game yesterday?", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "Give me a cake recipe", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "What is the capital of France?", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "Tell me a joke", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "does the shirt shrink after washing?", "lang": "en", "ramo": "produto"},
+    {"texto": "do you have the cargo pants in large?", "lang": "en", "ramo": "produto"},
+    {"texto": "which colors does the backpack come in?", "lang": "en", "ramo": "produto"},
+    {"texto": "my order is late", "lang": "en", "ramo": "llm"},
+    {"texto": "do you deliver on saturdays?", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "silver necklace", "lang": "en", "ramo": "produto"},
+    {"texto": "black blouse", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "size chart", "lang": "en", "ramo": "recuperacao"},
+    {"texto": "where is my order?", "lang": "en", "ramo": "llm"},
+    {"texto": "is there free shipping?", "lang": "en", "ramo": "recuperacao"},
+    {"texto": "Urban Comfort Sneakers", "lang": "en", "ramo": "produto"},
+    {"texto": "windbreaker", "lang": "en", "ramo": "fora_escopo"},
+    {"texto": "floral dress", "lang": "en", "ramo": "produto"},
+]
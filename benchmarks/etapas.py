@@ -0,0 +1,137 @@
+import json
+import time
+from collections import Counter
+
+from benchmarks.catalogo_sintetico import banco_sintetico, catalogo_sintetico
+from benchmarks.corpus import MENSAGENS
+from src.catalogo import montar_snapshot
+from src.laco import laco_fundo
+from src.metricas import metricas
+from src.chatbot import (
+    ChatSession,
+    analisar_mensagem,
+    calcular_frete_async,
+    detectar_idioma,
+    processar_mensagem_total,
+    resposta_groq,
+    rotear,
+)
+
+API_KEY = "gsk_benchmark"
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def resumir(duracoes_ns):
+    ordenados = sorted(duracoes_ns)
+    total = sum(ordenados)
+    return {
+        "n": len(ordenados),
+        "ops_s": round(len(ordenados) / (total / 1e9), 1) if total else 0.0,
+        "p50_us": round(percentil(ordenados, 50) / 1000, 1),
+        "p90_us": round(percentil(ordenados, 90) / 1000, 1),
+        "p99_us": round(percentil(ordenados, 99) / 1000, 1),
+    }
+
+
+def cronometrar(funcao, argumentos, repeticoes):
+    duracoes = []
+    for _ in range(repeticoes):
+        for args in argumentos:
+            inicio = time.perf_counter_ns()
+            funcao(*args)
+            duracoes.append(time.perf_counter_ns() - inicio)
+    return resumir(duracoes)
+
+
+def conferir_rotulos():
+    erros = Counter()
+    for m in MENSAGENS:
+        ramo, _ = rotear(analisar_mensagem(m["texto"]), ChatSession())
+        if ramo != m["ramo"]:
+            erros[(m["ramo"], ramo)] += 1
+    return erros
+
+
+def _por_ramo(ramo):
+    return [m["texto"] for m in MENSAGENS if m["ramo"] == ramo]
+
+
+def etapas_mensagens(repeticoes):
+    textos = [m["texto"] for m in MENSAGENS]
+    analises = [analisar_mensagem(t) for t in textos]
+    resultados = {
+        "idioma": cronometrar(detectar_idioma, [(t,) for t in textos], repeticoes),
+        "analise": cronometrar(analisar_mensagem, [(t,) for t in textos], repeticoes),
+        "rotear": cronometrar(lambda a: rotear(a, ChatSession()), [(a,) for a in analises], repeticoes),
+        "frete": cronometrar(
+            lambda cep, lang: laco_fundo.executar(calcular_frete_async(cep, lang)),
+            [(a.cep, a.lang) for a in analises if a.cep],
+            repeticoes,
+        ),
+        "groq": cronometrar(
+            lambda t: resposta_groq(t, detectar_idioma(t), analisar_mensagem(t).bd_idioma, API_KEY, ChatSession()),
+            [(t,) for t in _por_ramo("llm")],
+            max(1, repeticoes // 10),
+        ),
+    }
+
+    resultados["e2e"] = cronometrar(
+        lambda t: processar_mensagem_total(t, API_KEY, ChatSession()),
+        [(t,) for t in textos],
+        max(1, repeticoes // 10),
+    )
+    for ramo in sorted({m["ramo"] for m in MENSAGENS}):
+        resultados[f"e2e/{ramo}"] = cronometrar(
+            lambda t: processar_mensagem_total(t, API_KEY, ChatSession()),
+            [(t,) for t in _por_ramo(ramo)],
+            max(1, repeticoes // 10),
+        )
+    return resultados
+
+
+def etapas_catalogo(tamanhos, repeticoes):
+    textos = [m["texto"] for m in MENSAGENS]
+    resultados = {}
+    for total in tamanhos:
+        bruto = json.dumps(banco_sintetico(total), ensure_ascii=False)
+        resultados[f"carregar_bd/{total}"] = cronometrar(
+            lambda: montar_snapshot(json.loads(bruto), 1, None), [()], max(1, min(repeticoes, 200_000 // total))
+        )
+
+        bd = catalogo_sintetico(total)
+        analisar_mensagem(textos[0], bd, "pt")
+        resultados[f"analise/{total}"] = cronometrar(
+            lambda t: analisar_mensagem(t, bd, detectar_idioma(t)), [(t,) for t in textos], repeticoes
+        )
+    return resultados
+
+
+def sobrecarga_metricas(repeticoes):
+    textos = [m["texto"] for m in MENSAGENS if m["ramo"] not in ("llm", "cep")]
+    argumentos = [(t,) for t in textos]
+    turno = lambda t: processar_mensagem_total(t, API_KEY, ChatSession())
+    ativo = metricas.ativo
+    try:
+        metricas.ativar(False)
+        desligadas = cronometrar(turno, argumentos, repeticoes)
+        metricas.ativar(True)
+        ligadas = cronometrar(turno, argumentos, repeticoes)
+    finally:
+        metricas.ativar(ativo)
+        metricas.registro.limpar()
+    return {"e2e_local/metricas_off": desligadas, "e2e_local/metricas_on": ligadas}
+
+
+def comparar(atual, base, tolerancia):
+    linhas = []
+    for nome, medidas in atual.items():
+        anterior = base.get(nome)
+        if anterior is None or not anterior.get("p50_us"):
+            continue
+        variacao = medidas["p50_us"] / anterior["p50_us"] - 1
+        marca = "PIOROU" if variacao > tolerancia else "melhorou" if variacao < -tolerancia else ""
+        linhas.append((nome, anterior["p50_us"], medidas["p50_us"], variacao, marca))
+    return linhas
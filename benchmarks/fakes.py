@@ -0,0 +1,173 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPOSTA_LLM = "Posso ajudar com informações sobre a Lumina Style. Veja nossos produtos e políticas!"
+TAMANHO_PEDACO = 8
+
+
+class _ManipuladorFalso(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _enviar(self, corpo, tipo="application/json", status=200, cabecalhos=()):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in cabecalhos:
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class _ManipuladorGroq(_ManipuladorFalso):
+    def do_POST(self):
+        pedido = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))))
+        self.server.contar()
+        uso = {"prompt_tokens": 300, "completion_tokens": 20, "total_tokens": 320}
+        cabecalhos = []
+        if self.server.limite is not None:
+            aceito, cabecalhos = self.server.limite.consumir(self.headers.get("Authorization", ""), uso["total_tokens"])
+            if not aceito:
+                self.server.rejeitar()
+                corpo = json.dumps({"error": {"message": "rate limit simulado", "type": "tokens"}}).encode("utf-8")
+                self._enviar(corpo, status=429, cabecalhos=cabecalhos)
+                return
+        time.sleep(self.server.latencia)
+        if self.server.status_erro is not None:
+            corpo = json.dumps({"error": {"message": "falha simulada", "type": "fake"}}).encode("utf-8")
+            self._enviar(corpo, status=self.server.status_erro)
+            return
+        texto = self.server.resposta
+
+        if not pedido.get("stream"):
+            self._enviar(json.dumps({
+                "id": "fake", "object": "chat.completion", "created": 0, "model": pedido["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": texto}, "finish_reason": "stop"}],
+                "usage": uso,
+            }).encode("utf-8"), cabecalhos=cabecalhos)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for nome, valor in cabecalhos:
+            self.send_header(nome, valor)
+        self.end_headers()
+
+        def evento(dados):
+            linha = f"data: {dados}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(linha):x}\r\n".encode("ascii") + linha + b"\r\n")
+
+        for i in range(0, len(texto), TAMANHO_PEDACO):
+            evento(json.dumps({
+                "id": "fake", "object": "chat.completion.chunk", "created": 0, "model": pedido["model"],
+                "choices": [{"index": 0, "delta": {"content": texto[i:i + TAMANHO_PEDACO]}, "finish_reason": None}],
+            }))
+        evento(json.dumps({
+            "id": "fake", "object": "chat.completion.chunk", "created": 0, "model": pedido["model"],
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"id": "fake", "usage": uso},
+        }))
+        evento("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _ManipuladorViaCep(_ManipuladorFalso):
+    def do_GET(self):
+        self.server.contar()
+        time.sleep(self.server.latencia)
+        cep = self.path.strip("/").split("/")[1] if self.path.count("/") >= 2 else ""
+        if not cep.isdigit() or cep.startswith("99"):
+            dados = {"erro": True}
+        elif cep < "20000000":
+            dados = {"cep": cep, "uf": "SP", "localidade": "São Paulo"}
+        else:
+            dados = {"cep": cep, "uf": "RJ", "localidade": "Rio de Janeiro"}
+        self._enviar(json.dumps(dados, ensure_ascii=False).encode("utf-8"))
+
+
+class LimiteFalso:
+    def __init__(self, tokens, janela=1.0):
+        self.tokens = tokens
+        self.janela = janela
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    def consumir(self, chave, custo):
+        taxa = self.tokens / self.janela
+        with self._lock:
+            agora = time.monotonic()
+            nivel, antes = self._baldes.get(chave, (self.tokens, agora))
+            nivel = min(self.tokens, nivel + (agora - antes) * taxa)
+            aceito = nivel >= custo
+            if aceito:
+                nivel -= custo
+            self._baldes[chave] = (nivel, agora)
+
+        cabecalhos = [
+            ("x-ratelimit-limit-tokens", str(self.tokens)),
+            ("x-ratelimit-remaining-tokens", str(int(nivel))),
+            ("x-ratelimit-reset-tokens", f"{(self.tokens - nivel) / taxa:.3f}s"),
+        ]
+        if not aceito:
+            cabecalhos.append(("retry-after", f"{(custo - nivel) / taxa:.3f}"))
+        return aceito, cabecalhos
+
+
+class ServidorFalso(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, manipulador, latencia=0.0, resposta=RESPOSTA_LLM, limite=None):
+        super().__init__(("127.0.0.1", 0), manipulador)
+        self.latencia = latencia
+        self.resposta = resposta
+        self.limite = limite
+        self.pedidos = 0
+        self.conexoes = 0
+        self.rejeitados = 0
+        self.status_erro = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def contar(self):
+        with self._lock:
+            self.pedidos += 1
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.conexoes += 1
+        super().process_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        if not issubclass(sys.exc_info()[0], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def rejeitar(self):
+        with self._lock:
+            self.rejeitados += 1
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def groq_falso(latencia=0.0, resposta=RESPOSTA_LLM, limite=None):
+    return ServidorFalso(_ManipuladorGroq, latencia, resposta, limite)
+
+
+def viacep_falso(latencia=0.0):
+    return ServidorFalso(_ManipuladorViaCep, latencia)
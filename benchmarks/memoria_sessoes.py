@@ -0,0 +1,90 @@
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from src.catalogo import catalogo_padrao
+from src.chatbot import ChatSession
+from src.idioma import CacheIdioma
+from src.sessoes import GerenciadorSessoes
+
+
+@dataclass
+class SessaoAntiga:
+    ultimo_produto: dict | None = None
+    cache_idioma: CacheIdioma = field(default_factory=CacheIdioma)
+
+
+class RelogioManual:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def medir(nome, criar):
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    objetos = criar()
+    duracao = time.perf_counter() - inicio
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nome:<44} {atual / 2**20:8.1f} MiB   {duracao:6.2f} s")
+    return objetos
+
+
+def sessoes_antigas(total, bd_idioma):
+    sessoes = {}
+    for i in range(total):
+        session = sessoes[f"sessao-{i}"] = SessaoAntiga()
+        session.ultimo_produto = dict(bd_idioma["produtos"][i % len(bd_idioma["produtos"])])
+    return sessoes
+
+
+def sessoes_novas(gerenciador, total, bd_idioma, inicio=0):
+    for i in range(inicio, inicio + total):
+        session = gerenciador.obter(f"sessao-{i}").session
+        session.lembrar_produto(bd_idioma, i % len(bd_idioma["produtos"]), "pt")
+    return gerenciador
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memória de sessões ociosas: dataclass antiga x gerenciador.")
+    parser.add_argument("--sessoes", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    bd_idioma = catalogo_padrao.obter("pt")
+    total = args.sessoes
+    print(f"{total} sessões ociosas com um produto em contexto")
+
+    medir("dict + dataclass (produto copiado)", lambda: sessoes_antigas(total, bd_idioma))
+    ilimitado = medir(
+        "GerenciadorSessoes sem limite",
+        lambda: sessoes_novas(GerenciadorSessoes(max_sessoes=total * 10, ttl_ocioso=1e9), total, bd_idioma),
+    )
+    print(f"  estimativa do gerenciador: {ilimitado.bytes_estimados() / 2**20:.1f} MiB")
+    del ilimitado
+
+    limite = total * 3 // 2
+    relogio = RelogioManual()
+
+    def em_ondas():
+        gerenciador = GerenciadorSessoes(max_sessoes=limite, ttl_ocioso=60, relogio=relogio)
+        for onda in range(4):
+            relogio.agora = onda * 30
+            sessoes_novas(gerenciador, total, bd_idioma, inicio=onda * total)
+        return gerenciador
+
+    gerenciador = medir(f"4 x {total} sessões, limite {limite}, TTL 60 s", em_ondas)
+    estatisticas = gerenciador.estatisticas()
+    print(
+        f"  ativas {estatisticas['ativas']}   despejos LRU {estatisticas['despejos_lru']}   "
+        f"despejos TTL {estatisticas['despejos_ttl']}   estimativa {gerenciador.bytes_estimados() / 2**20:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
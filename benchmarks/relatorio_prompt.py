@@ -0,0 +1,49 @@
+import json
+import time
+
+from benchmarks.catalogo_sintetico import catalogo_sintetico
+from src.catalogo import catalogo_padrao
+from src.contexto import estimar_tokens, montar_contexto
+
+CONVERSA = [
+    ("pt", "qual o prazo de entrega para o nordeste?", None),
+    ("pt", "a jaqueta é impermeável?", 5),
+    ("pt", "vocês parcelam no cartão?", None),
+    ("pt", "tem camiseta rosa?", 0),
+    ("en", "what sizes do you have?", None),
+    ("en", "is the backpack waterproof?", 1),
+    ("en", "how long does delivery take?", None),
+    ("en", "do you have anything for a party?", None),
+]
+
+
+def medir(catalogos):
+    print(f"{'catálogo':<12} {'antes (tok)':>12} {'depois (tok)':>13} {'redução':>8} {'montagem':>10}")
+    for nome, secoes in catalogos:
+        antes = depois = 0
+        inicio = time.perf_counter()
+        for lang, msg, produto in CONVERSA:
+            bd_idioma = secoes[lang]
+            atual = bd_idioma["produtos"][produto] if produto is not None else None
+            depois += estimar_tokens(montar_contexto(bd_idioma, msg, atual))
+        duracao = (time.perf_counter() - inicio) / len(CONVERSA) * 1e3
+        for lang, _, _ in CONVERSA:
+            antes += estimar_tokens(json.dumps(secoes[lang], ensure_ascii=False))
+        antes //= len(CONVERSA)
+        depois //= len(CONVERSA)
+        print(f"{nome:<12} {antes:>12} {depois:>13} {1 - depois / antes:>8.0%} {duracao:>8.2f}ms")
+
+
+def main():
+    catalogos = [("bd.json", {lang: catalogo_padrao.obter(lang) for lang in ("pt", "en")})]
+    for total in (100, 1_000, 10_000):
+        catalogos.append((f"{total} itens", {lang: catalogo_sintetico(total, lang) for lang in ("pt", "en")}))
+    for _, secoes in catalogos:
+        for lang, msg, _ in CONVERSA[:1]:
+            montar_contexto(secoes[lang], msg)
+            montar_contexto(secoes["en"], msg)
+    medir(catalogos)
+
+
+if __name__ == "__main__":
+    main()
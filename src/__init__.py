@@ -1,3 +1,9 @@
-from src.chatbot import processar_mensagem_total
-
 __all__ = ["processar_mensagem_total"]
+
+
+def __getattr__(nome):
+    if nome == "processar_mensagem_total":
+        from src.chatbot import processar_mensagem_total
+
+        return processar_mensagem_total
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
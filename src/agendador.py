@@ -0,0 +1,361 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from src.clientes import modulo_groq
+from src.contexto import estimar_tokens
+from src.metricas import CHAMADA_EXTERNA, metricas
+
+PRAZO_FILA = float(os.getenv("LUMINA_GROQ_PRAZO_FILA", "15"))
+MAX_TENTATIVAS = int(os.getenv("LUMINA_GROQ_TENTATIVAS", "3"))
+LIMITE_RPM = float(os.getenv("LUMINA_GROQ_RPM", "0"))
+LIMITE_TPM = float(os.getenv("LUMINA_GROQ_TPM", "0"))
+RESERVA_RESPOSTA = 256
+JANELA_TOKENS = 60.0
+ESPERA_BASE = 0.5
+ESPERA_MAXIMA = 8.0
+ORCAMENTO_RETENTATIVAS = 10.0
+RETENTATIVAS_POR_SEGUNDO = 0.5
+FRACAO_RETENTATIVAS = 0.2
+
+_RE_DURACAO = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIDADES = {"ms": 0.001, "h": 3600.0, "m": 60.0, "s": 1.0}
+
+
+class FilaEsgotada(Exception):
+    pass
+
+
+def duracao_segundos(texto):
+    if texto is None:
+        return None
+    texto = str(texto).strip()
+    try:
+        return float(texto)
+    except ValueError:
+        partes = _RE_DURACAO.findall(texto)
+        return sum(float(valor) * _UNIDADES[unidade] for valor, unidade in partes) if partes else None
+
+
+def _numero(texto):
+    try:
+        return float(texto)
+    except (TypeError, ValueError):
+        return None
+
+
+def estimar_custo(mensagens):
+    return sum(estimar_tokens(m["content"]) for m in mensagens) + RESERVA_RESPOSTA
+
+
+def retentavel(erro):
+    groq = modulo_groq()
+    if isinstance(erro, groq.APIConnectionError):
+        return True
+    status = getattr(erro, "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+class BaldeTokens:
+    def __init__(self, capacidade=0.0, taxa=0.0, agora=None):
+        self.capacidade = capacidade
+        self.taxa = taxa
+        self.nivel = capacidade
+        self.bloqueado_ate = 0.0
+        self._atualizado = time.monotonic() if agora is None else agora
+
+    @property
+    def limitado(self):
+        return self.capacidade > 0
+
+    def _repor(self, agora):
+        if self.limitado and agora > self._atualizado:
+            self.nivel = min(self.capacidade, self.nivel + (agora - self._atualizado) * self.taxa)
+        self._atualizado = max(self._atualizado, agora)
+
+    def espera(self, custo, agora):
+        self._repor(agora)
+        espera = max(0.0, self.bloqueado_ate - agora)
+        falta = custo - self.nivel
+        if self.limitado and falta > 0:
+            espera = max(espera, falta / self.taxa if self.taxa > 0 else float("inf"))
+        return espera
+
+    def consumir(self, custo, agora):
+        self._repor(agora)
+        if self.limitado:
+            self.nivel -= custo
+
+    def devolver(self, quantidade, agora):
+        self._repor(agora)
+        if self.limitado:
+            self.nivel = min(self.capacidade, self.nivel + quantidade)
+
+    def bloquear(self, ate):
+        self.bloqueado_ate = max(self.bloqueado_ate, ate)
+
+    def sincronizar(self, restantes, reset, agora, limite=None, janela=JANELA_TOKENS):
+        self._repor(agora)
+        if limite:
+            if not self.limitado:
+                self.nivel = limite
+            self.capacidade = limite
+            if restantes is not None and reset and restantes < limite:
+                self.taxa = (limite - restantes) / reset
+            elif not self.taxa:
+                self.taxa = limite / janela
+        if restantes is None:
+            return
+        if restantes <= 0 and reset:
+            self.bloquear(agora + reset)
+        if self.limitado:
+            self.nivel = min(self.nivel, restantes)
+
+
+@dataclass(eq=False)
+class Pedido:
+    chave: str
+    sessao: object
+    custo: float
+    prazo: float
+    nao_antes: float = 0.0
+    tentativas: int = 0
+
+
+@dataclass
+class EstadoChave:
+    requisicoes: BaldeTokens
+    tokens: BaldeTokens
+    orcamento: BaldeTokens
+    filas: OrderedDict = field(default_factory=OrderedDict)
+
+    def pedidos(self):
+        return [pedido for fila in self.filas.values() for pedido in fila]
+
+
+class AgendadorGroq:
+    def __init__(self, prazo=PRAZO_FILA, max_tentativas=MAX_TENTATIVAS, rpm=LIMITE_RPM, tpm=LIMITE_TPM, aleatorio=None):
+        self.prazo = prazo
+        self.max_tentativas = max(1, max_tentativas)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.descartados = 0
+        self.retentativas = 0
+        self._aleatorio = aleatorio or random.Random()
+        self._estados = {}
+        self._condicao = threading.Condition(threading.Lock())
+        self._esperas_async = set()
+
+    def _estado(self, chave, agora):
+        estado = self._estados.get(chave)
+        if estado is None:
+            estado = self._estados[chave] = EstadoChave(
+                requisicoes=BaldeTokens(self.rpm, self.rpm / 60, agora),
+                tokens=BaldeTokens(self.tpm, self.tpm / JANELA_TOKENS, agora),
+                orcamento=BaldeTokens(ORCAMENTO_RETENTATIVAS, RETENTATIVAS_POR_SEGUNDO, agora),
+            )
+        return estado
+
+    def espera_estimada(self, chave, custo):
+        with self._condicao:
+            agora = time.monotonic()
+            estado = self._estado(chave, agora)
+            na_fila = estado.pedidos()
+            return max(
+                estado.requisicoes.espera(len(na_fila) + 1, agora),
+                estado.tokens.espera(custo + sum(p.custo for p in na_fila), agora),
+            )
+
+    def _descartar(self):
+        self.descartados += 1
+        metricas.contar(CHAMADA_EXTERNA, servico="groq", resultado="descartado")
+        raise FilaEsgotada("fila do Groq excederia o prazo")
+
+    def _entrar(self, chave, sessao, custo):
+        if self.espera_estimada(chave, custo) > self.prazo:
+            with self._condicao:
+                self._descartar()
+        with self._condicao:
+            agora = time.monotonic()
+            pedido = Pedido(chave, sessao, custo, agora + self.prazo)
+            self._estado(chave, agora).filas.setdefault(sessao, deque()).append(pedido)
+            return pedido
+
+    def _sair(self, pedido):
+        estado = self._estados[pedido.chave]
+        fila = estado.filas.get(pedido.sessao)
+        if fila is not None and pedido in fila:
+            fila.remove(pedido)
+            if not fila:
+                del estado.filas[pedido.sessao]
+        self._avisar()
+
+    def _avisar(self):
+        self._condicao.notify_all()
+        for loop, evento in self._esperas_async:
+            try:
+                loop.call_soon_threadsafe(evento.set)
+            except RuntimeError:
+                pass
+        self._esperas_async.clear()
+
+    def _proximo(self, estado, agora):
+        for fila in estado.filas.values():
+            if fila[0].nao_antes <= agora:
+                return fila[0]
+        return None
+
+    def _tentar(self, pedido):
+        with self._condicao:
+            agora = time.monotonic()
+            if agora > pedido.prazo:
+                self._sair(pedido)
+                self._descartar()
+
+            estado = self._estados[pedido.chave]
+            if self._proximo(estado, agora) is not pedido:
+                return max(pedido.nao_antes - agora, 0.0) or pedido.prazo - agora
+
+            custo = min(pedido.custo, estado.tokens.capacidade) if estado.tokens.limitado else pedido.custo
+            espera = max(estado.requisicoes.espera(1, agora), estado.tokens.espera(custo, agora))
+            if espera > 0:
+                if agora + espera > pedido.prazo:
+                    self._sair(pedido)
+                    self._descartar()
+                return espera
+
+            estado.requisicoes.consumir(1, agora)
+            estado.tokens.consumir(custo, agora)
+            if pedido.tentativas == 0:
+                estado.orcamento.devolver(FRACAO_RETENTATIVAS, agora)
+            fila = estado.filas[pedido.sessao]
+            fila.popleft()
+            if fila:
+                estado.filas.move_to_end(pedido.sessao)
+            else:
+                del estado.filas[pedido.sessao]
+            self._avisar()
+            return 0.0
+
+    def _aguardar(self, pedido):
+        try:
+            while (espera := self._tentar(pedido)) > 0:
+                with self._condicao:
+                    self._condicao.wait(espera)
+        except BaseException:
+            with self._condicao:
+                self._sair(pedido)
+            raise
+
+    async def _aguardar_async(self, pedido):
+        loop = asyncio.get_running_loop()
+        evento = asyncio.Event()
+        try:
+            while True:
+                evento.clear()
+                with self._condicao:
+                    self._esperas_async.add((loop, evento))
+                if (espera := self._tentar(pedido)) <= 0:
+                    return
+                try:
+                    await asyncio.wait_for(evento.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._condicao:
+                self._sair(pedido)
+            raise
+        finally:
+            with self._condicao:
+                self._esperas_async.discard((loop, evento))
+
+    def _sincronizar(self, estado, cabecalhos, agora):
+        estado.requisicoes.sincronizar(
+            _numero(cabecalhos.get("x-ratelimit-remaining-requests")),
+            duracao_segundos(cabecalhos.get("x-ratelimit-reset-requests")),
+            agora,
+        )
+        estado.tokens.sincronizar(
+            _numero(cabecalhos.get("x-ratelimit-remaining-tokens")),
+            duracao_segundos(cabecalhos.get("x-ratelimit-reset-tokens")),
+            agora,
+            limite=_numero(cabecalhos.get("x-ratelimit-limit-tokens")),
+        )
+
+    def _registrar(self, pedido, resposta):
+        cabecalhos = getattr(resposta, "headers", None)
+        if cabecalhos is None:
+            return
+        with self._condicao:
+            self._sincronizar(self._estados[pedido.chave], cabecalhos, time.monotonic())
+
+    def _retentar(self, pedido, erro):
+        cabecalhos = getattr(getattr(erro, "response", None), "headers", None) or {}
+        with self._condicao:
+            agora = time.monotonic()
+            estado = self._estados[pedido.chave]
+            self._sincronizar(estado, cabecalhos, agora)
+            estado.tokens.devolver(pedido.custo, agora)
+            if not retentavel(erro):
+                return False
+
+            depois = duracao_segundos(cabecalhos.get("retry-after"))
+            if depois:
+                estado.requisicoes.bloquear(agora + depois)
+            pedido.tentativas += 1
+            if pedido.tentativas >= self.max_tentativas or estado.orcamento.espera(1, agora) > 0:
+                return False
+            teto = min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** pedido.tentativas)
+            espera = max(depois or 0.0, self._aleatorio.uniform(0, teto))
+            if agora + espera > pedido.prazo:
+                return False
+
+            estado.orcamento.consumir(1, agora)
+            pedido.nao_antes = agora + espera
+            estado.filas.setdefault(pedido.sessao, deque()).appendleft(pedido)
+            self.retentativas += 1
+        metricas.contar(CHAMADA_EXTERNA, servico="groq", resultado="retentativa")
+        return True
+
+    def executar(self, chave, sessao, custo, chamar):
+        pedido = self._entrar(chave, sessao, custo)
+        while True:
+            self._aguardar(pedido)
+            try:
+                resposta = chamar()
+            except Exception as erro:
+                if self._retentar(pedido, erro):
+                    continue
+                raise
+            self._registrar(pedido, resposta)
+            return resposta
+
+    async def executar_async(self, chave, sessao, custo, chamar):
+        pedido = self._entrar(chave, sessao, custo)
+        while True:
+            await self._aguardar_async(pedido)
+            try:
+                resposta = await chamar()
+            except Exception as erro:
+                if self._retentar(pedido, erro):
+                    continue
+                raise
+            self._registrar(pedido, resposta)
+            return resposta
+
+    def conciliar(self, chave, custo, uso):
+        total = getattr(uso, "total_tokens", None)
+        if total is None:
+            return
+        with self._condicao:
+            estado = self._estados.get(chave)
+            if estado is not None:
+                estado.tokens.devolver(custo - total, time.monotonic())
+
+
+agendador_groq = AgendadorGroq()
@@ -1,10 +1,14 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import flet as ft
 
+from src.transcricao import Transcricao
+
 try:
     from src.chatbot import ChatSession, processar_mensagem_total
+    from src.processador import ProcessadorTurnos
 except ImportError:
     class ChatSession:
         pass
@@ -13,11 +17,24 @@ except ImportError:
         time.sleep(1.5)  
         return f"Resposta simulada para: {texto}"
 
+    class ProcessadorTurnos:
+        def __init__(self):
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        def enviar(self, msg, api_key, session, ao_receber=None):
+            def gerar():
+                resposta = processar_mensagem_total(msg, api_key, session)
+                if ao_receber is not None:
+                    ao_receber(resposta)
+                return resposta
+            return self._executor.submit(gerar)
+
 RAIZ_PROJETO = Path(__file__).resolve().parent.parent
 ARQUIVO_ENV = RAIZ_PROJETO / ".env"
 ARQUIVO_KEY_ANTIGO = RAIZ_PROJETO / "chave_groq.txt"
 NOME_VARIAVEL_KEY = "GROQ_API_KEY"
 NOME_APP = "Lumina Style Bot"
+INTERVALO_ATUALIZACAO_STREAM = 0.08
 
 def carregar_chave_local():
     chave_ambiente = os.getenv(NOME_VARIAVEL_KEY)
@@ -51,6 +68,78 @@ def salvar_chave_local(chave):
     if ARQUIVO_KEY_ANTIGO.exists(): ARQUIVO_KEY_ANTIGO.unlink()
     os.environ[NOME_VARIAVEL_KEY] = chave
 
+def criar_bolha_mensagem(texto, autor):
+    if autor == "aviso":
+        return ft.Text(texto, color="red")
+    eh_usuario = autor == "usuario"
+    markdown_args = {"selectable": True}
+    if hasattr(ft, "MarkdownExtensionSet"):
+        markdown_args["extension_set"] = ft.MarkdownExtensionSet.GITHUB_WEB
+    conteudo = (
+        ft.Text(texto, color="white", selectable=True)
+        if eh_usuario
+        else ft.Markdown(
+            texto,
+            **markdown_args,
+        )
+    )
+    return ft.Row(
+        controls=[
+            ft.Container(
+                content=conteudo,
+                bgcolor="#2563eb" if eh_usuario else "#f1f5f9",
+                padding=ft.Padding(left=14, top=10, right=14, bottom=10),
+                border_radius=16,
+                width=360 if not eh_usuario else None,
+            ),
+            ft.Container(width=22) if eh_usuario else ft.Container(width=0),
+        ],
+        alignment="end" if eh_usuario else "start",
+    )
+
+class HistoricoChat:
+    def __init__(self, transcricao=None):
+        self.transcricao = transcricao or Transcricao()
+        self.botao_anteriores = ft.TextButton(
+            "Carregar mensagens anteriores",
+            visible=False,
+            on_click=self.carregar_anteriores,
+        )
+        self.lista = ft.ListView(expand=True, spacing=10, auto_scroll=True, controls=[self.botao_anteriores])
+
+    def adicionar(self, texto, autor):
+        indice = self.transcricao.adicionar(autor, texto)
+        bolha = criar_bolha_mensagem(texto, autor)
+        self.lista.controls.append(bolha)
+        self.lista.auto_scroll = True
+
+        excedentes = self.transcricao.aparar()
+        if excedentes:
+            del self.lista.controls[1:1 + excedentes]
+        self.botao_anteriores.visible = self.transcricao.ocultas > 0
+        return indice, bolha
+
+    def atualizar(self, indice, bolha, texto):
+        self.transcricao.atualizar(indice, texto)
+        bolha.controls[0].content.value = texto
+
+    def carregar_anteriores(self, e=None):
+        anteriores = [criar_bolha_mensagem(texto, autor) for autor, texto in self.transcricao.pagina_anterior()]
+        self.lista.controls[1:1] = anteriores
+        self.botao_anteriores.visible = self.transcricao.ocultas > 0
+        self.lista.auto_scroll = False
+        self.lista.update()
+
+    def mostrar(self, controle):
+        if controle in self.lista.controls:
+            self.lista.controls.remove(controle)
+        self.lista.controls.append(controle)
+
+    def remover(self, controle):
+        if controle in self.lista.controls:
+            self.lista.controls.remove(controle)
+
+
 def main(page: ft.Page):
     page.title = NOME_APP
     page.theme_mode = "light"
@@ -68,9 +157,12 @@ def main(page: ft.Page):
     chave_inicial = carregar_chave_local()
     api_key_container = {"key": chave_inicial}
     chat_session = ChatSession()
+    processador = ProcessadorTurnos()
+    turno_atual = {"id": 0}
+
+    historico = HistoricoChat()
+    chat = historico.lista
 
-    chat = ft.Column(expand=True, scroll="adaptive", spacing=10)
-    
     indicador_digitando = ft.Row(
         controls=[
             ft.Container(
@@ -90,46 +182,47 @@ def main(page: ft.Page):
         visible=False
     )
 
-    def criar_bolha_mensagem(texto, autor):
-        eh_usuario = autor == "usuario"
-        markdown_args = {"selectable": True}
-        if hasattr(ft, "MarkdownExtensionSet"):
-            markdown_args["extension_set"] = ft.MarkdownExtensionSet.GITHUB_WEB
-        conteudo = (
-            ft.Text(texto, color="white", selectable=True)
-            if eh_usuario
-            else ft.Markdown(
-                texto,
-                **markdown_args,
-            )
-        )
-        return ft.Row(
-            controls=[
-                ft.Container(
-                    content=conteudo,
-                    bgcolor="#2563eb" if eh_usuario else "#f1f5f9",
-                    padding=ft.Padding(left=14, top=10, right=14, bottom=10),
-                    border_radius=16,
-                    width=360 if not eh_usuario else None,
-                ),
-                ft.Container(width=22) if eh_usuario else ft.Container(width=0),
-            ],
-            alignment="end" if eh_usuario else "start",
-        )
+    def esconder_indicador():
+        indicador_digitando.visible = False
+        historico.remover(indicador_digitando)
 
     def processar_resposta(texto, api_key):
-        try:
-            resposta = processar_mensagem_total(texto, api_key, chat_session)
-        except Exception as err:
-            resposta = f"Erro técnico: {err}"
+        turno_atual["id"] += 1
+        turno = turno_atual["id"]
+        estado = {"bolha": None, "indice": None, "resposta": "", "ultima_atualizacao": 0.0}
 
-        indicador_digitando.visible = False
-        nova_msg.disabled = False
-        botao_enviar.disabled = False
-        if indicador_digitando in chat.controls:
-            chat.controls.remove(indicador_digitando)
-        chat.controls.append(criar_bolha_mensagem(resposta, "bot"))
-        page.update()
+        def mostrar(texto_bolha):
+            if estado["bolha"] is None:
+                esconder_indicador()
+                estado["indice"], estado["bolha"] = historico.adicionar(texto_bolha, "bot")
+                return chat
+            historico.atualizar(estado["indice"], estado["bolha"], texto_bolha)
+            return estado["bolha"].controls[0].content
+
+        def ao_receber(parte):
+            if turno != turno_atual["id"]:
+                return
+            estado["resposta"] += parte
+            alterado = mostrar(estado["resposta"])
+
+            agora = time.monotonic()
+            if alterado is chat or agora - estado["ultima_atualizacao"] >= INTERVALO_ATUALIZACAO_STREAM:
+                estado["ultima_atualizacao"] = agora
+                alterado.update()
+
+        def ao_concluir(futuro):
+            if futuro.cancelled() or turno != turno_atual["id"]:
+                return
+            erro = futuro.exception()
+            if erro is not None:
+                resposta = estado["resposta"]
+                mostrar(f"{resposta}\n\nErro técnico: {erro}" if resposta else f"Erro técnico: {erro}")
+            else:
+                mostrar(estado["resposta"])
+            esconder_indicador()
+            chat.update()
+
+        processador.enviar(texto, api_key, chat_session, ao_receber).add_done_callback(ao_concluir)
 
     def enviar_mensagem(e):
         texto = nova_msg.value.strip()
@@ -137,21 +230,19 @@ def main(page: ft.Page):
             return
         
         if api_key_container["key"] in ["SUA_CHAVE_AQUI", ""]:
-            chat.controls.append(ft.Text("Configure a API Key no botão acima.", color="red"))
-            page.update()
+            historico.adicionar("Configure a API Key no botão acima.", "aviso")
+            chat.update()
             return
 
-        chat.controls.append(criar_bolha_mensagem(texto, "usuario"))
+        historico.adicionar(texto, "usuario")
         
         nova_msg.value = ""
-        nova_msg.disabled = True
-        botao_enviar.disabled = True
         indicador_digitando.visible = True
-        if indicador_digitando not in chat.controls:
-            chat.controls.append(indicador_digitando)
-        page.update()
+        historico.mostrar(indicador_digitando)
+        chat.update()
+        nova_msg.update()
 
-        page.run_thread(processar_resposta, texto, api_key_container["key"])
+        processar_resposta(texto, api_key_container["key"])
 
     nova_msg = ft.TextField(
         label="Digite sua mensagem...", 
@@ -0,0 +1,160 @@
+import heapq
+import os
+import re
+from array import array
+from collections import defaultdict
+
+BUSCA_APROXIMADA = os.getenv("LUMINA_BUSCA_APROXIMADA", "1").strip().lower() in {"1", "true", "sim", "yes"}
+MIN_CARACTERES = 4
+MAX_TOKENS_CONSULTA = 8
+MAX_POSTAGENS_POR_PALAVRA = 500
+PESOS_CAMPO = {"nome": 3.0, "categoria": 3.0, "cor": 1.0, "descricao": 1.0}
+CAMPOS_FORTES = frozenset({"nome", "categoria"})
+
+_RE_PALAVRA = re.compile(r"[^\W\d_]+")
+
+
+def limite_distancia(palavra):
+    if len(palavra) <= 4:
+        return 0
+    return 1 if len(palavra) == 5 else 2
+
+
+def trigramas(palavra):
+    marcada = f" {palavra} "
+    return {marcada[i:i + 3] for i in range(len(marcada) - 2)}
+
+
+def distancia_limitada(a, b, limite):
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    antes_anterior = None
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            custo = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb))
+            if antes_anterior is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                custo = min(custo, antes_anterior[j - 2] + 1)
+            atual.append(custo)
+        if min(atual) > limite:
+            return limite + 1
+        antes_anterior, anterior = anterior, atual
+    return anterior[-1]
+
+
+class IndiceAproximado:
+    def __init__(self, bd_idioma, ignorar=()):
+        self.ignorar = frozenset(ignorar)
+        self.palavras = []
+        self._ids = {}
+        self._postagens = []
+        self._por_trigrama = defaultdict(list)
+        self._indexar(bd_idioma.get("produtos", []))
+        self._por_trigrama = {tri: array("I", ids) for tri, ids in self._por_trigrama.items()}
+
+    def __len__(self):
+        return len(self.palavras)
+
+    def _id_palavra(self, palavra):
+        id_palavra = self._ids.get(palavra)
+        if id_palavra is None:
+            id_palavra = self._ids[palavra] = len(self.palavras)
+            self.palavras.append(palavra)
+            self._postagens.append({})
+            for tri in trigramas(palavra):
+                self._por_trigrama[tri].append(id_palavra)
+        return id_palavra
+
+    def _adicionar(self, texto, campo, posicao):
+        for palavra in _RE_PALAVRA.findall(texto.lower()):
+            if len(palavra) < MIN_CARACTERES:
+                continue
+            postagens = self._postagens[self._id_palavra(palavra)].setdefault(campo, array("I"))
+            if len(postagens) < MAX_POSTAGENS_POR_PALAVRA and (not postagens or postagens[-1] != posicao):
+                postagens.append(posicao)
+
+    def _indexar(self, produtos):
+        if hasattr(produtos, "resumo"):
+            for posicao, (nome, categorias) in enumerate(produtos.resumo()):
+                self._adicionar(nome, "nome", posicao)
+                for categoria in categorias:
+                    self._adicionar(categoria, "categoria", posicao)
+            return
+
+        for posicao, produto in enumerate(produtos):
+            self._adicionar(produto["nome"], "nome", posicao)
+            for categoria in produto.get("categorias", []):
+                self._adicionar(categoria, "categoria", posicao)
+            for cor in produto.get("cores", []):
+                self._adicionar(str(cor), "cor", posicao)
+            self._adicionar(produto.get("descricao", ""), "descricao", posicao)
+
+    def palavras_proximas(self, palavra):
+        id_exato = self._ids.get(palavra)
+        if id_exato is not None:
+            return [(id_exato, 0)]
+
+        limite = limite_distancia(palavra)
+        tris = trigramas(palavra)
+        minimo = max(1, len(tris) - 3 * limite)
+        comuns = defaultdict(int)
+        for tri in tris:
+            for id_palavra in self._por_trigrama.get(tri, ()):
+                comuns[id_palavra] += 1
+
+        proximas = []
+        for id_palavra, total in comuns.items():
+            candidata = self.palavras[id_palavra]
+            if total < minimo or candidata[0] != palavra[0]:
+                continue
+            distancia = distancia_limitada(palavra, candidata, limite)
+            if distancia <= limite:
+                proximas.append((id_palavra, distancia))
+        return proximas
+
+    def _tokens(self, texto_l):
+        tokens = [
+            palavra for palavra in dict.fromkeys(_RE_PALAVRA.findall(texto_l))
+            if len(palavra) >= MIN_CARACTERES and palavra not in self.ignorar
+        ]
+        return sorted(tokens, key=len, reverse=True)[:MAX_TOKENS_CONSULTA]
+
+    def distancia_produto(self, texto_l, posicao):
+        maior = 0
+        for token in self._tokens(texto_l):
+            distancias = [
+                distancia for id_palavra, distancia in self.palavras_proximas(token)
+                if any(posicao in posicoes for posicoes in self._postagens[id_palavra].values())
+            ]
+            if not distancias:
+                return None
+            maior = max(maior, min(distancias))
+        return maior
+
+    def buscar(self, texto_l, k=5, apenas_fortes=False):
+        tokens = self._tokens(texto_l)
+
+        pontos = defaultdict(float)
+        for token in tokens:
+            melhores = {}
+            for id_palavra, distancia in self.palavras_proximas(token):
+                similaridade = 1 - distancia / (limite_distancia(token) + 1)
+                for campo, posicoes in self._postagens[id_palavra].items():
+                    if apenas_fortes and campo not in CAMPOS_FORTES:
+                        continue
+                    peso = PESOS_CAMPO[campo] * similaridade
+                    for posicao in posicoes:
+                        if peso > melhores.get(posicao, 0.0):
+                            melhores[posicao] = peso
+            for posicao, peso in melhores.items():
+                pontos[posicao] += peso
+
+        return heapq.nlargest(k, pontos.items(), key=lambda item: (item[1], -item[0]))
+
+
+def indice_aproximado(bd_idioma, ignorar=()):
+    derivado = getattr(bd_idioma, "derivado", None)
+    if derivado is not None:
+        return derivado("busca", lambda secao: IndiceAproximado(secao, ignorar))
+    return IndiceAproximado(bd_idioma, ignorar)
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CAMINHO_CACHE_RESPOSTAS = os.getenv("LUMINA_CACHE_RESPOSTAS", "")
+MAX_RESPOSTAS = int(os.getenv("LUMINA_CACHE_RESPOSTAS_MAX", "1024"))
+TTL_RESPOSTAS = float(os.getenv("LUMINA_CACHE_RESPOSTAS_TTL", str(6 * 3600)))
+
+_RE_NAO_PALAVRA = re.compile(r"[^\w]+")
+
+
+def normalizar_mensagem(msg):
+    return " ".join(_RE_NAO_PALAVRA.sub(" ", msg.lower()).split())
+
+
+def impressao_secao(bd_idioma):
+    impressao = getattr(bd_idioma.get("produtos"), "impressao", None)
+    if impressao is not None:
+        return impressao
+    conteudo = json.dumps(bd_idioma, ensure_ascii=False, sort_keys=True, default=list)
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()[:16]
+
+
+class CacheRespostas:
+    def __init__(self, caminho=CAMINHO_CACHE_RESPOSTAS, max_memoria=MAX_RESPOSTAS, ttl=TTL_RESPOSTAS):
+        self.max_memoria = max_memoria
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.invalidacoes = 0
+        self._memoria = OrderedDict()
+        self._impressoes = {}
+        self._lock = threading.Lock()
+        self._caminho = caminho
+        self._db = None
+
+    def __len__(self):
+        return len(self._memoria)
+
+    @property
+    def ativo(self):
+        return self.max_memoria > 0
+
+    def _banco(self):
+        if self._db is None and self._caminho:
+            try:
+                Path(self._caminho).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(self._caminho, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS resposta ("
+                    "chave TEXT PRIMARY KEY, lang TEXT NOT NULL, impressao TEXT NOT NULL, "
+                    "texto TEXT NOT NULL, expira REAL NOT NULL)"
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error):
+                self._desativar_disco()
+        return self._db
+
+    def _desativar_disco(self):
+        if self._db is not None:
+            self._db.close()
+        self._db = None
+        self._caminho = None
+
+    def _invalidar(self, lang, impressao):
+        anterior = self._impressoes.get(lang)
+        self._impressoes[lang] = impressao
+        if anterior is None or anterior == impressao:
+            return
+        self.invalidacoes += 1
+        for chave in [c for c in self._memoria if c[1] == lang and c[0] != impressao]:
+            del self._memoria[chave]
+        db = self._banco()
+        if db is not None:
+            try:
+                db.execute("DELETE FROM resposta WHERE lang = ? AND impressao != ?", (lang, impressao))
+                db.commit()
+            except sqlite3.Error:
+                self._desativar_disco()
+
+    def chave(self, msg, lang, bd_idioma, produto_atual=None):
+        if not self.ativo:
+            return None
+        derivado = getattr(bd_idioma, "derivado", None)
+        impressao = derivado("impressao", impressao_secao) if derivado is not None else impressao_secao(bd_idioma)
+        contexto = produto_atual["nome"] if produto_atual else ""
+        with self._lock:
+            self._invalidar(lang, impressao)
+        return impressao, lang, contexto, normalizar_mensagem(msg)
+
+    def _ler_disco(self, chave, agora):
+        db = self._banco()
+        if db is None:
+            return None
+        try:
+            linha = db.execute(
+                "SELECT texto, expira FROM resposta WHERE chave = ?", (json.dumps(chave, ensure_ascii=False),)
+            ).fetchone()
+        except sqlite3.Error:
+            self._desativar_disco()
+            return None
+        if linha is None or linha[1] <= agora:
+            return None
+        self._guardar_memoria(chave, linha[0], linha[1])
+        return linha[0]
+
+    def _guardar_memoria(self, chave, texto, expira):
+        self._memoria[chave] = (expira, texto)
+        self._memoria.move_to_end(chave)
+        if len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def obter(self, chave):
+        if chave is None:
+            return None
+        agora = time.time()
+        with self._lock:
+            item = self._memoria.get(chave)
+            texto = None
+            if item is not None:
+                if item[0] > agora:
+                    texto = item[1]
+                    self._memoria.move_to_end(chave)
+                else:
+                    del self._memoria[chave]
+            if texto is None:
+                texto = self._ler_disco(chave, agora)
+            if texto is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+            return texto
+
+    def guardar(self, chave, texto):
+        if chave is None or not texto:
+            return
+        expira = time.time() + self.ttl
+        with self._lock:
+            self.gravacoes += 1
+            self._guardar_memoria(chave, texto, expira)
+            db = self._banco()
+            if db is not None:
+                try:
+                    db.execute(
+                        "INSERT OR REPLACE INTO resposta (chave, lang, impressao, texto, expira) VALUES (?, ?, ?, ?, ?)",
+                        (json.dumps(chave, ensure_ascii=False), chave[1], chave[0], texto, expira),
+                    )
+                    db.commit()
+                except sqlite3.Error:
+                    self._desativar_disco()
+
+    def limpar(self):
+        with self._lock:
+            self._memoria.clear()
+            self._impressoes.clear()
+            db = self._banco()
+            if db is not None:
+                db.execute("DELETE FROM resposta")
+                db.commit()
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            "itens": len(self._memoria),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "gravacoes": self.gravacoes,
+            "invalidacoes": self.invalidacoes,
+        }
+
+
+cache_respostas = CacheRespostas()
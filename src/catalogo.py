@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.metricas import metricas
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+caminho_bd = RAIZ_PROJETO / "data" / "bd.json"
+CAMINHO_CATALOGO = os.getenv("LUMINA_CATALOGO", "")
+ARQUIVO_MANIFESTO = "manifesto.json"
+ARQUIVO_SEGMENTO_ATUAL = "atual.json"
+USAR_COMPILADO = os.getenv("LUMINA_CATALOGO_COMPILADO", "1").strip().lower() in {"1", "true", "sim", "yes"}
+
+
+class CatalogoError(Exception):
+    pass
+
+
+class SecaoCatalogo(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._derivados = {}
+
+    def derivado(self, chave, fabrica):
+        valor = self._derivados.get(chave)
+        if valor is None:
+            valor = self._derivados[chave] = fabrica(self)
+        return valor
+
+
+def resumo_produtos(produtos):
+    resumo = getattr(produtos, "resumo", None)
+    if resumo is not None:
+        return resumo()
+    return ((produto["nome"], produto.get("categorias", [])) for produto in produtos)
+
+
+def nome_produto(produtos, indice):
+    nome = getattr(produtos, "nome", None)
+    if nome is not None:
+        return nome(indice)
+    return produtos[indice]["nome"]
+
+
+def _posicoes_por_nome(bd_idioma):
+    return {nome: i for i, (nome, _) in enumerate(resumo_produtos(bd_idioma.get("produtos", [])))}
+
+
+def posicoes_por_nome(bd_idioma):
+    derivado = getattr(bd_idioma, "derivado", None)
+    if derivado is not None:
+        return derivado("posicoes_por_nome", _posicoes_por_nome)
+    return _posicoes_por_nome(bd_idioma)
+
+
+def validar_produto(produto, indice, lang):
+    if not isinstance(produto, dict):
+        raise CatalogoError(f"Produto {indice + 1} de '{lang}' precisa ser um objeto.")
+
+    campos_obrigatorios = ["nome", "preco", "descricao"]
+    for campo in campos_obrigatorios:
+        if campo not in produto:
+            raise CatalogoError(f"Produto {indice + 1} de '{lang}' está sem o campo '{campo}'.")
+
+    if not isinstance(produto["nome"], str) or not produto["nome"].strip():
+        raise CatalogoError(f"Produto {indice + 1} de '{lang}' tem nome inválido.")
+
+    if not isinstance(produto["preco"], (int, float)) or produto["preco"] < 0:
+        raise CatalogoError(f"Produto {indice + 1} de '{lang}' tem preço inválido.")
+
+    if not isinstance(produto["descricao"], str) or not produto["descricao"].strip():
+        raise CatalogoError(f"Produto {indice + 1} de '{lang}' tem descrição inválida.")
+
+    categorias = produto.get("categorias", [])
+    if not isinstance(categorias, list) or not all(isinstance(c, str) for c in categorias):
+        raise CatalogoError(f"Produto {indice + 1} de '{lang}' tem categorias inválidas.")
+
+    produto_validado = produto.copy()
+    produto_validado["nome"] = produto_validado["nome"].strip()
+    produto_validado["preco"] = float(produto_validado["preco"])
+    produto_validado["descricao"] = produto_validado["descricao"].strip()
+    produto_validado["emoji"] = str(produto_validado.get("emoji", "🛍️"))
+    produto_validado["categorias"] = [c.strip() for c in categorias if c.strip()]
+    return produto_validado
+
+
+def validar_bd(banco_total, lang):
+    if not isinstance(banco_total, dict):
+        raise CatalogoError("O bd.json precisa ter um objeto principal.")
+
+    if "pt" not in banco_total:
+        raise CatalogoError("O bd.json precisa ter a seção 'pt'.")
+
+    lang_escolhido = lang if lang in banco_total else "pt"
+    bd_idioma = banco_total[lang_escolhido]
+
+    if not isinstance(bd_idioma, dict):
+        raise CatalogoError(f"A seção '{lang_escolhido}' precisa ser um objeto.")
+
+    produtos = bd_idioma.get("produtos")
+    if not isinstance(produtos, list):
+        raise CatalogoError(f"A seção '{lang_escolhido}' precisa ter uma lista 'produtos'.")
+
+    bd_validado = bd_idioma.copy()
+    bd_validado["produtos"] = [
+        validar_produto(produto, indice, lang_escolhido)
+        for indice, produto in enumerate(produtos)
+    ]
+    return bd_validado
+
+
+def secao_erro(mensagem):
+    return SecaoCatalogo({"produtos": [], "pagamento": mensagem})
+
+
+def mensagem_erro_catalogo(erro):
+    if isinstance(erro, FileNotFoundError):
+        return "Erro: arquivo data/bd.json não encontrado."
+    if isinstance(erro, json.JSONDecodeError):
+        return "Erro: o arquivo data/bd.json está com JSON inválido."
+    if isinstance(erro, CatalogoError):
+        return f"Erro no catálogo: {erro}"
+    return "Erro: não foi possível ler o catálogo da loja."
+
+
+def carregar_bd(lang="pt"):
+    try:
+        with open(caminho_bd, "r", encoding="utf-8") as f:
+            banco_total = json.load(f)
+        return validar_bd(banco_total, lang)
+    except (OSError, json.JSONDecodeError, CatalogoError) as erro:
+        return secao_erro(mensagem_erro_catalogo(erro))
+
+
+@dataclass(frozen=True)
+class SnapshotCatalogo:
+    versao: int
+    assinatura: tuple | None
+    secoes: dict = field(default_factory=dict)
+    valido: bool = True
+
+    def obter(self, lang="pt"):
+        secao = self.secoes.get(lang)
+        if secao is None:
+            secao = self.secoes.get("pt", secao_erro("Erro no catálogo: seção 'pt' ausente."))
+        return secao
+
+
+def _congelar_secao(bd_validado):
+    secao = SecaoCatalogo(bd_validado)
+    secao["produtos"] = tuple(secao["produtos"])
+    return secao
+
+
+def montar_snapshot(banco_total, versao, assinatura):
+    secoes = {}
+    erros = []
+    langs = set(banco_total) if isinstance(banco_total, dict) else set()
+    langs.add("pt")
+    for lang in sorted(langs):
+        try:
+            secoes[lang] = _congelar_secao(validar_bd(banco_total, lang))
+        except CatalogoError as erro:
+            erros.append(mensagem_erro_catalogo(erro))
+            secoes[lang] = secao_erro(erros[-1])
+    return SnapshotCatalogo(versao=versao, assinatura=assinatura, secoes=secoes, valido=not erros), erros
+
+
+class CatalogoStore:
+    def __init__(self, caminho=None, intervalo_verificacao=1.0):
+        self._caminho = Path(caminho) if caminho else None
+        self.intervalo_verificacao = intervalo_verificacao
+        self._snapshot = None
+        self._assinatura_falha = None
+        self._proxima_verificacao = 0.0
+        self._versao = 0
+        self._lock = threading.Lock()
+        self.ultimo_erro = None
+
+    @property
+    def caminho(self):
+        return self._caminho or caminho_bd
+
+    @property
+    def particionado(self):
+        return self.caminho.is_dir()
+
+    @property
+    def compartilhado(self):
+        return (self.caminho / ARQUIVO_SEGMENTO_ATUAL).is_file()
+
+    def _assinatura_atual(self):
+        if self.compartilhado:
+            caminho = self.caminho / ARQUIVO_SEGMENTO_ATUAL
+        else:
+            caminho = self.caminho / ARQUIVO_MANIFESTO if self.particionado else self.caminho
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+    def _carregar(self, assinatura):
+        with metricas.etapa("carregar_bd"):
+            if self.compartilhado:
+                from src.catalogo_compartilhado import abrir_segmento
+
+                return abrir_segmento(self.caminho, self._versao + 1, assinatura)
+            if self.particionado:
+                from src.catalogo_particionado import abrir_catalogo
+
+                return abrir_catalogo(self.caminho, self._versao + 1, assinatura)
+            if USAR_COMPILADO:
+                from src.catalogo_compilado import abrir_compilado
+
+                compilado = abrir_compilado(self.caminho, self._versao + 1, assinatura)
+                if compilado is not None:
+                    return compilado, []
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                banco_total = json.load(f)
+            return montar_snapshot(banco_total, self._versao + 1, assinatura)
+
+    def recarregar(self, forcar=True):
+        with self._lock:
+            assinatura = self._assinatura_atual()
+            atual = self._snapshot
+            if not forcar and atual is not None:
+                if assinatura == atual.assinatura or assinatura == self._assinatura_falha:
+                    return False
+
+            try:
+                novo, erros = self._carregar(assinatura)
+            except (OSError, json.JSONDecodeError) as erro:
+                novo = SnapshotCatalogo(
+                    versao=self._versao + 1,
+                    assinatura=assinatura,
+                    secoes={"pt": secao_erro(mensagem_erro_catalogo(erro))},
+                    valido=False,
+                )
+                erros = [novo.secoes["pt"]["pagamento"]]
+
+            if erros:
+                self.ultimo_erro = erros[0]
+                self._assinatura_falha = assinatura
+                if atual is not None and atual.valido:
+                    return False
+                self._versao = novo.versao
+                self._snapshot = novo
+                return False
+
+            self._versao = novo.versao
+            self._snapshot = novo
+            self._assinatura_falha = None
+            self.ultimo_erro = None
+            return True
+
+    def snapshot(self):
+        agora = time.monotonic()
+        if self._snapshot is None or agora >= self._proxima_verificacao:
+            self._proxima_verificacao = agora + self.intervalo_verificacao
+            self.recarregar(forcar=False)
+        return self._snapshot
+
+    def obter(self, lang="pt"):
+        return self.snapshot().obter(lang)
+
+
+catalogo_padrao = CatalogoStore(CAMINHO_CATALOGO or None)
@@ -0,0 +1,479 @@
+import argparse
+import dataclasses
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.catalogo import (
+    ARQUIVO_SEGMENTO_ATUAL,
+    CatalogoError,
+    SecaoCatalogo,
+    SnapshotCatalogo,
+    caminho_bd,
+    mensagem_erro_catalogo,
+    montar_snapshot,
+    secao_erro,
+)
+from src.catalogo_compilado import ERROS_LEITURA, indexar_secao, versao_codigo
+
+FORMATO = 1
+MAGICO = b"LSEG"
+ALINHAMENTO = 64
+SEGMENTOS_MANTIDOS = int(os.getenv("LUMINA_SEGMENTOS_MANTIDOS", "2"))
+INTERVALO_PUBLICACAO = 1.0
+MIN_ENTRADAS_COMPARTILHADAS = 1024
+
+_CABECALHO = struct.Struct("=4sII")
+_PRODUTOS = "produtos"
+_MAPA = "mapa"
+_INTEIROS = "inteiros"
+
+
+class ProdutosCompartilhados(Sequence):
+    def __init__(self, dados, info):
+        def fatia(nome, formato=None):
+            inicio, tamanho = info[nome]
+            trecho = dados[inicio:inicio + tamanho]
+            return trecho.cast(formato) if formato else trecho
+
+        self.total = info["produtos"]
+        self.impressao = info["impressao"]
+        self._json = fatia("json")
+        self._inicios = fatia("inicios", "Q")
+        self._nomes = fatia("nomes")
+        self._inicios_nomes = fatia("inicios_nomes", "Q")
+        self.precos = fatia("precos", "d")
+        self.inicios_categorias = fatia("inicios_categorias", "I")
+        self.ids_categorias = fatia("ids_categorias", "I")
+        self.tabela_categorias = tuple(json.loads(bytes(fatia("tabela_categorias"))))
+        if len(self._inicios) != self.total + 1 or len(self.precos) != self.total:
+            raise CatalogoError("Colunas do segmento não batem com o cabeçalho.")
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de produto fora do catálogo")
+        return json.loads(bytes(self._json[self._inicios[indice]:self._inicios[indice + 1]]))
+
+    def nome(self, indice):
+        return bytes(self._nomes[self._inicios_nomes[indice]:self._inicios_nomes[indice + 1]]).decode("utf-8")
+
+    def preco(self, indice):
+        return self.precos[indice]
+
+    def categorias(self, indice):
+        inicio, fim = self.inicios_categorias[indice], self.inicios_categorias[indice + 1]
+        return [self.tabela_categorias[i] for i in self.ids_categorias[inicio:fim]]
+
+    def resumo(self):
+        for indice in range(self.total):
+            yield self.nome(indice), self.categorias(indice)
+
+
+class MapaCompartilhado(Mapping):
+    def __init__(self, dados, info):
+        def fatia(nome, formato=None):
+            inicio, tamanho = info[nome]
+            trecho = dados[inicio:inicio + tamanho]
+            return trecho.cast(formato) if formato else trecho
+
+        self._chaves = fatia("chaves")
+        self._inicios_chaves = fatia("inicios_chaves", "Q")
+        self._valores = fatia("valores")
+        self._inicios_valores = fatia("inicios_valores", "Q")
+        self._tabela = fatia("tabela", "Q")
+        self._mascara = len(self._tabela) - 1
+
+    def _chave(self, indice):
+        return self._chaves[self._inicios_chaves[indice]:self._inicios_chaves[indice + 1]]
+
+    def _posicao(self, chave):
+        if not isinstance(chave, str):
+            return None
+        codificada = chave.encode("utf-8")
+        slot = zlib.crc32(codificada) & self._mascara
+        while True:
+            indice = self._tabela[slot]
+            if not indice:
+                return None
+            if self._chave(indice - 1) == codificada:
+                return indice - 1
+            slot = (slot + 1) & self._mascara
+
+    def get(self, chave, padrao=None):
+        indice = self._posicao(chave)
+        if indice is None:
+            return padrao
+        return pickle.loads(self._valores[self._inicios_valores[indice]:self._inicios_valores[indice + 1]])
+
+    def __getitem__(self, chave):
+        indice = self._posicao(chave)
+        if indice is None:
+            raise KeyError(chave)
+        return self.get(chave)
+
+    def __contains__(self, chave):
+        return self._posicao(chave) is not None
+
+    def __len__(self):
+        return len(self._inicios_chaves) - 1
+
+    def __iter__(self):
+        for indice in range(len(self)):
+            yield bytes(self._chave(indice)).decode("utf-8")
+
+
+class _Empacotador(pickle.Pickler):
+    def __init__(self, arquivo, escritor, produtos):
+        super().__init__(arquivo, protocol=5, buffer_callback=self._fora_de_banda)
+        self.escritor = escritor
+        self.produtos = produtos
+        self.buffers = []
+
+    def _fora_de_banda(self, buffer):
+        self.buffers.append(buffer.raw())
+
+    def persistent_id(self, obj):
+        if obj is self.produtos:
+            return _PRODUTOS
+        if type(obj) is dict and len(obj) >= MIN_ENTRADAS_COMPARTILHADAS and all(type(c) is str for c in obj):
+            return _MAPA, self.escritor.adicionar_mapa(obj)
+        if type(obj) is tuple and len(obj) >= MIN_ENTRADAS_COMPARTILHADAS and all(type(v) is int for v in obj):
+            return _INTEIROS, self.escritor.adicionar(array("q", obj))
+        return None
+
+
+class _Desempacotador(pickle.Unpickler):
+    def __init__(self, arquivo, dados, produtos, buffers):
+        super().__init__(arquivo, buffers=buffers)
+        self.dados = dados
+        self.produtos = produtos
+
+    def persistent_load(self, pid):
+        if pid == _PRODUTOS:
+            return self.produtos
+        tipo, posicao = pid
+        if tipo == _MAPA:
+            return MapaCompartilhado(self.dados, posicao)
+        if tipo == _INTEIROS:
+            inicio, tamanho = posicao
+            return self.dados[inicio:inicio + tamanho].cast("q")
+        raise pickle.UnpicklingError(f"referência desconhecida no segmento: {pid!r}")
+
+
+class _Escritor:
+    def __init__(self):
+        self.partes = []
+        self.tamanho = 0
+
+    def adicionar(self, dados):
+        dados = memoryview(dados).cast("B")
+        sobra = -self.tamanho % ALINHAMENTO
+        if sobra:
+            self.partes.append(bytes(sobra))
+            self.tamanho += sobra
+        self.partes.append(dados)
+        self.tamanho += len(dados)
+        return [self.tamanho - len(dados), len(dados)]
+
+    def adicionar_json(self, valor):
+        return self.adicionar(json.dumps(valor, ensure_ascii=False).encode("utf-8"))
+
+    def adicionar_textos(self, textos):
+        inicios = array("Q", [0])
+        blocos = []
+        for texto in textos:
+            blocos.append(texto.encode("utf-8"))
+            inicios.append(inicios[-1] + len(blocos[-1]))
+        return self.adicionar(b"".join(blocos)), self.adicionar(inicios)
+
+    def adicionar_mapa(self, mapa):
+        chaves = list(mapa)
+        codificadas = [chave.encode("utf-8") for chave in chaves]
+        slots = 1 << max(1, (2 * len(chaves) - 1).bit_length())
+        tabela = array("Q", bytes(8 * slots))
+        for indice, codificada in enumerate(codificadas):
+            slot = zlib.crc32(codificada) & (slots - 1)
+            while tabela[slot]:
+                slot = (slot + 1) & (slots - 1)
+            tabela[slot] = indice + 1
+
+        valores = [pickle.dumps(mapa[chave], protocol=pickle.HIGHEST_PROTOCOL) for chave in chaves]
+        inicios_chaves, inicios_valores = array("Q", [0]), array("Q", [0])
+        for codificada, valor in zip(codificadas, valores):
+            inicios_chaves.append(inicios_chaves[-1] + len(codificada))
+            inicios_valores.append(inicios_valores[-1] + len(valor))
+        return {
+            "chaves": self.adicionar(b"".join(codificadas)),
+            "inicios_chaves": self.adicionar(inicios_chaves),
+            "valores": self.adicionar(b"".join(valores)),
+            "inicios_valores": self.adicionar(inicios_valores),
+            "tabela": self.adicionar(tabela),
+        }
+
+
+def _colunas(escritor, secao):
+    from src.cache_respostas import impressao_secao
+
+    produtos = secao["produtos"]
+    tabela = {}
+    inicios_categorias = array("I", [0])
+    ids_categorias = array("I")
+    for produto in produtos:
+        for categoria in produto.get("categorias", []):
+            ids_categorias.append(tabela.setdefault(categoria, len(tabela)))
+        inicios_categorias.append(len(ids_categorias))
+
+    produtos_json, inicios = escritor.adicionar_textos(json.dumps(p, ensure_ascii=False) for p in produtos)
+    nomes, inicios_nomes = escritor.adicionar_textos(p["nome"] for p in produtos)
+    return {
+        "produtos": len(produtos),
+        "impressao": secao.derivado("impressao", impressao_secao),
+        "json": produtos_json,
+        "inicios": inicios,
+        "nomes": nomes,
+        "inicios_nomes": inicios_nomes,
+        "precos": escritor.adicionar(array("d", (float(p["preco"]) for p in produtos))),
+        "inicios_categorias": escritor.adicionar(inicios_categorias),
+        "ids_categorias": escritor.adicionar(ids_categorias),
+        "tabela_categorias": escritor.adicionar_json(list(tabela)),
+    }
+
+
+def _derivados(escritor, secao):
+    derivados = {}
+    for chave, valor in secao._derivados.items():
+        if not isinstance(chave, str):
+            continue
+        arquivo = io.BytesIO()
+        empacotador = _Empacotador(arquivo, escritor, secao["produtos"])
+        empacotador.dump(valor)
+        derivados[chave] = {
+            "pickle": escritor.adicionar(arquivo.getbuffer()),
+            "buffers": [escritor.adicionar(buffer) for buffer in empacotador.buffers],
+        }
+    return derivados
+
+
+def ler_ponteiro(pasta):
+    with open(Path(pasta) / ARQUIVO_SEGMENTO_ATUAL, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _gravar_atomico(caminho, partes):
+    temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+    with open(temporario, "wb") as f:
+        for parte in partes:
+            f.write(parte)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def publicar(entrada=caminho_bd, pasta=None, manter=SEGMENTOS_MANTIDOS):
+    from src.contexto import FragmentosSobDemanda
+
+    entrada = Path(entrada)
+    pasta = Path(pasta) if pasta else entrada.with_suffix(".segmentos")
+    info = os.stat(entrada)
+    with open(entrada, "r", encoding="utf-8") as f:
+        banco_total = json.load(f)
+    snapshot, erros = montar_snapshot(banco_total, 0, None)
+    if erros:
+        raise CatalogoError(erros[0])
+
+    try:
+        versao = int(ler_ponteiro(pasta)["versao"]) + 1
+    except (OSError, ValueError, KeyError, TypeError):
+        versao = 1
+
+    escritor = _Escritor()
+    idiomas = {}
+    for lang, secao in snapshot.secoes.items():
+        indexar_secao(secao)
+        contexto = secao._derivados.get("contexto")
+        if contexto is not None and not isinstance(contexto.produtos, FragmentosSobDemanda):
+            secao._derivados["contexto"] = dataclasses.replace(contexto, produtos=FragmentosSobDemanda(secao["produtos"]))
+        politicas = {chave: valor for chave, valor in secao.items() if chave != "produtos"}
+        idiomas[lang] = {
+            "politicas": escritor.adicionar_json(politicas),
+            "colunas": _colunas(escritor, secao),
+            "derivados": _derivados(escritor, secao),
+        }
+
+    cabecalho = json.dumps({
+        "formato": FORMATO,
+        "versao": versao,
+        "codigo": versao_codigo(),
+        "fonte": [info.st_mtime_ns, info.st_size],
+        "idiomas": idiomas,
+    }, ensure_ascii=False).encode("utf-8")
+    inicio = _CABECALHO.size + len(cabecalho)
+    inicio += -inicio % ALINHAMENTO
+
+    pasta.mkdir(parents=True, exist_ok=True)
+    nome = f"catalogo-{versao:06d}.seg"
+    _gravar_atomico(pasta / nome, [
+        _CABECALHO.pack(MAGICO, FORMATO, len(cabecalho)),
+        cabecalho,
+        bytes(inicio - _CABECALHO.size - len(cabecalho)),
+        *escritor.partes,
+    ])
+    _gravar_atomico(pasta / ARQUIVO_SEGMENTO_ATUAL, [
+        json.dumps({"segmento": nome, "versao": versao, "fonte": str(entrada)}).encode("utf-8")
+    ])
+
+    for antigo in sorted(pasta.glob("catalogo-*.seg"))[:-max(1, manter)]:
+        try:
+            antigo.unlink()
+        except OSError:
+            pass
+    return pasta / nome, versao, {lang: info["colunas"]["produtos"] for lang, info in idiomas.items()}
+
+
+class SecaoCompartilhada(SecaoCatalogo):
+    def __init__(self, dados, pendentes):
+        super().__init__(dados)
+        self._pendentes = pendentes
+
+    def derivado(self, chave, fabrica):
+        if chave not in self._derivados:
+            carregar = self._pendentes.get(chave)
+            if carregar is not None:
+                self._derivados[chave] = carregar()
+        return super().derivado(chave, fabrica)
+
+
+def carregar_secao(dados, info, codigo_atual):
+    def trecho(posicao):
+        inicio, tamanho = posicao
+        return dados[inicio:inicio + tamanho]
+
+    politicas = json.loads(bytes(trecho(info["politicas"])))
+    if not isinstance(politicas, dict):
+        raise CatalogoError("Políticas do segmento precisam ser um objeto.")
+    produtos = ProdutosCompartilhados(dados, info["colunas"])
+    secao = {**politicas, "produtos": produtos}
+
+    def carregador(derivado):
+        def carregar():
+            arquivo = io.BytesIO(trecho(derivado["pickle"]))
+            return _Desempacotador(arquivo, dados, produtos, [trecho(b) for b in derivado["buffers"]]).load()
+        return carregar
+
+    pendentes = {chave: carregador(derivado) for chave, derivado in info["derivados"].items()} if codigo_atual else {}
+    return SecaoCompartilhada(secao, pendentes)
+
+
+@dataclass(frozen=True)
+class SnapshotCompartilhado(SnapshotCatalogo):
+    segmento: str = ""
+    dados: memoryview | None = None
+    idiomas: dict = field(default_factory=dict)
+    codigo_atual: bool = True
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def obter(self, lang="pt"):
+        if lang not in self.idiomas:
+            lang = "pt"
+        secao = self.secoes.get(lang)
+        if secao is None:
+            with self._lock:
+                secao = self.secoes.get(lang)
+                if secao is None:
+                    try:
+                        secao = carregar_secao(self.dados, self.idiomas[lang], self.codigo_atual)
+                    except (*ERROS_LEITURA, KeyError, TypeError, CatalogoError) as erro:
+                        secao = secao_erro(mensagem_erro_catalogo(erro))
+                    self.secoes[lang] = secao
+        return secao
+
+
+def abrir_segmento(pasta, versao, assinatura):
+    pasta = Path(pasta)
+    try:
+        nome = ler_ponteiro(pasta)["segmento"]
+        with open(pasta / nome, "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, formato, tamanho = _CABECALHO.unpack_from(mapa, 0)
+        if magico != MAGICO or formato != FORMATO:
+            raise CatalogoError(f"Segmento '{nome}' tem formato não suportado.")
+        cabecalho = json.loads(bytes(mapa[_CABECALHO.size:_CABECALHO.size + tamanho]))
+        inicio = _CABECALHO.size + tamanho
+        dados = memoryview(mapa)[inicio + -inicio % ALINHAMENTO:]
+        idiomas = cabecalho["idiomas"]
+        if "pt" not in idiomas:
+            raise CatalogoError("O segmento precisa ter a seção 'pt'.")
+        codigo_atual = cabecalho.get("codigo") == versao_codigo()
+        secoes = {"pt": carregar_secao(dados, idiomas["pt"], codigo_atual)}
+    except (*ERROS_LEITURA, KeyError, TypeError, CatalogoError) as erro:
+        mensagem = mensagem_erro_catalogo(erro)
+        return SnapshotCatalogo(versao=versao, assinatura=assinatura, secoes={"pt": secao_erro(mensagem)}, valido=False), [mensagem]
+
+    return SnapshotCompartilhado(
+        versao=versao, assinatura=assinatura, secoes=secoes,
+        segmento=nome, dados=dados, idiomas=idiomas, codigo_atual=codigo_atual,
+    ), []
+
+
+def vigiar(entrada, pasta, manter=SEGMENTOS_MANTIDOS, intervalo=INTERVALO_PUBLICACAO):
+    publicada = None
+    while True:
+        try:
+            info = os.stat(entrada)
+        except OSError:
+            info = None
+        assinatura = (info.st_mtime_ns, info.st_size) if info else None
+        if assinatura is not None and assinatura != publicada:
+            publicada = assinatura
+            inicio = time.perf_counter()
+            try:
+                caminho, versao, produtos = publicar(entrada, pasta, manter)
+            except (OSError, json.JSONDecodeError, CatalogoError) as erro:
+                print(f"não publicado: {erro}", flush=True)
+            else:
+                print(f"{caminho} (versão {versao}, {produtos} produtos, {time.perf_counter() - inicio:.2f} s)", flush=True)
+        time.sleep(intervalo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publica o bd.json validado e indexado em um segmento mapeado pelos workers.")
+    parser.add_argument("entrada", nargs="?", default=str(caminho_bd))
+    parser.add_argument("pasta", nargs="?", help="pasta dos segmentos (padrão: <entrada>.segmentos)")
+    parser.add_argument("--manter", type=int, default=SEGMENTOS_MANTIDOS, help="segmentos antigos mantidos em disco")
+    parser.add_argument("--vigiar", action="store_true", help="republica sempre que o bd.json mudar")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_PUBLICACAO)
+    args = parser.parse_args(argv)
+    pasta = args.pasta or str(Path(args.entrada).with_suffix(".segmentos"))
+
+    if args.vigiar:
+        try:
+            vigiar(args.entrada, pasta, args.manter, args.intervalo)
+        except KeyboardInterrupt:
+            pass
+        return
+    try:
+        caminho, versao, produtos = publicar(args.entrada, pasta, args.manter)
+    except (OSError, json.JSONDecodeError, CatalogoError) as erro:
+        raise SystemExit(str(erro))
+    print(f"{caminho} (versão {versao}, {produtos} produtos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import gc
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from src.catalogo import (
+    CatalogoError,
+    SecaoCatalogo,
+    SnapshotCatalogo,
+    caminho_bd,
+    mensagem_erro_catalogo,
+    montar_snapshot,
+    secao_erro,
+)
+
+FORMATO = 2
+SUFIXO = ".compilado"
+MAGICO = b"LCPK"
+PASTA_CODIGO = Path(__file__).resolve().parent
+
+_CABECALHO = struct.Struct("=4sI")
+ERROS_LEITURA = (OSError, ValueError, EOFError, struct.error, pickle.UnpicklingError, AttributeError, ImportError)
+
+
+def caminho_compilado(caminho_json):
+    return Path(caminho_json).with_suffix(SUFIXO)
+
+
+@lru_cache(maxsize=1)
+def versao_codigo():
+    resumo = hashlib.sha1()
+    for arquivo in sorted(PASTA_CODIGO.glob("*.py")):
+        resumo.update(arquivo.name.encode("utf-8"))
+        resumo.update(arquivo.read_bytes())
+    return resumo.hexdigest()[:16]
+
+
+def desserializar(trecho):
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(trecho)
+    finally:
+        if ativo:
+            gc.enable()
+
+
+class SecaoCompilada(SecaoCatalogo):
+    def __init__(self, dados, pendentes):
+        super().__init__(dados)
+        self._pendentes = pendentes
+
+    def derivado(self, chave, fabrica):
+        if chave not in self._derivados:
+            trecho = self._pendentes.get(chave)
+            if trecho is not None:
+                self._derivados[chave] = desserializar(trecho)
+        return super().derivado(chave, fabrica)
+
+
+def indexar_secao(secao):
+    from src.busca import indice_aproximado
+    from src.cache_respostas import impressao_secao
+    from src.chatbot import IGNORAR_BUSCA, chaves_informativas, indice_catalogo
+    from src.contexto import contexto_catalogo
+    from src.recuperacao import indice_recuperacao
+
+    indice_catalogo(secao)
+    chaves_informativas(secao)
+    indice_aproximado(secao, IGNORAR_BUSCA)
+    contexto_catalogo(secao)
+    secao.derivado("impressao", impressao_secao)
+    indice_recuperacao(secao)
+
+
+def compilar(entrada=caminho_bd):
+    entrada = Path(entrada)
+    saida = caminho_compilado(entrada)
+    info = os.stat(entrada)
+    with open(entrada, "r", encoding="utf-8") as f:
+        banco_total = json.load(f)
+
+    snapshot, erros = montar_snapshot(banco_total, 0, None)
+    if erros:
+        raise CatalogoError(erros[0])
+
+    trechos = []
+    inicio = 0
+
+    def adicionar(valor):
+        nonlocal inicio
+        trecho = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        trechos.append(trecho)
+        inicio += len(trecho)
+        return [inicio - len(trecho), len(trecho)]
+
+    idiomas = {}
+    for lang, secao in snapshot.secoes.items():
+        indexar_secao(secao)
+        idiomas[lang] = {
+            "produtos": len(secao["produtos"]),
+            "secao": adicionar(dict(secao)),
+            "derivados": {chave: adicionar(valor) for chave, valor in secao._derivados.items()},
+        }
+
+    cabecalho = json.dumps({
+        "formato": FORMATO,
+        "codigo": versao_codigo(),
+        "fonte": [info.st_mtime_ns, info.st_size],
+        "idiomas": idiomas,
+    }).encode("utf-8")
+    temporario = saida.with_suffix(saida.suffix + ".tmp")
+    with open(temporario, "wb") as f:
+        f.write(_CABECALHO.pack(MAGICO, len(cabecalho)))
+        f.write(cabecalho)
+        for trecho in trechos:
+            f.write(trecho)
+    os.replace(temporario, saida)
+    return saida, idiomas
+
+
+def ler_cabecalho(dados):
+    magico, tamanho = _CABECALHO.unpack_from(dados, 0)
+    if magico != MAGICO:
+        raise ValueError("arquivo não é um catálogo compilado")
+    return json.loads(bytes(dados[_CABECALHO.size:_CABECALHO.size + tamanho])), _CABECALHO.size + tamanho
+
+
+def atualizado(cabecalho, assinatura):
+    return (
+        assinatura is not None
+        and cabecalho.get("formato") == FORMATO
+        and cabecalho.get("codigo") == versao_codigo()
+        and cabecalho.get("fonte") == list(assinatura)
+        and "pt" in cabecalho.get("idiomas", {})
+    )
+
+
+def carregar_secao(dados, info):
+    def trecho(posicao):
+        inicio, tamanho = posicao
+        return dados[inicio:inicio + tamanho]
+
+    secao = desserializar(trecho(info["secao"]))
+    if not isinstance(secao, dict) or len(secao.get("produtos", ())) != info["produtos"]:
+        raise CatalogoError("Seção do catálogo compilado não bate com o cabeçalho.")
+    return SecaoCompilada(secao, {chave: trecho(posicao) for chave, posicao in info["derivados"].items()})
+
+
+@dataclass(frozen=True)
+class SnapshotCompilado(SnapshotCatalogo):
+    dados: memoryview | None = None
+    idiomas: dict = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def obter(self, lang="pt"):
+        if lang not in self.idiomas:
+            lang = "pt"
+        secao = self.secoes.get(lang)
+        if secao is None:
+            with self._lock:
+                secao = self.secoes.get(lang)
+                if secao is None:
+                    try:
+                        secao = carregar_secao(self.dados, self.idiomas[lang])
+                    except (*ERROS_LEITURA, KeyError, CatalogoError) as erro:
+                        secao = secao_erro(mensagem_erro_catalogo(erro))
+                    self.secoes[lang] = secao
+        return secao
+
+
+def abrir_compilado(caminho_json, versao, assinatura):
+    try:
+        with open(caminho_compilado(caminho_json), "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        cabecalho, inicio = ler_cabecalho(mapa)
+        if not atualizado(cabecalho, assinatura):
+            return None
+        dados = memoryview(mapa)[inicio:]
+        idiomas = cabecalho["idiomas"]
+        secoes = {"pt": carregar_secao(dados, idiomas["pt"])}
+    except (*ERROS_LEITURA, KeyError, TypeError, CatalogoError):
+        return None
+    return SnapshotCompilado(versao=versao, assinatura=assinatura, secoes=secoes, dados=dados, idiomas=idiomas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valida o bd.json e grava um snapshot compilado e pré-indexado ao lado dele.")
+    parser.add_argument("entrada", nargs="?", default=str(caminho_bd))
+    args = parser.parse_args(argv)
+
+    try:
+        saida, idiomas = compilar(args.entrada)
+    except (OSError, json.JSONDecodeError, CatalogoError) as erro:
+        raise SystemExit(str(erro))
+    produtos = ", ".join(f"{lang}: {info['produtos']}" for lang, info in idiomas.items())
+    print(f"{saida} ({produtos} produtos, código {versao_codigo()})")
+
+
+if __name__ == "__main__":
+    main()
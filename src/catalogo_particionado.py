@@ -0,0 +1,282 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.catalogo import (
+    ARQUIVO_MANIFESTO,
+    CatalogoError,
+    SecaoCatalogo,
+    SnapshotCatalogo,
+    caminho_bd,
+    mensagem_erro_catalogo,
+    secao_erro,
+    validar_bd,
+)
+
+FORMATO = 1
+TAMANHO_BLOCO = int(os.getenv("LUMINA_TAMANHO_BLOCO", "1000"))
+MAX_BLOCOS_MEMORIA = int(os.getenv("LUMINA_BLOCOS_MEMORIA", "16"))
+
+MAGICO = b"LCAT"
+MARCA_ORDEM = 0x01020304
+_CABECALHO = struct.Struct("=4sIII")
+
+
+class ProdutosColunares(Sequence):
+    def __init__(self, pasta, nomes, precos, inicios_categorias, ids_categorias, tabela_categorias,
+                 total_blocos, tamanho_bloco, impressao, max_blocos=MAX_BLOCOS_MEMORIA):
+        self.pasta = Path(pasta)
+        self.nomes = nomes
+        self.precos = precos
+        self.inicios_categorias = inicios_categorias
+        self.ids_categorias = ids_categorias
+        self.tabela_categorias = tabela_categorias
+        self.total_blocos = total_blocos
+        self.tamanho_bloco = tamanho_bloco
+        self.impressao = impressao
+        self.max_blocos = max(1, max_blocos)
+        self.blocos_lidos = 0
+        self._blocos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de produto fora do catálogo")
+        numero, posicao = divmod(indice, self.tamanho_bloco)
+        return self._bloco(numero)[posicao]
+
+    def _bloco(self, numero):
+        with self._lock:
+            produtos = self._blocos.get(numero)
+            if produtos is not None:
+                self._blocos.move_to_end(numero)
+                return produtos
+
+        with open(self.pasta / nome_bloco(numero), "r", encoding="utf-8") as f:
+            produtos = tuple(json.load(f))
+        esperados = min(self.tamanho_bloco, len(self) - numero * self.tamanho_bloco)
+        if len(produtos) != esperados:
+            raise CatalogoError(f"Bloco {numero} de '{self.pasta.name}' tem {len(produtos)} produtos, esperado {esperados}.")
+
+        with self._lock:
+            self._blocos[numero] = produtos
+            self._blocos.move_to_end(numero)
+            while len(self._blocos) > self.max_blocos:
+                self._blocos.popitem(last=False)
+            self.blocos_lidos += 1
+        return produtos
+
+    def nome(self, indice):
+        return self.nomes[indice]
+
+    def preco(self, indice):
+        return self.precos[indice]
+
+    def categorias(self, indice):
+        inicio, fim = self.inicios_categorias[indice], self.inicios_categorias[indice + 1]
+        return [self.tabela_categorias[i] for i in self.ids_categorias[inicio:fim]]
+
+    def resumo(self):
+        for indice, nome in enumerate(self.nomes):
+            yield nome, self.categorias(indice)
+
+    @property
+    def blocos_em_memoria(self):
+        return len(self._blocos)
+
+
+def nome_bloco(numero):
+    return f"produtos-{numero:05d}.json"
+
+
+def _impressao(politicas, produtos):
+    resumo = hashlib.sha1(json.dumps(politicas, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    for produto in produtos:
+        resumo.update(json.dumps(produto, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return resumo.hexdigest()[:16]
+
+
+def _gravar(caminho, conteudo):
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+    temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def _gravar_secao(pasta, politicas, produtos, tamanho_bloco):
+    pasta.mkdir(parents=True, exist_ok=True)
+    tabela = {}
+    inicios = array("I", [0])
+    ids = array("I")
+    for produto in produtos:
+        for categoria in produto["categorias"]:
+            ids.append(tabela.setdefault(categoria, len(tabela)))
+        inicios.append(len(ids))
+    precos = array("d", (produto["preco"] for produto in produtos))
+
+    _gravar(pasta / "politicas.json", json.dumps(politicas, ensure_ascii=False))
+    _gravar(pasta / "colunas.json", json.dumps(
+        {"nomes": [produto["nome"] for produto in produtos], "categorias": list(tabela)}, ensure_ascii=False
+    ))
+    _gravar(pasta / "colunas.bin", b"".join([
+        _CABECALHO.pack(MAGICO, MARCA_ORDEM, len(produtos), len(ids)),
+        precos.tobytes(),
+        inicios.tobytes(),
+        ids.tobytes(),
+    ]))
+    for numero, inicio in enumerate(range(0, len(produtos), tamanho_bloco)):
+        _gravar(pasta / nome_bloco(numero), json.dumps(list(produtos[inicio:inicio + tamanho_bloco]), ensure_ascii=False))
+    return -(-len(produtos) // tamanho_bloco)
+
+
+def converter_bd(banco_total, pasta, tamanho_bloco=TAMANHO_BLOCO):
+    if not isinstance(banco_total, dict):
+        raise CatalogoError("O bd.json precisa ter um objeto principal.")
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    tamanho_bloco = max(1, tamanho_bloco)
+
+    anterior = {}
+    try:
+        with open(pasta / ARQUIVO_MANIFESTO, "r", encoding="utf-8") as f:
+            anterior = json.load(f).get("idiomas", {})
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    idiomas = {}
+    for lang in sorted(set(banco_total) | {"pt"}):
+        secao = validar_bd(banco_total, lang)
+        produtos = secao.pop("produtos")
+        impressao = _impressao(secao, produtos)
+        subpasta = f"{lang}-{impressao}"
+        blocos = _gravar_secao(pasta / subpasta, secao, produtos, tamanho_bloco)
+        idiomas[lang] = {"pasta": subpasta, "produtos": len(produtos), "blocos": blocos, "impressao": impressao}
+
+    _gravar(pasta / ARQUIVO_MANIFESTO, json.dumps(
+        {"formato": FORMATO, "tamanho_bloco": tamanho_bloco, "idiomas": idiomas}, ensure_ascii=False, indent=2
+    ))
+
+    em_uso = {info["pasta"] for info in idiomas.values()}
+    em_uso |= {info.get("pasta") for info in anterior.values() if isinstance(info, dict)}
+    for item in pasta.iterdir():
+        if item.is_dir() and item.name not in em_uso and "-" in item.name:
+            shutil.rmtree(item, ignore_errors=True)
+    return idiomas
+
+
+def ler_colunas(pasta, total_esperado):
+    with open(pasta / "colunas.json", "r", encoding="utf-8") as f:
+        colunas = json.load(f)
+    with open(pasta / "colunas.bin", "rb") as f:
+        bruto = f.read()
+
+    magico, marca, total, total_ids = _CABECALHO.unpack_from(bruto, 0)
+    if magico != MAGICO or marca != MARCA_ORDEM:
+        raise CatalogoError(f"Colunas inválidas em '{pasta.name}'.")
+    if total != total_esperado or len(colunas["nomes"]) != total:
+        raise CatalogoError(f"Colunas de '{pasta.name}' não batem com o manifesto.")
+
+    inicio = _CABECALHO.size
+    precos = array("d")
+    precos.frombytes(bruto[inicio:inicio + 8 * total])
+    inicio += 8 * total
+    inicios = array("I")
+    inicios.frombytes(bruto[inicio:inicio + 4 * (total + 1)])
+    inicio += 4 * (total + 1)
+    ids = array("I")
+    ids.frombytes(bruto[inicio:inicio + 4 * total_ids])
+    if len(ids) != total_ids:
+        raise CatalogoError(f"Colunas de '{pasta.name}' estão truncadas.")
+    return colunas["nomes"], precos, inicios, ids, tuple(colunas["categorias"])
+
+
+def carregar_secao(pasta, info, tamanho_bloco):
+    pasta = Path(pasta) / info["pasta"]
+    with open(pasta / "politicas.json", "r", encoding="utf-8") as f:
+        politicas = json.load(f)
+    if not isinstance(politicas, dict):
+        raise CatalogoError(f"Políticas de '{pasta.name}' precisam ser um objeto.")
+
+    nomes, precos, inicios, ids, tabela = ler_colunas(pasta, info["produtos"])
+    secao = SecaoCatalogo(politicas)
+    secao["produtos"] = ProdutosColunares(
+        pasta, nomes, precos, inicios, ids, tabela, info["blocos"], tamanho_bloco, info["impressao"]
+    )
+    return secao
+
+
+@dataclass(frozen=True)
+class SnapshotParticionado(SnapshotCatalogo):
+    pasta: Path | None = None
+    manifesto: dict = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def obter(self, lang="pt"):
+        idiomas = self.manifesto["idiomas"]
+        if lang not in idiomas:
+            lang = "pt"
+        secao = self.secoes.get(lang)
+        if secao is None:
+            with self._lock:
+                secao = self.secoes.get(lang)
+                if secao is None:
+                    try:
+                        secao = carregar_secao(self.pasta, idiomas[lang], self.manifesto["tamanho_bloco"])
+                    except (OSError, ValueError, KeyError, struct.error, CatalogoError) as erro:
+                        secao = secao_erro(mensagem_erro_catalogo(erro))
+                    self.secoes[lang] = secao
+        return secao
+
+
+def abrir_catalogo(pasta, versao, assinatura):
+    pasta = Path(pasta)
+    with open(pasta / ARQUIVO_MANIFESTO, "r", encoding="utf-8") as f:
+        manifesto = json.load(f)
+
+    try:
+        if manifesto.get("formato") != FORMATO:
+            raise CatalogoError(f"Formato de catálogo não suportado: {manifesto.get('formato')!r}.")
+        if "pt" not in manifesto.get("idiomas", {}):
+            raise CatalogoError("O catálogo precisa ter a seção 'pt'.")
+        secoes = {"pt": carregar_secao(pasta, manifesto["idiomas"]["pt"], manifesto["tamanho_bloco"])}
+    except (KeyError, TypeError, ValueError, struct.error, CatalogoError) as erro:
+        mensagem = mensagem_erro_catalogo(erro)
+        return SnapshotCatalogo(versao=versao, assinatura=assinatura, secoes={"pt": secao_erro(mensagem)}, valido=False), [mensagem]
+
+    return SnapshotParticionado(versao=versao, assinatura=assinatura, secoes=secoes, pasta=pasta, manifesto=manifesto), []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte o bd.json em um catálogo particionado por idioma e blocos de produtos.")
+    parser.add_argument("entrada", nargs="?", default=str(caminho_bd))
+    parser.add_argument("saida", help="pasta do catálogo particionado")
+    parser.add_argument("--tamanho-bloco", type=int, default=TAMANHO_BLOCO)
+    args = parser.parse_args(argv)
+
+    with open(args.entrada, "r", encoding="utf-8") as f:
+        banco_total = json.load(f)
+    idiomas = converter_bd(banco_total, args.saida, args.tamanho_bloco)
+    for lang, info in idiomas.items():
+        print(f"{lang}: {info['produtos']} produtos em {info['blocos']} blocos ({info['pasta']})")
+
+
+if __name__ == "__main__":
+    main()
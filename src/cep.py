@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+URL_VIACEP = os.getenv("LUMINA_VIACEP_URL", "https://viacep.com.br/ws/{cep}/json/")
+CAMINHO_CACHE_CEP = os.getenv("LUMINA_CEP_CACHE", str(RAIZ_PROJETO / "data" / "cep_cache.sqlite3"))
+TIMEOUT_VIACEP = 5
+TTL_POSITIVO = 30 * 24 * 3600
+TTL_NEGATIVO = 24 * 3600
+MAX_MEMORIA = 2048
+MAX_CONEXOES = 10
+
+
+def erros_rede():
+    import httpx
+
+    return (httpx.HTTPError,)
+
+
+def erro_timeout(erro):
+    import httpx
+
+    return isinstance(erro, httpx.TimeoutException)
+
+
+class CacheCep:
+    def __init__(
+        self,
+        caminho=CAMINHO_CACHE_CEP,
+        url=URL_VIACEP,
+        max_memoria=MAX_MEMORIA,
+        ttl_positivo=TTL_POSITIVO,
+        ttl_negativo=TTL_NEGATIVO,
+        timeout=TIMEOUT_VIACEP,
+    ):
+        self.url = url
+        self.max_memoria = max_memoria
+        self.ttl_positivo = ttl_positivo
+        self.ttl_negativo = ttl_negativo
+        self.timeout = timeout
+        self.consultas_rede = 0
+        self._memoria = OrderedDict()
+        self._lock = threading.Lock()
+        self._caminho = caminho
+        self._db = None
+        self._http_async = {}
+        self._em_andamento_async = {}
+        self._agendadas = {}
+
+    def _banco(self):
+        if self._db is None and self._caminho:
+            try:
+                Path(self._caminho).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(self._caminho, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cep (cep TEXT PRIMARY KEY, dados TEXT NOT NULL, expira REAL NOT NULL)"
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error):
+                self._desativar_disco()
+        return self._db
+
+    def _desativar_disco(self):
+        if self._db is not None:
+            self._db.close()
+        self._db = None
+        self._caminho = None
+
+    def _ler_memoria(self, cep, agora):
+        item = self._memoria.get(cep)
+        if item is None:
+            return None
+        expira, dados = item
+        if expira <= agora:
+            del self._memoria[cep]
+            return None
+        self._memoria.move_to_end(cep)
+        return dados
+
+    def _guardar_memoria(self, cep, dados, expira):
+        self._memoria[cep] = (expira, dados)
+        self._memoria.move_to_end(cep)
+        if len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def _ler_disco(self, cep, agora):
+        db = self._banco()
+        if db is None:
+            return None
+        try:
+            linha = db.execute("SELECT dados, expira FROM cep WHERE cep = ?", (cep,)).fetchone()
+        except sqlite3.Error:
+            self._desativar_disco()
+            return None
+        if linha is None or linha[1] <= agora:
+            return None
+        dados = json.loads(linha[0])
+        self._guardar_memoria(cep, dados, linha[1])
+        return dados
+
+    def _guardar(self, cep, dados):
+        ttl = self.ttl_negativo if "erro" in dados else self.ttl_positivo
+        expira = time.time() + ttl
+        with self._lock:
+            self._guardar_memoria(cep, dados, expira)
+            db = self._banco()
+            if db is not None:
+                try:
+                    db.execute(
+                        "INSERT OR REPLACE INTO cep (cep, dados, expira) VALUES (?, ?, ?)",
+                        (cep, json.dumps(dados, ensure_ascii=False), expira),
+                    )
+                    db.commit()
+                except sqlite3.Error:
+                    self._desativar_disco()
+
+    def _ler_cache(self, cep, agora):
+        dados = self._ler_memoria(cep, agora)
+        if dados is None:
+            dados = self._ler_disco(cep, agora)
+        return dados
+
+    def em_cache(self, cep_limpo):
+        with self._lock:
+            return self._ler_cache(cep_limpo, time.time())
+
+    def agendar(self, cep_limpo, funcao):
+        loop = asyncio.get_running_loop()
+        chave = (loop, cep_limpo)
+        if chave in self._agendadas:
+            return False
+        tarefa = self._agendadas[chave] = loop.create_task(funcao(cep_limpo))
+        tarefa.add_done_callback(lambda _: self._agendadas.pop(chave, None))
+        return True
+
+    def _http_do_loop(self, loop):
+        http = self._http_async.get(loop)
+        if http is None:
+            import httpx
+
+            for antigo in [l for l in self._http_async if l.is_closed()]:
+                del self._http_async[antigo]
+            http = self._http_async[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=MAX_CONEXOES, max_keepalive_connections=MAX_CONEXOES)
+            )
+        return http
+
+    async def _buscar_rede_async(self, cep, timeout):
+        with self._lock:
+            self.consultas_rede += 1
+        http = self._http_do_loop(asyncio.get_running_loop())
+        resposta = await http.get(self.url.format(cep=cep), timeout=timeout)
+        resposta.raise_for_status()
+        dados = resposta.json()
+        if not isinstance(dados, dict):
+            raise ValueError("Resposta inesperada do ViaCEP.")
+        return dados
+
+    async def consultar_async(self, cep_limpo, timeout=None):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            dados = self._ler_cache(cep_limpo, time.time())
+        if dados is not None:
+            return dados
+
+        chave = (loop, cep_limpo)
+        futuro = self._em_andamento_async.get(chave)
+        if futuro is not None:
+            try:
+                return await asyncio.shield(futuro)
+            except asyncio.CancelledError:
+                if not futuro.cancelled():
+                    raise
+            return await self.consultar_async(cep_limpo, timeout)
+
+        futuro = self._em_andamento_async[chave] = loop.create_future()
+        try:
+            dados = await self._buscar_rede_async(cep_limpo, timeout or self.timeout)
+            self._guardar(cep_limpo, dados)
+            futuro.set_result(dados)
+            return dados
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except Exception as erro:
+            futuro.set_exception(erro)
+            futuro.exception()
+            raise
+        finally:
+            del self._em_andamento_async[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._memoria.clear()
+            db = self._banco()
+            if db is not None:
+                db.execute("DELETE FROM cep")
+                db.commit()
+
+
+cache_cep = CacheCep()
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+
+MAX_CONEXOES_POR_CHAVE = 10
+KEEPALIVE_SEGUNDOS = 60.0
+OCIOSIDADE_MAXIMA_SEGUNDOS = 300.0
+
+
+def modulo_groq():
+    import groq
+
+    return groq
+
+
+@dataclass
+class _ClienteRegistrado:
+    client: object
+    ultimo_uso: float
+    em_uso: int = 0
+
+
+class RegistroClientesGroq:
+    def __init__(
+        self,
+        max_conexoes=MAX_CONEXOES_POR_CHAVE,
+        keepalive=KEEPALIVE_SEGUNDOS,
+        ociosidade_maxima=OCIOSIDADE_MAXIMA_SEGUNDOS,
+    ):
+        self.max_conexoes = max_conexoes
+        self.keepalive = keepalive
+        self.ociosidade_maxima = ociosidade_maxima
+        self._clientes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clientes)
+
+    def _limites(self):
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.max_conexoes,
+            max_keepalive_connections=self.max_conexoes,
+            keepalive_expiry=self.keepalive,
+        )
+
+    def _criar(self, api_key):
+        groq = modulo_groq()
+        return groq.Groq(api_key=api_key, max_retries=0, http_client=groq.DefaultHttpxClient(limits=self._limites()))
+
+    def _ociosos(self, agora):
+        return [
+            chave for chave, registro in self._clientes.items()
+            if registro.em_uso == 0 and agora - registro.ultimo_uso > self.ociosidade_maxima
+        ]
+
+    def _despejar_ociosos(self, agora):
+        return [self._clientes.pop(chave).client for chave in self._ociosos(agora)]
+
+    @contextmanager
+    def usar(self, api_key):
+        agora = time.monotonic()
+        with self._lock:
+            despejados = self._despejar_ociosos(agora)
+            registro = self._clientes.get(api_key)
+            if registro is None:
+                registro = self._clientes[api_key] = _ClienteRegistrado(self._criar(api_key), agora)
+            registro.em_uso += 1
+
+        for client in despejados:
+            client.close()
+
+        try:
+            yield registro.client
+        finally:
+            with self._lock:
+                registro.em_uso -= 1
+                registro.ultimo_uso = time.monotonic()
+
+    def fechar(self):
+        with self._lock:
+            clientes = [registro.client for registro in self._clientes.values()]
+            self._clientes.clear()
+        for client in clientes:
+            client.close()
+
+
+class RegistroClientesGroqAsync(RegistroClientesGroq):
+    def _criar(self, api_key):
+        groq = modulo_groq()
+        return groq.AsyncGroq(api_key=api_key, max_retries=0, http_client=groq.DefaultAsyncHttpxClient(limits=self._limites()))
+
+    @asynccontextmanager
+    async def usar(self, api_key):
+        loop = asyncio.get_running_loop()
+        chave = (loop, api_key)
+        agora = time.monotonic()
+        with self._lock:
+            for orfa in [c for c in self._clientes if c[0].is_closed()]:
+                del self._clientes[orfa]
+            despejados = [
+                (c, self._clientes.pop(c).client)
+                for c in self._ociosos(agora)
+            ]
+            registro = self._clientes.get(chave)
+            if registro is None:
+                registro = self._clientes[chave] = _ClienteRegistrado(self._criar(api_key), agora)
+            registro.em_uso += 1
+
+        for (loop_cliente, _), client in despejados:
+            if loop_cliente is loop:
+                loop.create_task(client.close())
+            else:
+                asyncio.run_coroutine_threadsafe(client.close(), loop_cliente)
+
+        try:
+            yield registro.client
+        finally:
+            with self._lock:
+                registro.em_uso -= 1
+                registro.ultimo_uso = time.monotonic()
+
+    def fechar(self):
+        with self._lock:
+            self._clientes.clear()
+
+    async def fechar_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            proprios = [c for c in self._clientes if c[0] is loop]
+            clientes = [self._clientes.pop(c).client for c in proprios]
+        for client in clientes:
+            await client.close()
+
+
+clientes_groq = RegistroClientesGroq()
+clientes_groq_async = RegistroClientesGroqAsync()
@@ -0,0 +1,153 @@
+import json
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from src.catalogo import posicoes_por_nome
+
+ORCAMENTO_TOKENS = int(os.getenv("LUMINA_CONTEXTO_TOKENS", "600"))
+CARACTERES_POR_TOKEN = 4
+MAX_POSTAGENS_POR_TERMO = 500
+PESO_TITULO = 3
+PESO_TEXTO = 1
+BONUS_PRODUTO_ATUAL = 5
+
+_RE_PALAVRA = re.compile(r"\w{3,}")
+
+
+def estimar_tokens(texto):
+    return len(texto) // CARACTERES_POR_TOKEN + 1
+
+
+def _palavras(texto):
+    return set(_RE_PALAVRA.findall(str(texto).lower()))
+
+
+@dataclass(frozen=True)
+class Fragmento:
+    tipo: str
+    posicao: int
+    json: str
+    tokens: int
+
+
+class FragmentosSobDemanda:
+    def __init__(self, produtos):
+        self._produtos = produtos
+        self._fragmentos = {}
+
+    def __len__(self):
+        return len(self._produtos)
+
+    def __getitem__(self, posicao):
+        fragmento = self._fragmentos.get(posicao)
+        if fragmento is None:
+            texto = json.dumps(self._produtos[posicao], ensure_ascii=False)
+            fragmento = self._fragmentos[posicao] = Fragmento("produto", posicao, texto, estimar_tokens(texto))
+        return fragmento
+
+    def __iter__(self):
+        return (self[posicao] for posicao in range(len(self)))
+
+
+@dataclass
+class ContextoCatalogo:
+    politicas: list
+    produtos: list
+    postagens: dict
+    posicao_por_nome: dict
+
+    def fragmento(self, chave):
+        tipo, posicao = chave
+        return (self.politicas if tipo == "politica" else self.produtos)[posicao]
+
+
+def construir_contexto(bd_idioma):
+    politicas = []
+    produtos = []
+    postagens = defaultdict(list)
+
+    def indexar(chave, titulo, corpo):
+        palavras_titulo = _palavras(titulo)
+        for palavra in palavras_titulo:
+            postagens[palavra].append((chave, PESO_TITULO))
+        for palavra in _palavras(corpo) - palavras_titulo:
+            postagens[palavra].append((chave, PESO_TEXTO))
+
+    for chave, valor in bd_idioma.items():
+        if chave == "produtos":
+            continue
+        texto = f"{json.dumps(chave, ensure_ascii=False)}: {json.dumps(valor, ensure_ascii=False)}"
+        politicas.append(Fragmento("politica", len(politicas), texto, estimar_tokens(texto)))
+        indexar(("politica", len(politicas) - 1), chave, valor)
+
+    catalogo = bd_idioma.get("produtos", [])
+    if hasattr(catalogo, "resumo"):
+        produtos = FragmentosSobDemanda(catalogo)
+        for posicao, (nome, categorias) in enumerate(catalogo.resumo()):
+            indexar(("produto", posicao), " ".join([nome, *categorias]), "")
+    else:
+        for posicao, produto in enumerate(catalogo):
+            texto = json.dumps(produto, ensure_ascii=False)
+            produtos.append(Fragmento("produto", posicao, texto, estimar_tokens(texto)))
+            titulo = " ".join([produto["nome"], *produto.get("categorias", [])])
+            corpo = " ".join([produto.get("descricao", ""), *map(str, produto.get("cores", []))])
+            indexar(("produto", posicao), titulo, corpo)
+
+    return ContextoCatalogo(
+        politicas=politicas,
+        produtos=produtos,
+        postagens={palavra: lista[:MAX_POSTAGENS_POR_TERMO] for palavra, lista in postagens.items()},
+        posicao_por_nome=posicoes_por_nome(bd_idioma),
+    )
+
+
+def contexto_catalogo(bd_idioma):
+    derivado = getattr(bd_idioma, "derivado", None)
+    if derivado is not None:
+        return derivado("contexto", construir_contexto)
+    return construir_contexto(bd_idioma)
+
+
+def ranquear(contexto, msg_l, produto_atual=None):
+    pontos = defaultdict(int)
+    for palavra in _palavras(msg_l):
+        for chave, peso in contexto.postagens.get(palavra, ()):
+            pontos[chave] += peso
+
+    if produto_atual is not None:
+        posicao = contexto.posicao_por_nome.get(produto_atual.get("nome"))
+        if posicao is not None:
+            pontos[("produto", posicao)] += BONUS_PRODUTO_ATUAL
+
+    return sorted(pontos, key=lambda chave: (-pontos[chave], chave[1]))
+
+
+def montar_contexto(bd_idioma, msg_l, produto_atual=None, orcamento=None):
+    if orcamento is None:
+        orcamento = ORCAMENTO_TOKENS
+    contexto = contexto_catalogo(bd_idioma)
+    escolhidos = set()
+    usados = 2
+
+    def cabe(fragmento):
+        nonlocal usados
+        if usados + fragmento.tokens > orcamento:
+            return False
+        escolhidos.add((fragmento.tipo, fragmento.posicao))
+        usados += fragmento.tokens
+        return True
+
+    for chave in ranquear(contexto, msg_l, produto_atual):
+        cabe(contexto.fragmento(chave))
+    for fragmento in contexto.politicas:
+        if ("politica", fragmento.posicao) not in escolhidos:
+            cabe(fragmento)
+    for fragmento in contexto.produtos:
+        if ("produto", fragmento.posicao) not in escolhidos and not cabe(fragmento):
+            break
+
+    produtos = [contexto.produtos[posicao].json for tipo, posicao in sorted(escolhidos) if tipo == "produto"]
+    politicas = [f.json for f in contexto.politicas if ("politica", f.posicao) in escolhidos]
+    return "{" + ", ".join([f'"produtos": [{", ".join(produtos)}]', *politicas]) + "}"
@@ -0,0 +1,176 @@
+import argparse
+import csv
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+CAMINHO_FAIXAS = Path(os.getenv("LUMINA_FAIXAS_CEP", str(RAIZ_PROJETO / "data" / "faixas_cep.bin")))
+
+MAGICO = b"LCEP"
+MARCA_ORDEM = 0x01020304
+_CABECALHO = struct.Struct("=4sIII")
+
+FAIXAS_UF = [
+    ("01000000", "19999999", "SP"),
+    ("20000000", "28999999", "RJ"),
+    ("29000000", "29999999", "ES"),
+    ("30000000", "39999999", "MG"),
+    ("40000000", "48999999", "BA"),
+    ("49000000", "49999999", "SE"),
+    ("50000000", "56999999", "PE"),
+    ("57000000", "57999999", "AL"),
+    ("58000000", "58999999", "PB"),
+    ("59000000", "59999999", "RN"),
+    ("60000000", "63999999", "CE"),
+    ("64000000", "64999999", "PI"),
+    ("65000000", "65999999", "MA"),
+    ("66000000", "68899999", "PA"),
+    ("68900000", "68999999", "AP"),
+    ("69000000", "69299999", "AM"),
+    ("69300000", "69399999", "RR"),
+    ("69400000", "69899999", "AM"),
+    ("69900000", "69999999", "AC"),
+    ("70000000", "72799999", "DF"),
+    ("72800000", "72999999", "GO"),
+    ("73000000", "73699999", "DF"),
+    ("73700000", "76799999", "GO"),
+    ("76800000", "76999999", "RO"),
+    ("77000000", "77999999", "TO"),
+    ("78000000", "78899999", "MT"),
+    ("79000000", "79999999", "MS"),
+    ("80000000", "87999999", "PR"),
+    ("88000000", "89999999", "SC"),
+    ("90000000", "99999999", "RS"),
+]
+
+
+class FaixasCepError(Exception):
+    pass
+
+
+class TabelaFaixas:
+    def __init__(self, inicios, fins, locais, nomes):
+        self.inicios = inicios
+        self.fins = fins
+        self.locais = locais
+        self.nomes = nomes
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def localizar(self, cep_limpo):
+        numero = int(cep_limpo)
+        posicao = bisect_right(self.inicios, numero) - 1
+        if posicao < 0 or numero > self.fins[posicao]:
+            return None
+        uf, _, cidade = self.nomes[self.locais[posicao]].partition("|")
+        return uf, cidade or None
+
+
+def tabela_uf():
+    nomes = sorted({uf for _, _, uf in FAIXAS_UF})
+    return TabelaFaixas(
+        array("I", (int(inicio) for inicio, _, _ in FAIXAS_UF)),
+        array("I", (int(fim) for _, fim, _ in FAIXAS_UF)),
+        array("I", (nomes.index(uf) for _, _, uf in FAIXAS_UF)),
+        nomes,
+    )
+
+
+def _limpar(cep):
+    cep_limpo = re.sub(r"\D", "", cep)
+    if len(cep_limpo) != 8:
+        raise FaixasCepError(f"CEP inválido na tabela de faixas: {cep!r}")
+    return int(cep_limpo)
+
+
+def importar_csv(caminho_csv, caminho_saida=CAMINHO_FAIXAS):
+    faixas = []
+    with open(caminho_csv, "r", encoding="utf-8", newline="") as f:
+        for linha in csv.DictReader(f):
+            uf = linha["uf"].strip().upper()
+            cidade = (linha.get("cidade") or "").strip()
+            faixas.append((_limpar(linha["inicio"]), _limpar(linha["fim"]), f"{uf}|{cidade}" if cidade else uf))
+
+    faixas.sort()
+    for (_, fim_anterior, _), (inicio, fim, local) in zip(faixas, faixas[1:]):
+        if inicio <= fim_anterior:
+            raise FaixasCepError(f"Faixa sobreposta começando em {inicio:08d} ({local}).")
+    for inicio, fim, local in faixas:
+        if fim < inicio:
+            raise FaixasCepError(f"Faixa invertida começando em {inicio:08d} ({local}).")
+
+    nomes = sorted({local for _, _, local in faixas})
+    posicao_nome = {nome: i for i, nome in enumerate(nomes)}
+    blob_nomes = "\n".join(nomes).encode("utf-8")
+
+    caminho_saida = Path(caminho_saida)
+    caminho_temporario = caminho_saida.with_suffix(caminho_saida.suffix + ".tmp")
+    with open(caminho_temporario, "wb") as f:
+        f.write(_CABECALHO.pack(MAGICO, MARCA_ORDEM, len(faixas), len(blob_nomes)))
+        array("I", (inicio for inicio, _, _ in faixas)).tofile(f)
+        array("I", (fim for _, fim, _ in faixas)).tofile(f)
+        array("I", (posicao_nome[local] for _, _, local in faixas)).tofile(f)
+        f.write(blob_nomes)
+    os.replace(caminho_temporario, caminho_saida)
+    return len(faixas)
+
+
+def abrir_tabela(caminho):
+    with open(caminho, "rb") as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magico, marca, total, tamanho_nomes = _CABECALHO.unpack_from(mapa, 0)
+    if magico != MAGICO or marca != MARCA_ORDEM:
+        raise FaixasCepError(f"Arquivo de faixas inválido: {caminho}")
+
+    visao = memoryview(mapa)
+    inicio = _CABECALHO.size
+    passo = total * 4
+    colunas = [visao[inicio + passo * i:inicio + passo * (i + 1)].cast("I") for i in range(3)]
+    fim_colunas = inicio + passo * 3
+    nomes = bytes(visao[fim_colunas:fim_colunas + tamanho_nomes]).decode("utf-8").split("\n")
+    return TabelaFaixas(*colunas, nomes)
+
+
+_tabelas = None
+
+
+def tabelas_faixas():
+    global _tabelas
+    if _tabelas is None:
+        tabelas = []
+        if CAMINHO_FAIXAS.exists():
+            try:
+                tabelas.append(abrir_tabela(CAMINHO_FAIXAS))
+            except (OSError, ValueError, struct.error, FaixasCepError):
+                pass
+        tabelas.append(tabela_uf())
+        _tabelas = tabelas
+    return _tabelas
+
+
+def localizar_cep(cep_limpo):
+    for tabela in tabelas_faixas():
+        local = tabela.localizar(cep_limpo)
+        if local is not None:
+            return local
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera a tabela binária de faixas de CEP a partir de um CSV.")
+    parser.add_argument("csv", help="CSV com as colunas inicio, fim, uf e cidade (opcional)")
+    parser.add_argument("saida", nargs="?", default=str(CAMINHO_FAIXAS))
+    args = parser.parse_args(argv)
+    total = importar_csv(args.csv, args.saida)
+    print(f"{total} faixas gravadas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import math
+import re
+import sys
+from collections import Counter, OrderedDict
+
+TEXTOS_REFERENCIA = {
+    "pt": [
+        "Olá, bom dia! Vocês têm camisetas pretas no tamanho médio?",
+        "Quero comprar uma jaqueta e preciso saber o preço com frete.",
+        "Qual é o prazo de entrega para o meu endereço?",
+        "Aceitam pagamento no cartão de crédito, boleto ou pix?",
+        "Como funciona a troca e a devolução dos produtos?",
+        "Quanto custa a mochila? Tem desconto pagando à vista?",
+        "Gostaria de ver o catálogo completo da loja.",
+        "Obrigado pela ajuda, até mais e tenha uma boa tarde.",
+        "Meu pedido ainda não chegou, como faço para rastrear?",
+        "Vocês vendem vestidos de festa? E calças jeans?",
+        "Esse tênis serve para corrida ou só para usar no dia a dia?",
+        "Qual o horário de atendimento do suporte por telefone?",
+        "Preciso trocar o tamanho da blusa que comprei ontem.",
+        "Tem promoção de colar e pulseira nesta semana?",
+        "Quais são as cores disponíveis do boné?",
+        "Onde fica a tabela de medidas? Não sei qual tamanho escolher.",
+        "Quero duas unidades, quanto fica o total?",
+        "Posso parcelar a compra em várias vezes sem juros?",
+        "A entrega é feita pelos correios ou por transportadora?",
+        "Não consegui finalizar a compra, apareceu um erro no pagamento.",
+        "Vocês enviam para todo o Brasil? Moro no interior de Minas.",
+        "Essa peça é de algodão? Ela encolhe depois de lavar?",
+        "Quero saber se ainda tem estoque da calça cargo.",
+        "Boa noite, queria uma ajuda para escolher um presente.",
+        "Qual é a política de devolução se o produto vier com defeito?",
+        "Tchau, valeu pela atenção!",
+        "Não gostei da cor, posso devolver e pedir outra?",
+        "O frete é grátis acima de quanto?",
+        "Oi, tudo bem? Estou procurando uma jaqueta corta vento.",
+        "Vocês têm loja física ou só vendem pela internet?",
+        "Quando vai chegar a nova coleção de verão?",
+        "Pode me mandar o link do produto, por favor?",
+        "Qual o valor do frete para o meu cep? O tenis e o bone chegam juntos?",
+        "Valeu, tchau! Depois eu volto para ver as novidades.",
+    ],
+    "en": [
+        "Hello, good morning! Do you have black t-shirts in medium size?",
+        "I want to buy a jacket and need to know the price with shipping.",
+        "What is the delivery time to my address?",
+        "Do you accept payment by credit card or bank transfer?",
+        "How do exchanges and returns work for your products?",
+        "How much does the backpack cost? Is there a discount?",
+        "I would like to see the full store catalog.",
+        "Thank you for the help, see you later and have a nice day.",
+        "My order has not arrived yet, how can I track it?",
+        "Do you sell party dresses? What about jeans?",
+        "Are these sneakers good for running or just for everyday wear?",
+        "What are the support hours by phone?",
+        "I need to exchange the size of the shirt I bought yesterday.",
+        "Is there a sale on necklaces and bracelets this week?",
+        "Which colors are available for the cap?",
+        "Where is the size chart? I am not sure which size to choose.",
+        "I want two units, what is the total?",
+        "Can I pay in installments without interest?",
+        "Is delivery made by mail or by a courier company?",
+        "I could not finish my purchase, there was a payment error.",
+        "Do you ship to the whole country? I live in a small town.",
+        "Is this piece made of cotton? Does it shrink after washing?",
+        "I want to know if the cargo pants are still in stock.",
+        "Good evening, I would like some help choosing a gift.",
+        "What is the return policy if the product arrives damaged?",
+        "Bye, thanks for your attention!",
+        "I did not like the color, can I return it and order another?",
+        "Is shipping free above a certain amount?",
+        "Hi, how are you? I am looking for a windbreaker jacket.",
+        "Do you have a physical store or do you only sell online?",
+        "When will the new summer collection arrive?",
+        "Could you send me the product link, please?",
+        "What is the shipping cost to my zip code? Will the sneakers and the cap ship together?",
+        "Thanks, bye! I will come back later to check the new arrivals.",
+    ],
+}
+
+ORDENS_NGRAMA = (1, 2, 3)
+MARGEM_INGLES = 4.5
+_RE_PALAVRA = re.compile(r"[^\W\d_]+")
+
+
+def _ngramas(texto_l):
+    for palavra in _RE_PALAVRA.findall(texto_l):
+        palavra = f" {palavra} "
+        for n in ORDENS_NGRAMA:
+            for i in range(len(palavra) - n + 1):
+                yield palavra[i:i + n]
+
+
+def construir_tabela(textos=TEXTOS_REFERENCIA):
+    contagens = {lang: Counter(_ngramas(" ".join(frases).lower())) for lang, frases in textos.items()}
+    vocabulario = set().union(*contagens.values())
+    totais = {lang: sum(contagem.values()) + len(vocabulario) + 1 for lang, contagem in contagens.items()}
+
+    def log_prob(lang, grama):
+        return math.log((contagens[lang][grama] + 1) / totais[lang])
+
+    tabela = {g: log_prob("en", g) - log_prob("pt", g) for g in vocabulario}
+    padrao = math.log(totais["pt"] / totais["en"])
+    return tabela, padrao
+
+
+_tabela = None
+
+
+def tabela_ngramas():
+    global _tabela
+    if _tabela is None:
+        _tabela = construir_tabela()
+    return _tabela
+
+
+def pontuar_ngramas(texto_l):
+    tabela, padrao = tabela_ngramas()
+    return sum(tabela.get(grama, padrao) for grama in _ngramas(texto_l))
+
+
+def detectar_por_ngramas(texto_l, margem=MARGEM_INGLES):
+    return "en" if pontuar_ngramas(texto_l) > margem else "pt"
+
+
+class CacheIdioma:
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.bytes_textos = 0
+        self._itens = OrderedDict()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, texto_l):
+        lang = self._itens.get(texto_l)
+        if lang is not None:
+            self._itens.move_to_end(texto_l)
+        return lang
+
+    def guardar(self, texto_l, lang):
+        if texto_l not in self._itens:
+            self.bytes_textos += sys.getsizeof(texto_l)
+        self._itens[texto_l] = lang
+        self._itens.move_to_end(texto_l)
+        if len(self._itens) > self.maxsize:
+            antigo, _ = self._itens.popitem(last=False)
+            self.bytes_textos -= sys.getsizeof(antigo)
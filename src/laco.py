@@ -0,0 +1,54 @@
+import asyncio
+import contextvars
+import os
+import threading
+
+
+class LacoFundo:
+    def __init__(self, nome="lumina-async"):
+        self.nome = nome
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _garantir(self):
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.nome, daemon=True)
+                self._thread.start()
+            if threading.current_thread() is self._thread:
+                raise RuntimeError("O laço de fundo não pode esperar por si mesmo.")
+            return self._loop
+
+    def executar(self, coro):
+        try:
+            loop = self._garantir()
+        except RuntimeError:
+            coro.close()
+            raise
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def iterar(self, gerador):
+        loop = self._garantir()
+        contexto = contextvars.copy_context()
+        try:
+            while True:
+                try:
+                    yield self._no_contexto(loop, gerador.__anext__(), contexto)
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._no_contexto(loop, gerador.aclose(), contexto)
+
+    @staticmethod
+    def _no_contexto(loop, coro, contexto):
+        async def passo():
+            return await asyncio.get_running_loop().create_task(coro, context=contexto)
+
+        return asyncio.run_coroutine_threadsafe(passo(), loop).result()
+
+
+laco_fundo = LacoFundo()
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+ATIVAR_METRICAS = os.getenv("LUMINA_METRICAS", "0") == "1"
+LIMITES_SEGUNDOS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ETAPA = "lumina_etapa_segundos"
+RAMO = "lumina_ramo_total"
+CHAMADA_EXTERNA = "lumina_chamada_externa_total"
+TOKENS_GROQ = "lumina_groq_tokens_total"
+
+
+class Histograma:
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites=LIMITES_SEGUNDOS):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def percentil(self, p):
+        if not self.total:
+            return 0.0
+        alvo = self.total * p / 100
+        acumulado = 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return limite
+        return float("inf")
+
+
+class RegistroMetricas:
+    def __init__(self, limites=LIMITES_SEGUNDOS):
+        self.limites = limites
+        self._histogramas = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def observar(self, nome, valor, rotulos=()):
+        with self._lock:
+            histograma = self._histogramas.get((nome, rotulos))
+            if histograma is None:
+                histograma = self._histogramas[(nome, rotulos)] = Histograma(self.limites)
+            histograma.observar(valor)
+
+    def contar(self, nome, rotulos=(), valor=1):
+        chave = (nome, rotulos)
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def limpar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+
+    def como_dict(self):
+        with self._lock:
+            histogramas = [
+                {
+                    "nome": nome,
+                    "rotulos": dict(rotulos),
+                    "total": h.total,
+                    "soma": h.soma,
+                    "p50": h.percentil(50),
+                    "p99": h.percentil(99),
+                    "baldes": dict(zip([str(l) for l in h.limites] + ["+Inf"], h.contagens)),
+                }
+                for (nome, rotulos), h in sorted(self._histogramas.items())
+            ]
+            contadores = [
+                {"nome": nome, "rotulos": dict(rotulos), "valor": valor}
+                for (nome, rotulos), valor in sorted(self._contadores.items())
+            ]
+        return {"histogramas": histogramas, "contadores": contadores}
+
+    def json(self):
+        return json.dumps(self.como_dict(), ensure_ascii=False, indent=2)
+
+    def prometheus(self):
+        linhas = []
+        dados = self.como_dict()
+
+        def rotulos_texto(rotulos, extra=None):
+            itens = list(rotulos.items()) + ([extra] if extra else [])
+            if not itens:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in itens) + "}"
+
+        tipos_vistos = set()
+        for h in dados["histogramas"]:
+            if h["nome"] not in tipos_vistos:
+                tipos_vistos.add(h["nome"])
+                linhas.append(f"# TYPE {h['nome']} histogram")
+            acumulado = 0
+            for limite, contagem in h["baldes"].items():
+                acumulado += contagem
+                linhas.append(f"{h['nome']}_bucket{rotulos_texto(h['rotulos'], ('le', limite))} {acumulado}")
+            linhas.append(f"{h['nome']}_sum{rotulos_texto(h['rotulos'])} {h['soma']}")
+            linhas.append(f"{h['nome']}_count{rotulos_texto(h['rotulos'])} {h['total']}")
+        for c in dados["contadores"]:
+            if c["nome"] not in tipos_vistos:
+                tipos_vistos.add(c["nome"])
+                linhas.append(f"# TYPE {c['nome']} counter")
+            linhas.append(f"{c['nome']}{rotulos_texto(c['rotulos'])} {c['valor']}")
+        return "\n".join(linhas) + "\n"
+
+
+class _CronometroNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _CronometroNulo()
+
+
+class _Cronometro:
+    __slots__ = ("metricas", "rotulos", "inicio")
+
+    def __init__(self, metricas, rotulos):
+        self.metricas = metricas
+        self.rotulos = rotulos
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metricas._observar(ETAPA, time.perf_counter() - self.inicio, self.rotulos)
+        return False
+
+
+class Metricas:
+    def __init__(self, ativo=ATIVAR_METRICAS, registro=None):
+        self.ativo = ativo
+        self.registro = registro if registro is not None else RegistroMetricas()
+        self._destinos = [self.registro]
+
+    def ativar(self, ativo=True):
+        self.ativo = ativo
+
+    def adicionar_destino(self, destino):
+        self._destinos.append(destino)
+
+    def remover_destino(self, destino):
+        self._destinos.remove(destino)
+
+    def _observar(self, nome, valor, rotulos):
+        for destino in self._destinos:
+            destino.observar(nome, valor, rotulos)
+
+    def etapa(self, nome):
+        if not self.ativo:
+            return _NULO
+        return _Cronometro(self, (("etapa", nome),))
+
+    def contar(self, nome, valor=1, **rotulos):
+        if not self.ativo:
+            return
+        chave = tuple(sorted(rotulos.items()))
+        for destino in self._destinos:
+            destino.contar(nome, chave, valor)
+
+    def registrar_uso_groq(self, uso):
+        if not self.ativo or uso is None:
+            return
+        self.contar(TOKENS_GROQ, uso.prompt_tokens or 0, tipo="prompt")
+        self.contar(TOKENS_GROQ, uso.completion_tokens or 0, tipo="resposta")
+
+
+metricas = Metricas()
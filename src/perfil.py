@@ -0,0 +1,209 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from src.catalogo import RAIZ_PROJETO
+
+ATIVAR_PERFIL = os.getenv("LUMINA_PERFIL", "0").strip().lower() in {"1", "true", "sim", "yes"}
+LIMIAR_PERFIL = float(os.getenv("LUMINA_PERFIL_LIMIAR", "1.0"))
+AMOSTRA_PERFIL = int(os.getenv("LUMINA_PERFIL_AMOSTRA", "0"))
+MAX_PERFIS = int(os.getenv("LUMINA_PERFIL_MAX", "50"))
+PASTA_PERFIS = Path(os.getenv("LUMINA_PERFIL_PASTA", "") or RAIZ_PROJETO / "data" / "perfis")
+FUNCOES_RELATORIO = 25
+
+_captura_atual = ContextVar("captura_perfil", default=None)
+
+
+def resumo_mensagem(msg):
+    return hashlib.sha1(str(msg).encode("utf-8")).hexdigest()[:16]
+
+
+def versao_catalogo(bd_idioma):
+    from src.cache_respostas import impressao_secao
+
+    derivado = getattr(bd_idioma, "derivado", None)
+    if derivado is not None:
+        return derivado("impressao", impressao_secao)
+    return impressao_secao(bd_idioma)
+
+
+class _CapturaNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULA = _CapturaNula()
+
+
+class _Captura:
+    __slots__ = ("perfilador", "msg", "amostrada", "thread", "simultaneos", "info", "perfil", "inicio", "_token")
+
+    def __init__(self, perfilador, msg, amostrada, thread):
+        self.perfilador = perfilador
+        self.msg = msg
+        self.amostrada = amostrada
+        self.thread = thread
+        self.simultaneos = 0
+        self.info = {}
+
+    def __enter__(self):
+        import cProfile
+
+        self._token = _captura_atual.set(self)
+        self.perfil = cProfile.Profile()
+        self.inicio = time.perf_counter()
+        self.perfil.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.perfil.disable()
+        duracao = time.perf_counter() - self.inicio
+        _captura_atual.reset(self._token)
+        self.perfilador._terminar(self, duracao, exc[0])
+        return False
+
+
+class Perfilador:
+    def __init__(self, ativo=ATIVAR_PERFIL, limiar=LIMIAR_PERFIL, amostra=AMOSTRA_PERFIL, pasta=PASTA_PERFIS,
+                 maximo=MAX_PERFIS):
+        self.ativo = ativo
+        self.limiar = limiar
+        self.amostra = amostra
+        self.pasta = Path(pasta)
+        self.maximo = maximo
+        self.salvos = 0
+        self._turnos = itertools.count(1)
+        self._por_thread = {}
+        self._lock = threading.Lock()
+
+    def ativar(self, ativo=True, limiar=None, amostra=None):
+        if limiar is not None:
+            self.limiar = limiar
+        if amostra is not None:
+            self.amostra = amostra
+        self.ativo = ativo
+
+    def turno(self, msg):
+        if not self.ativo or _captura_atual.get() is not None:
+            return _NULA
+        amostrada = self.amostra > 0 and next(self._turnos) % self.amostra == 0
+        if not amostrada and self.limiar <= 0:
+            return _NULA
+        thread = threading.get_ident()
+        with self._lock:
+            dona = self._por_thread.get(thread)
+            if dona is not None:
+                dona.simultaneos += 1
+                return _NULA
+            captura = self._por_thread[thread] = _Captura(self, msg, amostrada, thread)
+        return captura
+
+    def anotar(self, **info):
+        if not self.ativo:
+            return
+        captura = _captura_atual.get()
+        if captura is not None:
+            captura.info.update(info)
+
+    def _terminar(self, captura, duracao, erro):
+        with self._lock:
+            self._por_thread.pop(captura.thread, None)
+        if captura.amostrada:
+            motivo = "amostra"
+        elif duracao >= self.limiar:
+            motivo = "lento"
+        else:
+            return
+        try:
+            self.salvar(captura, duracao, motivo, erro)
+        except OSError:
+            pass
+
+    def salvar(self, captura, duracao, motivo, erro=None):
+        bd_idioma = captura.info.get("bd_idioma")
+        resumo = resumo_mensagem(captura.msg)
+        nome = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{resumo[:8]}"
+        meta = {
+            "mensagem": resumo,
+            "lang": captura.info.get("lang"),
+            "ramo": captura.info.get("ramo"),
+            "catalogo": versao_catalogo(bd_idioma) if bd_idioma is not None else None,
+            "segundos": round(duracao, 6),
+            "motivo": motivo,
+            "simultaneos": captura.simultaneos,
+            "erro": erro.__name__ if erro is not None else None,
+            "quando": time.time(),
+        }
+        with self._lock:
+            self.pasta.mkdir(parents=True, exist_ok=True)
+            captura.perfil.dump_stats(self.pasta / f"{nome}.prof")
+            (self.pasta / f"{nome}.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+            self.salvos += 1
+            self._podar()
+        return self.pasta / f"{nome}.prof"
+
+    def _podar(self):
+        perfis = sorted(self.pasta.glob("*.prof"))
+        for antigo in perfis[:max(0, len(perfis) - self.maximo)]:
+            antigo.unlink(missing_ok=True)
+            antigo.with_suffix(".json").unlink(missing_ok=True)
+
+
+perfilador = Perfilador()
+
+
+def capturas(pasta=PASTA_PERFIS, ramo=None, lang=None):
+    for arquivo in sorted(Path(pasta).glob("*.prof")):
+        try:
+            meta = json.loads(arquivo.with_suffix(".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = {}
+        if (ramo is None or meta.get("ramo") == ramo) and (lang is None or meta.get("lang") == lang):
+            yield arquivo, meta
+
+
+def relatorio(pasta=PASTA_PERFIS, ordem="cumulative", funcoes=FUNCOES_RELATORIO, ramo=None, lang=None):
+    import pstats
+
+    encontradas = list(capturas(pasta, ramo, lang))
+    if not encontradas:
+        print(f"nenhum perfil em {pasta}")
+        return
+
+    print(f"{len(encontradas)} perfis em {pasta}\n")
+    print(f"{'segundos':>9} {'motivo':<8} {'ramo':<12} {'lang':<5} {'catálogo':<17} arquivo")
+    for arquivo, meta in sorted(encontradas, key=lambda c: c[1].get("segundos", 0), reverse=True)[:10]:
+        print(f"{meta.get('segundos', 0):>9.3f} {str(meta.get('motivo')):<8} {str(meta.get('ramo')):<12} "
+              f"{str(meta.get('lang')):<5} {str(meta.get('catalogo')):<17} {arquivo.name}")
+
+    estatisticas = pstats.Stats(str(encontradas[0][0]))
+    for arquivo, _ in encontradas[1:]:
+        estatisticas.add(str(arquivo))
+    print()
+    estatisticas.strip_dirs().sort_stats(ordem).print_stats(funcoes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrega as funções mais quentes dos perfis de turnos lentos ou amostrados.")
+    parser.add_argument("pasta", nargs="?", default=str(PASTA_PERFIS))
+    parser.add_argument("--ordem", default="cumulative", choices=["cumulative", "tottime", "ncalls"])
+    parser.add_argument("--funcoes", type=int, default=FUNCOES_RELATORIO)
+    parser.add_argument("--ramo", help="só perfis de turnos que terminaram neste ramo")
+    parser.add_argument("--lang")
+    args = parser.parse_args(argv)
+    relatorio(args.pasta, args.ordem, args.funcoes, args.ramo, args.lang)
+
+
+if __name__ == "__main__":
+    main()
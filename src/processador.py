@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+from src.chatbot import RESPOSTAS_TEMPO_ESGOTADO, detectar_idioma, processar_mensagem_stream_async
+
+MAX_TURNOS_SIMULTANEOS = 8
+TIMEOUT_TURNO = 60.0
+
+
+class ProcessadorTurnos:
+    def __init__(self, max_simultaneos=MAX_TURNOS_SIMULTANEOS, timeout=TIMEOUT_TURNO):
+        self.max_simultaneos = max_simultaneos
+        self.timeout = timeout
+        self._loop = None
+        self._thread = None
+        self._semaforo = None
+        self._pendentes = {}
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            pronto = threading.Event()
+
+            def rodar():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._semaforo = asyncio.Semaphore(self.max_simultaneos)
+                pronto.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=rodar, name="processador-turnos", daemon=True)
+            self._thread.start()
+            pronto.wait()
+
+    def enviar(self, msg, api_key, session, ao_receber=None):
+        self.iniciar()
+        return asyncio.run_coroutine_threadsafe(self._agendar(msg, api_key, session, ao_receber), self._loop)
+
+    def cancelar(self, session):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._cancelar_pendente, id(session))
+
+    def encerrar(self):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def _cancelar_pendente(self, chave):
+        tarefa = self._pendentes.get(chave)
+        if tarefa is not None:
+            tarefa.cancel()
+
+    async def _agendar(self, msg, api_key, session, ao_receber):
+        chave = id(session)
+        anterior = self._pendentes.get(chave)
+        tarefa = asyncio.ensure_future(self._executar(anterior, msg, api_key, session, ao_receber))
+        self._pendentes[chave] = tarefa
+        try:
+            return await tarefa
+        finally:
+            if self._pendentes.get(chave) is tarefa:
+                del self._pendentes[chave]
+
+    async def _executar(self, anterior, msg, api_key, session, ao_receber):
+        if anterior is not None:
+            anterior.cancel()
+            await asyncio.wait([anterior])
+
+        async with self._semaforo:
+            try:
+                return await asyncio.wait_for(self._gerar(msg, api_key, session, ao_receber), self.timeout)
+            except asyncio.TimeoutError:
+                lang = detectar_idioma(msg)
+                resposta = RESPOSTAS_TEMPO_ESGOTADO.get(lang, RESPOSTAS_TEMPO_ESGOTADO["pt"])
+                if ao_receber is not None:
+                    ao_receber(resposta)
+                return resposta
+
+    async def _gerar(self, msg, api_key, session, ao_receber):
+        partes = []
+        async for parte in processar_mensagem_stream_async(msg, api_key, session):
+            partes.append(parte)
+            if ao_receber is not None:
+                ao_receber(parte)
+        return "".join(partes)
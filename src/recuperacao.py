@@ -0,0 +1,157 @@
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+
+RECUPERACAO_LOCAL = os.getenv("LUMINA_RECUPERACAO", "1").strip().lower() in {"1", "true", "sim", "yes"}
+LIMIAR_RECUPERACAO = float(os.getenv("LUMINA_LIMIAR_RECUPERACAO", "0.5"))
+MIN_TERMOS_RECUPERACAO = int(os.getenv("LUMINA_RECUPERACAO_MIN_TERMOS", "2"))
+TAMANHO_NGRAMA = 3
+PESO_PALAVRA = 2
+
+PARAFRASES = {
+    "promoções": [
+        "tem alguma promoção hoje", "quais as ofertas da semana", "tem cupom de desconto", "está tendo liquidação",
+        "are there any deals today", "do you have a discount code", "is anything on sale", "current offers",
+    ],
+    "tabela de medidas": [
+        "qual tamanho devo escolher", "como sei meu tamanho", "guia de tamanhos", "quais tamanhos vocês vendem",
+        "which size should I buy", "size guide", "what size am I", "do you have size measurements",
+    ],
+    "pagamento": [
+        "como posso pagar", "quais as formas de pagamento", "aceitam boleto", "dá pra pagar com mercado pago",
+        "how can I pay", "payment options", "do you accept boleto", "which payment methods are available",
+    ],
+    "pix": [
+        "tem desconto pagando no pix", "posso pagar com pix",
+        "is there a discount for pix", "can I pay with pix",
+    ],
+    "cartão": [
+        "aceita cartão de crédito", "posso parcelar no cartão", "aceitam visa ou mastercard",
+        "do you take credit cards", "can I pay by card", "do you accept visa",
+    ],
+    "troca": [
+        "posso devolver o produto", "como faço uma troca", "quero trocar o tamanho", "como peço reembolso",
+        "how do I return an item", "what is your return policy", "can I exchange it for another size", "I want a refund",
+    ],
+    "rastrear": [
+        "onde está meu pedido", "como acompanho a entrega", "código de rastreio", "meu pedido não chegou",
+        "track my order", "where is my package", "tracking number", "my package has not arrived",
+    ],
+    "frete": [
+        "quanto tempo demora a entrega", "quanto custa o envio", "vocês entregam na minha cidade", "prazo de envio",
+        "how long does shipping take", "shipping cost", "do you deliver to my city", "delivery time",
+    ],
+    "suporte": [
+        "quero falar com um atendente", "qual o telefone de vocês", "email de contato", "atendimento humano",
+        "talk to a human", "customer service contact", "what is your phone number", "support email",
+    ],
+    "horário": [
+        "que horas a loja abre", "horário de funcionamento", "vocês abrem no domingo", "até que horas atendem",
+        "opening hours", "when are you open", "what time do you close", "are you open on sunday",
+    ],
+    "menu": [
+        "o que você pode fazer", "quais as opções", "me mostra o menu",
+        "what can you do", "show me the options", "main menu",
+    ],
+}
+
+PALAVRAS_VAZIAS = frozenset({
+    "a", "o", "as", "os", "um", "uma", "de", "do", "da", "dos", "das", "e", "em", "no", "na", "nos", "nas",
+    "para", "pra", "por", "com", "que", "se", "eu", "me", "meu", "minha", "voce", "voces", "vcs", "isso",
+    "esse", "essa", "este", "esta", "ao", "qual", "quais", "como", "quero", "tem", "ter", "ha", "sao", "e",
+    "ser", "posso", "pode", "algum", "alguma", "mais", "muito", "la", "aqui", "the", "an", "of", "to",
+    "in", "on", "for", "with", "and", "or", "is", "are", "am", "be", "do", "does", "did", "can", "could",
+    "i", "you", "your", "my", "me", "we", "it", "this", "that", "what", "whats", "which", "how", "any",
+    "there", "have", "has", "s", "so", "want", "please", "by", "available", "loja", "store", "shop",
+    "should", "would", "will", "now", "or", "get", "buy", "ou", "agora", "ja", "devo", "comprar",
+})
+
+_RE_PALAVRA = re.compile(r"\w+")
+
+
+def normalizar(texto):
+    decomposto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def palavras_conteudo(texto):
+    return [palavra for palavra in _RE_PALAVRA.findall(normalizar(texto)) if palavra not in PALAVRAS_VAZIAS]
+
+
+def caracteristicas(texto):
+    contagem = Counter()
+    for palavra in palavras_conteudo(texto):
+        contagem["p:" + palavra] += PESO_PALAVRA
+        marcada = f"<{palavra}>"
+        for i in range(len(marcada) - TAMANHO_NGRAMA + 1):
+            contagem[marcada[i:i + TAMANHO_NGRAMA]] += 1
+    return contagem
+
+
+class IndiceRecuperacao:
+    def __init__(self, bd_idioma, parafrases=PARAFRASES):
+        import numpy as np
+
+        self.chaves = []
+        documentos = []
+        for chave, valor in bd_idioma.items():
+            if chave == "produtos" or not isinstance(valor, str):
+                continue
+            for texto in [chave, valor, *parafrases.get(chave, ())]:
+                self.chaves.append(chave)
+                documentos.append(caracteristicas(texto))
+
+        frequencia = Counter(termo for documento in documentos for termo in documento)
+        self.colunas = {termo: coluna for coluna, termo in enumerate(sorted(frequencia))}
+        total = len(documentos)
+        self.idf = np.array(
+            [math.log((1 + total) / (1 + frequencia[termo])) + 1 for termo in sorted(frequencia)], dtype=np.float32
+        )
+        self.matriz = np.zeros((total, len(self.colunas)), dtype=np.float32)
+        for linha, documento in enumerate(documentos):
+            for termo, vezes in documento.items():
+                self.matriz[linha, self.colunas[termo]] = 1 + math.log(vezes)
+        self.matriz *= self.idf
+        self.idf_desconhecido = float(self.idf.max()) if len(self.idf) else 1.0
+        normas = np.linalg.norm(self.matriz, axis=1, keepdims=True)
+        self.matriz /= np.where(normas > 0, normas, 1)
+
+    def __len__(self):
+        return len(self.chaves)
+
+    def vetor(self, texto):
+        import numpy as np
+
+        consulta = np.zeros(len(self.colunas), dtype=np.float32)
+        desconhecidos = 0.0
+        for termo, vezes in caracteristicas(texto).items():
+            coluna = self.colunas.get(termo)
+            if coluna is not None:
+                consulta[coluna] = (1 + math.log(vezes)) * self.idf[coluna]
+            else:
+                desconhecidos += ((1 + math.log(vezes)) * self.idf_desconhecido) ** 2
+        norma = math.sqrt(float(consulta @ consulta) + desconhecidos)
+        return consulta / norma if norma else consulta
+
+    def buscar(self, texto):
+        if not self.chaves:
+            return None, 0.0
+        similaridades = self.matriz @ self.vetor(texto)
+        melhor = int(similaridades.argmax())
+        return self.chaves[melhor], float(similaridades[melhor])
+
+    def responder(self, texto, limiar=LIMIAR_RECUPERACAO, min_termos=MIN_TERMOS_RECUPERACAO):
+        palavras = palavras_conteudo(texto)
+        if len(palavras) < min_termos or not any("p:" + palavra in self.colunas for palavra in palavras):
+            return None
+        chave, similaridade = self.buscar(texto)
+        return chave if chave is not None and similaridade >= limiar else None
+
+
+def indice_recuperacao(bd_idioma):
+    derivado = getattr(bd_idioma, "derivado", None)
+    if derivado is not None:
+        return derivado("recuperacao", IndiceRecuperacao)
+    return IndiceRecuperacao(bd_idioma)
@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+RESPOSTA_SIMULADA = "[resposta do LLM não reproduzida]"
+PROCESSOS_PADRAO = os.cpu_count() or 1
+SESSOES_POR_LOTE = 8
+EXEMPLOS_POR_MUDANCA = 3
+
+_trabalhador = {}
+
+
+def ler_jsonl(caminho):
+    arquivo = sys.stdin if caminho == "-" else open(caminho, "r", encoding="utf-8")
+    try:
+        for numero, linha in enumerate(arquivo, 1):
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError as erro:
+                raise ValueError(f"{caminho}:{numero}: JSON inválido ({erro.msg})") from None
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def agrupar_sessoes(registros):
+    sessoes = defaultdict(list)
+    for posicao, registro in enumerate(registros):
+        if "sessao" not in registro or not isinstance(registro.get("texto"), str):
+            raise ValueError(f"registro {posicao + 1} precisa de 'sessao' e 'texto'")
+        sessoes[str(registro["sessao"])].append((registro.get("turno", posicao), registro["texto"]))
+    return {sessao: [texto for _, texto in sorted(turnos, key=lambda t: t[0])] for sessao, turnos in sessoes.items()}
+
+
+def carregar_gravacoes(caminho):
+    return {
+        (str(r["sessao"]), r["turno"]): r["resposta"]
+        for r in ler_jsonl(caminho)
+        if r.get("ramo") == "llm" and isinstance(r.get("resposta"), str)
+    }
+
+
+class ColetorTurno:
+    def __init__(self):
+        self.limpar()
+
+    def limpar(self):
+        self.ramo = None
+        self.etapas = {}
+        self.chamadas = Counter()
+
+    def observar(self, nome, valor, rotulos):
+        from src.metricas import ETAPA
+
+        if nome == ETAPA:
+            etapa = dict(rotulos).get("etapa")
+            self.etapas[etapa] = self.etapas.get(etapa, 0.0) + valor
+
+    def contar(self, nome, rotulos, valor):
+        from src.metricas import CHAMADA_EXTERNA, RAMO
+
+        rotulos = dict(rotulos)
+        if nome == RAMO:
+            self.ramo = rotulos.get("ramo")
+        elif nome == CHAMADA_EXTERNA:
+            self.chamadas[f"{rotulos.get('servico')}:{rotulos.get('resultado')}"] += valor
+
+
+def _resposta_gravada(msg, lang, bd_idioma, api_key_usuario, session):
+    return _trabalhador["gravacoes"].get(_trabalhador["turno"], RESPOSTA_SIMULADA)
+
+
+async def _resposta_gravada_async(msg, lang, bd_idioma, api_key_usuario, session):
+    return _resposta_gravada(msg, lang, bd_idioma, api_key_usuario, session)
+
+
+def iniciar_trabalhador(gravacoes, api_key):
+    from src import chatbot
+    from src.catalogo import catalogo_padrao
+    from src.catalogo_compilado import indexar_secao
+    from src.metricas import metricas
+
+    coletor = ColetorTurno()
+    metricas.ativar()
+    metricas.adicionar_destino(coletor)
+    if not api_key:
+        chatbot.resposta_groq = _resposta_gravada
+        chatbot.resposta_groq_async = _resposta_gravada_async
+    for lang in ("pt", "en"):
+        indexar_secao(catalogo_padrao.obter(lang))
+    _trabalhador.update(coletor=coletor, gravacoes=gravacoes or {}, api_key=api_key or "", turno=None)
+
+
+def reprocessar_sessao(item):
+    from src.chatbot import ChatSession, processar_mensagem_total
+
+    sessao, textos = item
+    coletor = _trabalhador["coletor"]
+    session = ChatSession()
+    resultados = []
+    for turno, texto in enumerate(textos):
+        coletor.limpar()
+        _trabalhador["turno"] = (sessao, turno)
+        inicio = time.perf_counter()
+        try:
+            resposta, erro = processar_mensagem_total(texto, _trabalhador["api_key"], session), None
+        except Exception as excecao:
+            resposta, erro = None, f"{type(excecao).__name__}: {excecao}"
+        duracao = time.perf_counter() - inicio
+        resultados.append({
+            "sessao": sessao,
+            "turno": turno,
+            "texto": texto,
+            "ramo": coletor.ramo if erro is None else "erro",
+            "resposta": resposta,
+            "erro": erro,
+            "ms": round(duracao * 1000, 3),
+            "etapas": {etapa: round(segundos * 1000, 3) for etapa, segundos in coletor.etapas.items()},
+            "chamadas": dict(coletor.chamadas),
+        })
+    return resultados
+
+
+def reprocessar(sessoes, processos=PROCESSOS_PADRAO, gravacoes=None, api_key="", lote=SESSOES_POR_LOTE):
+    itens = list(sessoes.items())
+    if processos <= 1 or len(itens) <= 1:
+        iniciar_trabalhador(gravacoes, api_key)
+        for item in itens:
+            yield reprocessar_sessao(item)
+        return
+
+    import multiprocessing
+
+    with multiprocessing.Pool(min(processos, len(itens)), iniciar_trabalhador, (gravacoes, api_key)) as pool:
+        yield from pool.imap_unordered(reprocessar_sessao, itens, chunksize=lote)
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))] if ordenados else 0.0
+
+
+def comparar(antes, depois, exemplos=EXEMPLOS_POR_MUDANCA):
+    turnos_antes = {(r["sessao"], r["turno"]): r for r in antes}
+    turnos_depois = {(r["sessao"], r["turno"]): r for r in depois}
+    comuns = [chave for chave in turnos_antes if chave in turnos_depois]
+
+    ramos_antes = Counter(r["ramo"] for r in antes)
+    ramos_depois = Counter(r["ramo"] for r in depois)
+    mudancas = Counter()
+    amostras = defaultdict(list)
+    respostas_mudadas = 0
+    for chave in comuns:
+        a, b = turnos_antes[chave], turnos_depois[chave]
+        if a["ramo"] != b["ramo"]:
+            mudancas[(a["ramo"], b["ramo"])] += 1
+            vistos = amostras[(a["ramo"], b["ramo"])]
+            if len(vistos) < exemplos and b["texto"] not in vistos:
+                vistos.append(b["texto"])
+        elif a["resposta"] != b["resposta"]:
+            respostas_mudadas += 1
+
+    return {
+        "turnos": [len(turnos_antes), len(turnos_depois), len(comuns)],
+        "ramos": {ramo: [ramos_antes[ramo], ramos_depois[ramo]] for ramo in sorted(ramos_antes | ramos_depois, key=str)},
+        "mudancas": [
+            {"de": de, "para": para, "turnos": total, "exemplos": amostras[(de, para)]}
+            for (de, para), total in mudancas.most_common()
+        ],
+        "respostas_mudadas": respostas_mudadas,
+        "ms": [
+            [percentil(sorted(r["ms"] for r in execucao), p) for p in (50, 99)]
+            for execucao in (antes, depois)
+        ],
+    }
+
+
+def imprimir_comparacao(resumo):
+    total_antes, total_depois, comuns = resumo["turnos"]
+    print(f"turnos: {total_antes} antes, {total_depois} depois, {comuns} em comum")
+    print(f"\n{'ramo':<14} {'antes':>7} {'depois':>7} {'dif':>6}")
+    for ramo, (antes, depois) in resumo["ramos"].items():
+        print(f"{str(ramo):<14} {antes:>7} {depois:>7} {depois - antes:>+6}")
+    print(f"\nturnos que mudaram de ramo: {sum(m['turnos'] for m in resumo['mudancas'])}")
+    for mudanca in resumo["mudancas"]:
+        print(f"  {mudanca['de']} -> {mudanca['para']}: {mudanca['turnos']}")
+        for texto in mudanca["exemplos"]:
+            print(f"      {texto!r}")
+    print(f"mesmo ramo com resposta diferente: {resumo['respostas_mudadas']}")
+    (p50_antes, p99_antes), (p50_depois, p99_depois) = resumo["ms"]
+    print(f"ms por turno: p50 {p50_antes:.2f} -> {p50_depois:.2f}, p99 {p99_antes:.2f} -> {p99_depois:.2f}")
+
+
+def rodar(args):
+    if args.catalogo:
+        os.environ["LUMINA_CATALOGO"] = args.catalogo
+    if not args.com_viacep:
+        os.environ["LUMINA_VIACEP_ENRIQUECER"] = "0"
+
+    sessoes = agrupar_sessoes(ler_jsonl(args.entrada))
+    gravacoes = carregar_gravacoes(args.gravacoes) if args.gravacoes else None
+    ramos = Counter()
+    inicio = time.perf_counter()
+    saida = sys.stdout if args.saida == "-" else open(args.saida, "w", encoding="utf-8")
+    try:
+        for resultados in reprocessar(sessoes, args.processos, gravacoes, args.api_key):
+            for resultado in resultados:
+                ramos[resultado["ramo"]] += 1
+                saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    duracao = time.perf_counter() - inicio
+    total = sum(ramos.values())
+    ramos_texto = ", ".join(f"{ramo} {contagem}" for ramo, contagem in ramos.most_common())
+    print(f"{total} turnos de {len(sessoes)} sessões em {duracao:.1f} s ({total / duracao:.0f} turnos/s): {ramos_texto}",
+          file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprocessa conversas gravadas pelo roteador e compara execuções.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    rodar_parser = comandos.add_parser("rodar", help="reprocessa um JSONL com {sessao, texto[, turno]} por linha")
+    rodar_parser.add_argument("entrada", help="JSONL de entrada ('-' lê da entrada padrão)")
+    rodar_parser.add_argument("saida", help="JSONL de saída ('-' escreve na saída padrão)")
+    rodar_parser.add_argument("--processos", type=int, default=PROCESSOS_PADRAO)
+    rodar_parser.add_argument("--catalogo", help="bd.json, snapshot ou pasta particionada a usar (LUMINA_CATALOGO)")
+    llm = rodar_parser.add_mutually_exclusive_group()
+    llm.add_argument("--gravacoes", help="saída de uma execução anterior cujas respostas do LLM são repetidas")
+    llm.add_argument("--api-key", default="", help="chama o Groq de verdade em vez de simular o LLM")
+    rodar_parser.add_argument("--com-viacep", action="store_true", help="consulta a cidade no ViaCEP nos turnos de frete")
+
+    comparar_parser = comandos.add_parser("comparar", help="mostra como o roteamento mudou entre duas saídas")
+    comparar_parser.add_argument("antes")
+    comparar_parser.add_argument("depois")
+    comparar_parser.add_argument("--exemplos", type=int, default=EXEMPLOS_POR_MUDANCA)
+    comparar_parser.add_argument("--json", action="store_true", help="imprime o resumo em JSON")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.comando == "rodar":
+            rodar(args)
+        else:
+            resumo = comparar(list(ler_jsonl(args.antes)), list(ler_jsonl(args.depois)), args.exemplos)
+            if args.json:
+                print(json.dumps(resumo, ensure_ascii=False, indent=2))
+            else:
+                imprimir_comparacao(resumo)
+    except (OSError, ValueError, KeyError) as erro:
+        raise SystemExit(str(erro))
+
+
+if __name__ == "__main__":
+    main()
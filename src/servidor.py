@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import traceback
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.chatbot import processar_mensagem_stream, processar_mensagem_total
+from src.metricas import metricas
+from src.sessoes import GerenciadorSessoes
+
+HOST_PADRAO = os.getenv("LUMINA_HOST", "127.0.0.1")
+PORTA_PADRAO = int(os.getenv("LUMINA_PORTA", "8000"))
+TAMANHO_MAXIMO_CORPO = 16 * 1024
+ERRO_INTERNO = "Erro interno ao processar a mensagem."
+ERROS_CONEXAO = (BrokenPipeError, ConnectionResetError)
+
+
+class RequisicaoInvalida(Exception):
+    pass
+
+
+class ServidorChat(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, endereco, api_key=None, sessoes=None):
+        super().__init__(endereco, ManipuladorChat)
+        self.api_key = api_key if api_key is not None else os.getenv("GROQ_API_KEY", "")
+        self.sessoes = sessoes if sessoes is not None else GerenciadorSessoes()
+
+
+class ManipuladorChat(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "LuminaStyleBot"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _enviar_json(self, status, dados):
+        self._enviar_texto(status, json.dumps(dados, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _enviar_texto(self, status, texto, tipo):
+        corpo = texto.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _ler_pedido(self):
+        try:
+            tamanho = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            self.close_connection = True
+            raise RequisicaoInvalida("Content-Length inválido.")
+        if tamanho <= 0 or tamanho > TAMANHO_MAXIMO_CORPO:
+            self.close_connection = True
+            raise RequisicaoInvalida("Corpo da requisição ausente ou grande demais.")
+
+        try:
+            dados = json.loads(self.rfile.read(tamanho))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise RequisicaoInvalida("JSON inválido.")
+
+        mensagem = dados.get("mensagem") if isinstance(dados, dict) else None
+        if not isinstance(mensagem, str) or not mensagem.strip():
+            raise RequisicaoInvalida("Campo 'mensagem' obrigatório.")
+
+        api_key = dados.get("api_key")
+        if api_key is not None and not isinstance(api_key, str):
+            raise RequisicaoInvalida("Campo 'api_key' precisa ser texto.")
+
+        sessao_id = str(dados.get("sessao") or uuid.uuid4().hex)
+        return mensagem.strip(), sessao_id, api_key or self.server.api_key
+
+    def do_GET(self):
+        if self.path == "/saude":
+            self._enviar_json(200, {"status": "ok", "sessoes": self.server.sessoes.estatisticas()})
+        elif self.path == "/metrics":
+            self._enviar_texto(200, metricas.registro.prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        elif self.path == "/metrics.json":
+            self._enviar_texto(200, metricas.registro.json(), "application/json; charset=utf-8")
+        else:
+            self._enviar_json(404, {"erro": "Rota não encontrada."})
+
+    def do_POST(self):
+        if self.path not in ("/chat", "/chat/stream"):
+            self.close_connection = True
+            self._enviar_json(404, {"erro": "Rota não encontrada."})
+            return
+
+        try:
+            mensagem, sessao_id, api_key = self._ler_pedido()
+        except RequisicaoInvalida as erro:
+            self._enviar_json(400, {"erro": str(erro)})
+            return
+
+        entrada = self.server.sessoes.obter(sessao_id)
+        with entrada.lock:
+            session = entrada.session
+            if self.path == "/chat":
+                try:
+                    resposta = processar_mensagem_total(mensagem, api_key, session)
+                except Exception:
+                    traceback.print_exc()
+                    self._enviar_json(500, {"erro": ERRO_INTERNO, "sessao": sessao_id})
+                    return
+                self._enviar_json(200, {"sessao": sessao_id, "resposta": resposta})
+            else:
+                self._transmitir(processar_mensagem_stream(mensagem, api_key, session), sessao_id)
+
+    def _transmitir(self, partes, sessao_id):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def escrever(dados):
+            linha = (json.dumps(dados, ensure_ascii=False) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(linha):x}\r\n".encode("ascii") + linha + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            for parte in partes:
+                escrever({"parte": parte})
+        except ERROS_CONEXAO:
+            raise
+        except Exception:
+            traceback.print_exc()
+            escrever({"erro": ERRO_INTERNO, "sessao": sessao_id})
+        else:
+            escrever({"fim": True, "sessao": sessao_id})
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def criar_servidor(host=HOST_PADRAO, porta=PORTA_PADRAO, api_key=None):
+    return ServidorChat((host, porta), api_key=api_key)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON da Lumina Style Bot (sem Flet).")
+    parser.add_argument("--host", default=HOST_PADRAO)
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--sem-metricas", action="store_true", help="desliga a coleta exposta em /metrics")
+    args = parser.parse_args(argv)
+
+    metricas.ativar(not args.sem_metricas)
+
+    servidor = criar_servidor(args.host, args.porta)
+    print(f"Lumina Style Bot ouvindo em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from src.chatbot import ChatSession
+
+MAX_SESSOES = int(os.getenv("LUMINA_MAX_SESSOES", "100000"))
+TTL_OCIOSO = float(os.getenv("LUMINA_TTL_SESSAO", "1800"))
+
+
+@dataclass(slots=True)
+class EntradaSessao:
+    session: ChatSession
+    ultimo_uso: float
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    bytes: int = 0
+
+
+class GerenciadorSessoes:
+    def __init__(self, max_sessoes=MAX_SESSOES, ttl_ocioso=TTL_OCIOSO, fabrica=ChatSession, relogio=time.monotonic):
+        self.max_sessoes = max_sessoes
+        self.ttl_ocioso = ttl_ocioso
+        self.despejos_lru = 0
+        self.despejos_ttl = 0
+        self._fabrica = fabrica
+        self._relogio = relogio
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, sessao_id):
+        return sessao_id in self._entradas
+
+    def _despejar_ociosas(self, agora):
+        limite = agora - self.ttl_ocioso
+        while self._entradas:
+            entrada = next(iter(self._entradas.values()))
+            if entrada.ultimo_uso > limite:
+                break
+            self._descartar_mais_antiga()
+            self.despejos_ttl += 1
+
+    def _descartar_mais_antiga(self):
+        _, entrada = self._entradas.popitem(last=False)
+        self._bytes -= entrada.bytes
+
+    def _medir(self, sessao_id, entrada):
+        novo = sys.getsizeof(sessao_id) + sys.getsizeof(entrada) + sys.getsizeof(entrada.lock)
+        novo += sys.getsizeof(entrada.session)
+        cache = entrada.session._cache_idioma
+        if cache is not None:
+            novo += sys.getsizeof(cache) + sys.getsizeof(cache._itens) + cache.bytes_textos
+        self._bytes += novo - entrada.bytes
+        entrada.bytes = novo
+
+    def obter(self, sessao_id):
+        agora = self._relogio()
+        with self._lock:
+            self._despejar_ociosas(agora)
+            entrada = self._entradas.get(sessao_id)
+            if entrada is None:
+                entrada = self._entradas[sessao_id] = EntradaSessao(self._fabrica(), agora)
+                while len(self._entradas) > self.max_sessoes:
+                    self._descartar_mais_antiga()
+                    self.despejos_lru += 1
+            else:
+                entrada.ultimo_uso = agora
+                self._entradas.move_to_end(sessao_id)
+            self._medir(sessao_id, entrada)
+            return entrada
+
+    def remover(self, sessao_id):
+        with self._lock:
+            entrada = self._entradas.pop(sessao_id, None)
+            if entrada is None:
+                return False
+            self._bytes -= entrada.bytes
+            return True
+
+    def limpar_ociosas(self):
+        with self._lock:
+            self._despejar_ociosas(self._relogio())
+
+    def bytes_estimados(self):
+        return sys.getsizeof(self._entradas) + self._bytes
+
+    def estatisticas(self):
+        return {
+            "ativas": len(self._entradas),
+            "despejos_lru": self.despejos_lru,
+            "despejos_ttl": self.despejos_ttl,
+            "bytes_estimados": self.bytes_estimados(),
+        }
@@ -0,0 +1,49 @@
+import re
+
+_PALAVRA = re.compile(r"\w+")
+_DELIMITADO = re.compile(r"\w(?:.*\w)?", re.S)
+
+
+class IndiceTermos:
+    def __init__(self, base=None):
+        self._termos = {}
+        self._avulsos = []
+        self._max_palavras = 1
+        if base is not None:
+            self._termos = {termo: dict(tipos) for termo, tipos in base._termos.items()}
+            self._avulsos = list(base._avulsos)
+            self._max_palavras = base._max_palavras
+
+    def __len__(self):
+        return len(self._termos) + len(self._avulsos)
+
+    def adicionar(self, termo, tipo, valor=0):
+        termo = termo.lower()
+        if not _DELIMITADO.fullmatch(termo):
+            padrao = re.compile(rf"(?<!\w){re.escape(termo)}(?!\w)")
+            self._avulsos.append((padrao, tipo, valor))
+            return
+
+        tipos = self._termos.setdefault(termo, {})
+        if tipo not in tipos or valor < tipos[tipo]:
+            tipos[tipo] = valor
+        self._max_palavras = max(self._max_palavras, len(_PALAVRA.findall(termo)))
+
+    def buscar(self, texto_l):
+        encontrados = {}
+        termos = self._termos
+        tokens = [(m.start(), m.end()) for m in _PALAVRA.finditer(texto_l)]
+
+        for i, (inicio, _) in enumerate(tokens):
+            for _, fim in tokens[i:i + self._max_palavras]:
+                tipos = termos.get(texto_l[inicio:fim])
+                if tipos:
+                    for tipo, valor in tipos.items():
+                        if tipo not in encontrados or valor < encontrados[tipo]:
+                            encontrados[tipo] = valor
+
+        for padrao, tipo, valor in self._avulsos:
+            if (tipo not in encontrados or valor < encontrados[tipo]) and padrao.search(texto_l):
+                encontrados[tipo] = valor
+
+        return encontrados
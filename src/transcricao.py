@@ -0,0 +1,38 @@
+MAX_BOLHAS_VIVAS = 120
+PAGINA_HISTORICO = 40
+
+
+class Transcricao:
+    def __init__(self, max_vivas=MAX_BOLHAS_VIVAS, pagina=PAGINA_HISTORICO):
+        self.max_vivas = max_vivas
+        self.pagina = pagina
+        self.mensagens = []
+        self.inicio_vivo = 0
+
+    def __len__(self):
+        return len(self.mensagens)
+
+    @property
+    def vivas(self):
+        return len(self.mensagens) - self.inicio_vivo
+
+    @property
+    def ocultas(self):
+        return self.inicio_vivo
+
+    def adicionar(self, autor, texto):
+        self.mensagens.append((autor, texto))
+        return len(self.mensagens) - 1
+
+    def atualizar(self, indice, texto):
+        self.mensagens[indice] = (self.mensagens[indice][0], texto)
+
+    def aparar(self):
+        excedentes = max(0, self.vivas - self.max_vivas)
+        self.inicio_vivo += excedentes
+        return excedentes
+
+    def pagina_anterior(self):
+        fim = self.inicio_vivo
+        self.inicio_vivo = max(0, fim - self.pagina)
+        return self.mensagens[self.inicio_vivo:fim]
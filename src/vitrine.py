@@ -0,0 +1,158 @@
+import os
+from dataclasses import dataclass
+
+from src.catalogo import resumo_produtos
+
+TAMANHO_PAGINA = int(os.getenv("LUMINA_PAGINA_PRODUTOS", "20"))
+
+TEXTOS = {
+    "pt": {
+        "titulo": "### Produtos disponíveis",
+        "preco": "Preço",
+        "total": "Total para",
+        "unidades": "unidades",
+        "descricao": "Descrição",
+        "vazio": "Nenhum produto cadastrado.",
+        "fim": "Não há mais produtos nesta lista.",
+        "pagina": "Página {pagina} de {total}.",
+        "proxima": ' Diga "próxima página" para ver mais.',
+    },
+    "en": {
+        "titulo": "### Available products",
+        "preco": "Preço",
+        "total": "Total for",
+        "unidades": "units",
+        "descricao": "Description",
+        "vazio": "No products registered.",
+        "fim": "There are no more products in this list.",
+        "pagina": "Page {pagina} of {total}.",
+        "proxima": ' Say "next page" to see more.',
+    },
+}
+
+
+def textos_idioma(lang):
+    return TEXTOS["pt"] if lang == "pt" else TEXTOS["en"]
+
+
+def formatar_preco(valor, lang="pt"):
+    if lang == "pt":
+        return f"R$ {valor:.2f}".replace(".", ",")
+    return f"${valor:.2f}"
+
+
+@dataclass(frozen=True)
+class Categorias:
+    nomes: tuple
+    produtos: tuple
+    ids: dict
+
+    def indices(self, categoria):
+        id_categoria = self.ids.get(categoria.lower())
+        return None if id_categoria is None else self.produtos[id_categoria]
+
+
+def construir_categorias(bd_idioma):
+    ids = {}
+    nomes = []
+    produtos = []
+    for posicao, (_, categorias) in enumerate(resumo_produtos(bd_idioma.get("produtos", []))):
+        for categoria in categorias:
+            chave = categoria.lower()
+            id_categoria = ids.get(chave)
+            if id_categoria is None:
+                id_categoria = ids[chave] = len(nomes)
+                nomes.append(categoria)
+                produtos.append([])
+            if not produtos[id_categoria] or produtos[id_categoria][-1] != posicao:
+                produtos[id_categoria].append(posicao)
+    return Categorias(nomes=tuple(nomes), produtos=tuple(map(tuple, produtos)), ids=ids)
+
+
+def categorias_catalogo(bd_idioma):
+    derivado = getattr(bd_idioma, "derivado", None)
+    if derivado is not None:
+        return derivado("categorias", construir_categorias)
+    return construir_categorias(bd_idioma)
+
+
+class Vitrine:
+    def __init__(self, bd_idioma, lang="pt", tamanho_pagina=TAMANHO_PAGINA):
+        self.lang = lang
+        self.textos = textos_idioma(lang)
+        self.tamanho_pagina = max(1, tamanho_pagina)
+        self.produtos = bd_idioma.get("produtos", [])
+        self.categorias = categorias_catalogo(bd_idioma)
+        self._cartoes = {}
+        self._linhas = {}
+        self._paginas = {}
+
+    def _partes_cartao(self, indice):
+        partes = self._cartoes.get(indice)
+        if partes is None:
+            produto = self.produtos[indice]
+            t = self.textos
+            preco = formatar_preco(produto["preco"], self.lang)
+            partes = self._cartoes[indice] = (
+                f"### {produto['emoji']} {produto['nome']}\n\n- {t['preco']}: {preco}",
+                f"\n- {t['descricao']}: {produto['descricao']}",
+            )
+        return partes
+
+    def cartao(self, indice, quantidade=1):
+        cabecalho, rodape = self._partes_cartao(indice)
+        if quantidade <= 1:
+            return cabecalho + rodape
+        t = self.textos
+        total = formatar_preco(self.produtos[indice]["preco"] * quantidade, self.lang)
+        return f"{cabecalho}\n- {t['total']} {quantidade} {t['unidades']}: {total}{rodape}"
+
+    def _linha(self, indice):
+        linha = self._linhas.get(indice)
+        if linha is None:
+            produto = self.produtos[indice]
+            linha = self._linhas[indice] = f"- {produto['emoji']} {produto['nome']} - {formatar_preco(produto['preco'], self.lang)}"
+        return linha
+
+    def _indices(self, categoria):
+        if categoria is None:
+            return range(len(self.produtos))
+        indices = self.categorias.indices(categoria)
+        return () if indices is None else indices
+
+    def total_paginas(self, categoria=None):
+        return -(-len(self._indices(categoria)) // self.tamanho_pagina)
+
+    def pagina(self, numero=1, categoria=None):
+        total = self.total_paginas(categoria)
+        if total == 0:
+            return self.textos["vazio"], 1
+        if numero > total:
+            return self.textos["fim"], total
+        numero = max(1, numero)
+
+        chave = (categoria.lower() if categoria else None, numero)
+        texto = self._paginas.get(chave)
+        if texto is None:
+            texto = self._paginas[chave] = self._montar_pagina(numero, total, categoria)
+        return texto, numero
+
+    def _montar_pagina(self, numero, total, categoria):
+        t = self.textos
+        inicio = (numero - 1) * self.tamanho_pagina
+        indices = self._indices(categoria)[inicio:inicio + self.tamanho_pagina]
+        titulo = t["titulo"] if categoria is None else f"{t['titulo']}: {categoria}"
+        linhas = [titulo, *(self._linha(i) for i in indices)]
+        if total > 1:
+            rodape = t["pagina"].format(pagina=numero, total=total)
+            if numero < total:
+                rodape += t["proxima"]
+            linhas.append(f"\n{rodape}")
+        return "\n".join(linhas)
+
+
+def vitrine_catalogo(bd_idioma, lang="pt"):
+    derivado = getattr(bd_idioma, "derivado", None)
+    if derivado is not None:
+        return derivado(("vitrine", lang), lambda secao: Vitrine(secao, lang))
+    return Vitrine(bd_idioma, lang)
@@ -0,0 +1,30 @@
+import pytest
+
+from benchmarks.fakes import groq_falso, viacep_falso
+from src import chatbot
+from src.agendador import AgendadorGroq
+from src.cache_respostas import CacheRespostas
+from src.clientes import RegistroClientesGroq, RegistroClientesGroqAsync
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    with groq_falso() as servidor:
+        monkeypatch.setenv("GROQ_BASE_URL", servidor.url)
+        yield servidor
+
+
+@pytest.fixture
+def viacep():
+    with viacep_falso() as servidor:
+        yield servidor
+
+
+@pytest.fixture
+def bot(monkeypatch, groq):
+    monkeypatch.setattr(chatbot, "clientes_groq", RegistroClientesGroq())
+    monkeypatch.setattr(chatbot, "clientes_groq_async", RegistroClientesGroqAsync())
+    monkeypatch.setattr(chatbot, "agendador_groq", AgendadorGroq())
+    monkeypatch.setattr(chatbot, "cache_respostas", CacheRespostas(caminho="", max_memoria=0))
+    yield chatbot
+    chatbot.clientes_groq.fechar()
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fakes import RESPOSTA_LLM, LimiteFalso
+from src import agendador
+from src.agendador import AgendadorGroq, BaldeTokens, duracao_segundos
+from src.catalogo import catalogo_padrao
+
+CHAVE = "gsk_teste"
+
+
+@pytest.fixture
+def espera_curta(monkeypatch):
+    monkeypatch.setattr(agendador, "ESPERA_BASE", 0.005)
+    monkeypatch.setattr(agendador, "ESPERA_MAXIMA", 0.02)
+
+
+def usar_agendador(bot, monkeypatch, **opcoes):
+    novo = AgendadorGroq(**opcoes)
+    monkeypatch.setattr(bot, "agendador_groq", novo)
+    return novo
+
+
+def perguntar(bot, texto="a loja tem provador?"):
+    return bot.resposta_groq(texto, "pt", catalogo_padrao.obter("pt"), CHAVE, bot.ChatSession())
+
+
+def test_429_e_retentado_ate_o_limite_de_tentativas(bot, groq, monkeypatch, espera_curta):
+    atual = usar_agendador(bot, monkeypatch, max_tentativas=3)
+    groq.status_erro = 429
+
+    assert perguntar(bot) == bot.texto_erro_ia("limite", "pt")
+    assert groq.pedidos == 3
+    assert atual.retentativas == 2
+
+
+def test_erro_nao_retentavel_nao_repete(bot, groq, monkeypatch, espera_curta):
+    atual = usar_agendador(bot, monkeypatch, max_tentativas=3)
+    groq.status_erro = 401
+
+    assert perguntar(bot) == bot.texto_erro_ia("chave", "pt")
+    assert groq.pedidos == 1
+    assert atual.retentativas == 0
+
+
+def test_retry_after_e_respeitado(bot, groq, monkeypatch):
+    usar_agendador(bot, monkeypatch)
+    groq.limite = LimiteFalso(320, janela=0.3)
+    groq.limite.consumir(f"Bearer {CHAVE}", 320)
+
+    inicio = time.monotonic()
+    assert perguntar(bot) == RESPOSTA_LLM
+    assert time.monotonic() - inicio >= 0.2
+    assert groq.rejeitados == 1
+    assert groq.pedidos == 2
+
+
+def test_cabecalhos_de_limite_evitam_o_429(bot, groq, monkeypatch):
+    usar_agendador(bot, monkeypatch)
+    groq.limite = LimiteFalso(320, janela=0.3)
+
+    assert perguntar(bot) == RESPOSTA_LLM
+    inicio = time.monotonic()
+    assert perguntar(bot, "vocês têm provador?") == RESPOSTA_LLM
+    assert time.monotonic() - inicio >= 0.2
+    assert groq.rejeitados == 0
+
+
+def test_orcamento_limita_as_retentativas(bot, groq, monkeypatch, espera_curta):
+    atual = usar_agendador(bot, monkeypatch, max_tentativas=100)
+    groq.status_erro = 429
+    for _ in range(20):
+        perguntar(bot)
+
+    teto = agendador.ORCAMENTO_RETENTATIVAS + 20 * agendador.FRACAO_RETENTATIVAS + 2
+    assert 0 < atual.retentativas <= teto
+    assert groq.pedidos == 20 + atual.retentativas
+
+
+def test_fila_que_excederia_o_prazo_e_descartada(bot, groq, monkeypatch):
+    atual = usar_agendador(bot, monkeypatch, prazo=0.1, tpm=100)
+
+    assert perguntar(bot) == bot.texto_erro_ia("limite", "pt")
+    assert atual.descartados == 1
+    assert groq.pedidos == 0
+
+
+def test_sessao_com_fila_longa_nao_atrasa_as_outras():
+    atual = AgendadorGroq()
+    atual._estado(CHAVE, time.monotonic()).requisicoes = BaldeTokens(1, 50)
+    ordem = []
+
+    async def pedir(sessao):
+        async def chamar():
+            ordem.append(sessao)
+
+        await atual.executar_async(CHAVE, sessao, 1, chamar)
+
+    async def conversar():
+        pesadas = [asyncio.create_task(pedir("pesada")) for _ in range(10)]
+        await asyncio.sleep(0)
+        await asyncio.gather(pedir("leve"), *pesadas)
+
+    inicio = time.monotonic()
+    asyncio.run(conversar())
+    assert ordem.index("leve") <= 2
+    assert time.monotonic() - inicio < 1
+
+
+def test_vazao_com_429_segue_o_limite_do_servidor(bot, groq, monkeypatch):
+    atual = usar_agendador(bot, monkeypatch)
+    groq.limite = LimiteFalso(320 * 4, janela=0.5)
+
+    async def conversar():
+        return await asyncio.gather(
+            *(bot.processar_mensagem_async("a loja tem provador?", CHAVE, bot.ChatSession()) for _ in range(8))
+        )
+
+    inicio = time.monotonic()
+    respostas = asyncio.run(conversar()) + asyncio.run(conversar())
+    assert respostas == [RESPOSTA_LLM] * 16
+    assert time.monotonic() - inicio < 6
+    assert groq.rejeitados <= 4
+    assert groq.pedidos == 16 + atual.retentativas
+
+
+def test_duracao_segundos():
+    assert duracao_segundos("1m30.5s") == 90.5
+    assert duracao_segundos("250ms") == 0.25
+    assert duracao_segundos("2") == 2.0
+    assert duracao_segundos(None) is None
@@ -0,0 +1,96 @@
+import pytest
+
+from benchmarks.fakes import RESPOSTA_LLM
+from src.cache_respostas import CacheRespostas
+from src.catalogo import SecaoCatalogo, catalogo_padrao
+
+CHAVE = "gsk_teste"
+
+
+@pytest.fixture
+def cache(bot, monkeypatch):
+    cache = CacheRespostas(caminho="", max_memoria=64)
+    monkeypatch.setattr(bot, "cache_respostas", cache)
+    return cache
+
+
+def perguntar(bot, texto, lang="pt", bd_idioma=None, session=None):
+    bd_idioma = bd_idioma or catalogo_padrao.obter(lang)
+    return bot.resposta_groq(texto, lang, bd_idioma, CHAVE, session or bot.ChatSession())
+
+
+def test_pergunta_repetida_vem_do_cache(bot, groq, cache):
+    for texto in ("vocês têm provador na loja?", "Vocês têm provador na loja", "VOCÊS TÊM PROVADOR NA LOJA?!"):
+        assert perguntar(bot, texto) == RESPOSTA_LLM
+
+    assert groq.pedidos == 1
+    assert cache.acertos == 2
+    assert cache.falhas == 1
+
+
+def test_idioma_e_produto_fazem_parte_da_chave(bot, groq, cache):
+    perguntar(bot, "do you have a fitting room?", "pt")
+    perguntar(bot, "do you have a fitting room?", "en")
+    session = bot.ChatSession()
+    session.lembrar_produto(catalogo_padrao.obter("pt"), 0, "pt")
+    perguntar(bot, "do you have a fitting room?", "pt", session=session)
+
+    assert groq.pedidos == 3
+    assert len(cache) == 3
+
+
+def test_catalogo_alterado_invalida_o_cache(bot, groq, cache):
+    bd_pt = catalogo_padrao.obter("pt")
+    perguntar(bot, "a loja tem provador?", bd_idioma=bd_pt)
+    alterado = SecaoCatalogo(bd_pt, pagamento=bd_pt.get("pagamento", "") + " ")
+    perguntar(bot, "a loja tem provador?", bd_idioma=alterado)
+    perguntar(bot, "a loja tem provador?", bd_idioma=alterado)
+
+    assert groq.pedidos == 2
+    assert cache.invalidacoes == 1
+    assert len(cache) == 1
+
+
+def test_catalogo_em_dict_simples_tambem_gera_chave(bot, groq, cache):
+    bd_pt = dict(catalogo_padrao.obter("pt"))
+    perguntar(bot, "a loja tem provador?", bd_idioma=bd_pt)
+    perguntar(bot, "a loja tem provador?", bd_idioma=bd_pt)
+
+    assert groq.pedidos == 1
+
+
+def test_erro_da_api_nao_e_guardado(bot, groq, cache):
+    groq.status_erro = 401
+    erro = perguntar(bot, "can I return a gift?", "en")
+    groq.status_erro = None
+    resposta = perguntar(bot, "can I return a gift?", "en")
+
+    assert erro != RESPOSTA_LLM
+    assert resposta == RESPOSTA_LLM
+    assert groq.pedidos == 2
+    assert len(cache) == 1
+
+
+def test_resposta_em_stream_e_guardada_inteira(bot, groq, cache):
+    bd_pt = catalogo_padrao.obter("pt")
+    partes = list(bot.resposta_groq_stream("a loja tem provador?", "pt", bd_pt, CHAVE, bot.ChatSession()))
+
+    assert "".join(partes) == RESPOSTA_LLM
+    assert perguntar(bot, "a loja tem provador?") == RESPOSTA_LLM
+    assert groq.pedidos == 1
+
+
+def test_cache_em_disco_sobrevive_a_reinicio(tmp_path):
+    caminho = str(tmp_path / "respostas.sqlite3")
+    bd_pt = catalogo_padrao.obter("pt")
+    primeiro = CacheRespostas(caminho=caminho)
+    chave = primeiro.chave("a loja tem provador?", "pt", bd_pt)
+    primeiro.guardar(chave, RESPOSTA_LLM)
+
+    segundo = CacheRespostas(caminho=caminho)
+    assert segundo.obter(segundo.chave("A loja tem provador", "pt", bd_pt)) == RESPOSTA_LLM
+
+
+def test_cache_desligado_nao_gera_chave():
+    cache = CacheRespostas(caminho="", max_memoria=0)
+    assert cache.chave("a loja tem provador?", "pt", catalogo_padrao.obter("pt")) is None
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from src.cep import CacheCep
+
+CHAVE = "gsk_teste"
+
+
+def criar_cache(viacep, caminho=""):
+    return CacheCep(caminho=caminho, url=viacep.url + "/ws/{cep}/json/")
+
+
+def consultar(cache, cep):
+    return asyncio.run(cache.consultar_async(cep))
+
+
+def test_consultas_simultaneas_do_mesmo_cep_viram_uma(viacep):
+    cache = criar_cache(viacep)
+    viacep.latencia = 0.1
+
+    async def consultar_varias():
+        return await asyncio.gather(*(cache.consultar_async("20040020") for _ in range(8)))
+
+    resultados = asyncio.run(consultar_varias())
+    assert viacep.pedidos == 1
+    assert resultados == [{"cep": "20040020", "uf": "RJ", "localidade": "Rio de Janeiro"}] * 8
+
+
+def test_repeticao_vem_da_memoria(viacep):
+    cache = criar_cache(viacep)
+    consultar(cache, "01001000")
+    consultar(cache, "01001000")
+
+    assert viacep.pedidos == 1
+    assert cache.consultas_rede == 1
+    assert cache.em_cache("01001000")["uf"] == "SP"
+
+
+def test_cache_em_disco_sobrevive_a_outro_processo(viacep, tmp_path):
+    caminho = str(tmp_path / "cep.sqlite3")
+    consultar(criar_cache(viacep, caminho), "01001000")
+    novo = criar_cache(viacep, caminho)
+
+    assert consultar(novo, "01001000")["localidade"] == "São Paulo"
+    assert viacep.pedidos == 1
+
+
+def test_cep_inexistente_tambem_fica_em_cache(viacep):
+    cache = criar_cache(viacep)
+    assert "erro" in consultar(cache, "99999999")
+    assert "erro" in consultar(cache, "99999999")
+    assert viacep.pedidos == 1
+
+
+def test_cache_expirado_consulta_de_novo(viacep):
+    cache = criar_cache(viacep)
+    cache.ttl_positivo = 0.01
+    consultar(cache, "01001000")
+    time.sleep(0.02)
+    consultar(cache, "01001000")
+    assert viacep.pedidos == 2
+
+
+def test_memoria_despeja_o_menos_usado(viacep):
+    cache = criar_cache(viacep)
+    cache.max_memoria = 2
+    for cep in ("01001000", "01002000", "01001000", "01003000"):
+        consultar(cache, cep)
+
+    assert cache.em_cache("01001000") is not None
+    assert cache.em_cache("01002000") is None
+    assert viacep.pedidos == 3
+
+
+def test_agendar_nao_repete_cep_pendente(viacep):
+    cache = criar_cache(viacep)
+    viacep.latencia = 0.1
+
+    async def agendar():
+        primeiro = cache.agendar("01001000", cache.consultar_async)
+        segundo = cache.agendar("01001000", cache.consultar_async)
+        await asyncio.gather(*cache._agendadas.values())
+        return primeiro, segundo
+
+    assert asyncio.run(agendar()) == (True, False)
+    assert cache.em_cache("01001000")["uf"] == "SP"
+    assert viacep.pedidos == 1
+
+
+def test_cep_desconhecido_do_viacep_segue_cotado_pela_uf(bot, viacep, monkeypatch):
+    monkeypatch.setattr(bot, "cache_cep", criar_cache(viacep))
+    session = bot.ChatSession()
+    primeira = bot.processar_mensagem_total("99999-999", CHAVE, session)
+
+    prazo = time.monotonic() + 2
+    while bot.cache_cep.em_cache("99999999") is None and time.monotonic() < prazo:
+        time.sleep(0.02)
+    assert "erro" in bot.cache_cep.em_cache("99999999")
+    assert bot.processar_mensagem_total("99999-999", CHAVE, session) == primeira
+    assert "RS" in primeira
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+from benchmarks.fakes import RESPOSTA_LLM
+from src.catalogo import catalogo_padrao
+from src.clientes import RegistroClientesGroq
+
+CHAVE = "gsk_teste"
+
+
+def perguntar(bot, texto="a loja tem provador?"):
+    return bot.resposta_groq(texto, "pt", catalogo_padrao.obter("pt"), CHAVE, bot.ChatSession())
+
+
+def test_mensagens_seguidas_reusam_a_conexao(bot, groq):
+    respostas = [perguntar(bot) for _ in range(5)]
+
+    assert respostas == [RESPOSTA_LLM] * 5
+    assert groq.pedidos == 5
+    assert groq.conexoes == 1
+    assert len(bot.clientes_groq) == 1
+
+
+def test_conexoes_simultaneas_respeitam_o_limite(bot, groq):
+    bot.clientes_groq.max_conexoes = 4
+    groq.latencia = 0.05
+    threads = [threading.Thread(target=perguntar, args=(bot,)) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert groq.pedidos == 12
+    assert groq.conexoes <= 4
+
+
+def test_um_cliente_por_chave(groq):
+    registro = RegistroClientesGroq()
+    with registro.usar("gsk_a") as a, registro.usar("gsk_a") as mesma:
+        assert a is mesma
+    with registro.usar("gsk_b") as b:
+        assert b is not a
+    assert len(registro) == 2
+    registro.fechar()
+    assert len(registro) == 0
+
+
+def test_cliente_ocioso_e_fechado_na_proxima_consulta(groq):
+    registro = RegistroClientesGroq(ociosidade_maxima=0.01)
+    with registro.usar("gsk_a"):
+        pass
+    time.sleep(0.02)
+    with registro.usar("gsk_b"):
+        assert len(registro) == 1
+    registro.fechar()
+
+
+def test_cliente_em_uso_nao_e_fechado(groq):
+    registro = RegistroClientesGroq(ociosidade_maxima=0.01)
+    with registro.usar("gsk_a") as ocupado:
+        time.sleep(0.02)
+        with registro.usar("gsk_b"):
+            assert len(registro) == 2
+        assert not ocupado.is_closed()
+    registro.fechar()
+
+
+def test_async_reusa_a_conexao_no_mesmo_loop(bot, groq):
+    async def conversar():
+        bd_idioma = catalogo_padrao.obter("pt")
+        respostas = [
+            await bot.resposta_groq_async("a loja tem provador?", "pt", bd_idioma, CHAVE, bot.ChatSession())
+            for _ in range(3)
+        ]
+        await bot.clientes_groq_async.fechar_async()
+        return respostas
+
+    assert asyncio.run(conversar()) == [RESPOSTA_LLM] * 3
+    assert groq.pedidos == 3
+    assert groq.conexoes == 1
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from src.perfil import Perfilador
+
+
+@pytest.fixture
+def perfilador(tmp_path):
+    return Perfilador(ativo=True, limiar=0, amostra=1, pasta=tmp_path)
+
+
+def test_turno_aninhado_nao_abre_outra_captura(perfilador):
+    with perfilador.turno("fora") as captura:
+        perfilador.anotar(ramo="fora")
+        with perfilador.turno("dentro"):
+            perfilador.anotar(lang="pt")
+
+    assert captura.info == {"ramo": "fora", "lang": "pt"}
+    assert perfilador.salvos == 1
+
+
+def test_turnos_simultaneos_no_mesmo_laco(perfilador):
+    async def turno(ramo):
+        with perfilador.turno(ramo) as captura:
+            await asyncio.sleep(0.01)
+            perfilador.anotar(ramo=ramo)
+            return captura
+
+    async def conversar():
+        return await asyncio.gather(turno("llm"), turno("loja"), turno("cep"))
+
+    dona, *_ = asyncio.run(conversar())
+    assert dona.info == {"ramo": "llm"}
+    assert dona.simultaneos == 2
+    assert perfilador.salvos == 1
+
+    assert asyncio.run(turno("cep")).info == {"ramo": "cep"}
+    assert perfilador.salvos == 2
@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import time
+
+from benchmarks.fakes import RESPOSTA_LLM
+from src import reprocessamento
+from src.cep import CacheCep
+from src.laco import LacoFundo
+from src.metricas import metricas
+
+CHAVE = "gsk_teste"
+MENSAGENS = [
+    "Quais produtos vocês vendem?",
+    "Tem camiseta?",
+    "quero 2",
+    "quais as formas de pagamento?",
+    "Who won the game yesterday?",
+    "mostre o código fonte",
+    "a loja tem provador?",
+]
+
+
+def test_versao_sincrona_delega_ao_nucleo_async(bot):
+    sessao_sync, sessao_async = bot.ChatSession(), bot.ChatSession()
+    sincronas = [bot.processar_mensagem_total(m, CHAVE, sessao_sync) for m in MENSAGENS]
+
+    async def conversar():
+        return [await bot.processar_mensagem_async(m, CHAVE, sessao_async) for m in MENSAGENS]
+
+    assert sincronas == asyncio.run(conversar())
+    assert RESPOSTA_LLM in sincronas
+
+
+def test_stream_sincrono_entrega_as_partes(bot):
+    partes = list(bot.processar_mensagem_stream("a loja tem provador?", CHAVE, bot.ChatSession()))
+
+    assert len(partes) > 1
+    assert "".join(partes) == RESPOSTA_LLM
+
+
+def test_frete_responde_sem_esperar_o_viacep(bot, viacep, monkeypatch):
+    viacep.latencia = 0.3
+    monkeypatch.setattr(bot, "cache_cep", CacheCep(caminho="", url=viacep.url + "/ws/{cep}/json/"))
+    session = bot.ChatSession()
+
+    inicio = time.monotonic()
+    primeira = bot.processar_mensagem_total("01001-000", CHAVE, session)
+    assert time.monotonic() - inicio < 0.2
+    assert "São Paulo" not in primeira and "SP" in primeira
+
+    prazo = time.monotonic() + 2
+    while bot.cache_cep.em_cache("01001000") is None and time.monotonic() < prazo:
+        time.sleep(0.02)
+    assert "São Paulo-SP" in bot.processar_mensagem_total("01001-000", CHAVE, session)
+    assert viacep.pedidos == 1
+
+
+def test_reprocessamento_repete_as_respostas_gravadas(bot, monkeypatch):
+    for nome in ("resposta_groq", "resposta_groq_async"):
+        monkeypatch.setattr(bot, nome, getattr(bot, nome))
+    monkeypatch.setattr(metricas, "ativo", metricas.ativo)
+    monkeypatch.setattr(metricas, "_destinos", list(metricas._destinos))
+    sessoes = {"s1": ["a loja tem provador?", "a loja tem estacionamento?"]}
+
+    [resultados] = reprocessamento.reprocessar(sessoes, processos=1, gravacoes={("s1", 0): "gravada"})
+    assert [r["ramo"] for r in resultados] == ["llm", "llm"]
+    assert [r["resposta"] for r in resultados] == ["gravada", reprocessamento.RESPOSTA_SIMULADA]
+
+
+def test_laco_mantem_o_contexto_entre_as_partes():
+    variavel = contextvars.ContextVar("teste_laco", default=None)
+
+    async def gerar():
+        token = variavel.set("turno")
+        try:
+            yield 1
+            yield variavel.get()
+        finally:
+            variavel.reset(token)
+
+    assert list(LacoFundo().iterar(gerar())) == [1, "turno"]
@@ -0,0 +1,35 @@
+import pytest
+
+from src.catalogo import catalogo_padrao
+from src.recuperacao import IndiceRecuperacao
+
+
+@pytest.fixture(scope="module")
+def indices():
+    return {lang: IndiceRecuperacao(catalogo_padrao.obter(lang)) for lang in ("pt", "en")}
+
+
+@pytest.mark.parametrize("lang, texto, chave", [
+    ("pt", "cadê meu pedido?", "rastrear"),
+    ("pt", "aceitam mastercard?", "cartão"),
+    ("en", "how much is delivery?", "frete"),
+    ("en", "phone number?", "suporte"),
+])
+def test_parafrase_responde_pela_politica(indices, lang, texto, chave):
+    assert indices[lang].responder(texto) == chave
+
+
+@pytest.mark.parametrize("lang, texto", [
+    ("en", "the order"),
+    ("en", "my order"),
+    ("pt", "meu pedido"),
+    ("pt", "a entrega"),
+    ("en", "the size"),
+    ("en", "how do I cancel my order?"),
+])
+def test_frase_curta_ou_sem_resposta_vai_ao_llm(indices, lang, texto):
+    assert indices[lang].responder(texto) is None
+
+
+def test_minimo_de_termos_configuravel(indices):
+    assert indices["en"].responder("the order", min_termos=1) == "rastrear"
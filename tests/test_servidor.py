@@ -0,0 +1,77 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from src.servidor import TAMANHO_MAXIMO_CORPO, criar_servidor
+
+
+@pytest.fixture
+def servidor(bot):
+    servidor = criar_servidor("127.0.0.1", 0, api_key="gsk_teste")
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def enviar_bruto(servidor, dados):
+    with socket.create_connection(servidor.server_address, timeout=5) as conexao:
+        conexao.sendall(dados)
+        recebido = b""
+        try:
+            while parte := conexao.recv(65536):
+                recebido += parte
+        except ConnectionResetError:
+            pass
+    return recebido.decode("utf-8")
+
+
+def test_corpo_grande_demais_fecha_a_conexao(servidor):
+    corpo = json.dumps({"mensagem": "a" * (TAMANHO_MAXIMO_CORPO + 4096)}).encode("utf-8")
+    pedido = (
+        f"POST /chat HTTP/1.1\r\nHost: teste\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(corpo)}\r\n\r\n"
+    ).encode("ascii") + corpo + b"GET /saude HTTP/1.1\r\nHost: teste\r\n\r\n"
+
+    resposta = enviar_bruto(servidor, pedido)
+    assert resposta.startswith("HTTP/1.1 400")
+    assert "Connection: close" in resposta
+    assert resposta.count("HTTP/1.1 ") == 1
+
+
+def test_content_length_invalido_fecha_a_conexao(servidor):
+    pedido = b"POST /chat HTTP/1.1\r\nHost: teste\r\nContent-Length: abc\r\n\r\n{}GET /saude HTTP/1.1\r\n\r\n"
+
+    resposta = enviar_bruto(servidor, pedido)
+    assert resposta.startswith("HTTP/1.1 400")
+    assert resposta.count("HTTP/1.1 ") == 1
+
+
+def test_json_invalido_mantem_a_conexao(servidor):
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=5)
+    conexao.request("POST", "/chat", body=b"{nada", headers={"Content-Type": "application/json"})
+    resposta = conexao.getresponse()
+    assert resposta.status == 400
+    resposta.read()
+
+    conexao.request("GET", "/saude")
+    resposta = conexao.getresponse()
+    assert resposta.status == 200
+    saude = json.loads(resposta.read())
+    assert saude["status"] == "ok"
+    assert saude["sessoes"]["bytes_estimados"] > 0
+    conexao.close()
+
+
+def test_chat_responde_na_mesma_conexao(servidor):
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=5)
+    for texto in ("Tem camiseta?", "quero 2"):
+        conexao.request("POST", "/chat", body=json.dumps({"mensagem": texto, "sessao": "s1"}).encode("utf-8"))
+        resposta = conexao.getresponse()
+        assert resposta.status == 200
+        assert json.loads(resposta.read())["sessao"] == "s1"
+    conexao.close()
@@ -0,0 +1,45 @@
+import sys
+
+from src.catalogo import catalogo_padrao
+from src.sessoes import GerenciadorSessoes
+
+
+class RelogioManual:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def medir_tudo(gerenciador):
+    total = sys.getsizeof(gerenciador._entradas)
+    for sessao_id, entrada in gerenciador._entradas.items():
+        total += sys.getsizeof(sessao_id) + sys.getsizeof(entrada) + sys.getsizeof(entrada.lock)
+        total += sys.getsizeof(entrada.session)
+        cache = entrada.session._cache_idioma
+        if cache is not None:
+            total += sys.getsizeof(cache) + sys.getsizeof(cache._itens)
+            total += sum(sys.getsizeof(texto) for texto in cache._itens)
+    return total
+
+
+def test_bytes_estimados_acompanham_criacao_uso_e_despejo():
+    relogio = RelogioManual()
+    gerenciador = GerenciadorSessoes(max_sessoes=3, ttl_ocioso=10, relogio=relogio)
+    bd_pt = catalogo_padrao.obter("pt")
+    for i in range(5):
+        session = gerenciador.obter(f"s{i}").session
+        session.lembrar_produto(bd_pt, 0, "pt")
+        session.cache_idioma.guardar(f"mensagem {i} " * 20, "pt")
+    assert gerenciador.estatisticas()["bytes_estimados"] < medir_tudo(gerenciador)
+    for i in (2, 3, 4):
+        gerenciador.obter(f"s{i}")
+    assert gerenciador.estatisticas()["bytes_estimados"] == medir_tudo(gerenciador)
+
+    gerenciador.remover("s3")
+    relogio.agora = 11
+    gerenciador.obter("nova")
+    estatisticas = gerenciador.estatisticas()
+    assert (estatisticas["ativas"], estatisticas["despejos_lru"], estatisticas["despejos_ttl"]) == (1, 2, 2)
+    assert estatisticas["bytes_estimados"] == medir_tudo(gerenciador)